@@ -0,0 +1,95 @@
+# archive.py
+# Append-only, compressed store of raw survey pages.
+# - Bodies go into gzip segments (segment-00001.gz, ...); every page is its own
+#   gzip member, so it can be read back alone from (segment, offset, length).
+# - index.ndjson holds one line per stored page:
+#     {"url", "page", "fetched_at", "sha1", "segment", "offset", "length"}
+# - A body identical to the last one stored for the same URL is not stored again.
+# Lets the extractors be re-run over a crawl without touching the network:
+# iter_copies() replays every stored copy, iter_pages() only the newest ones.
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class PageArchive:
+    """Thread-safe writer + reader for the page archive directory."""
+
+    def __init__(self, path: str = "page_archive", segment_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._index_path = os.path.join(path, "index.ndjson")
+        os.makedirs(path, exist_ok=True)
+        self._last_sha = {e["url"]: e["sha1"] for e in self._read_index()}
+        segments = sorted(n for n in os.listdir(path) if n.startswith("segment-"))
+        self._segment = segments[-1] if segments else self._segment_name(1)
+
+    @staticmethod
+    def _segment_name(n: int) -> str:
+        return f"segment-{n:05d}.gz"
+
+    def _read_index(self) -> list[dict]:
+        if not os.path.exists(self._index_path):
+            return []
+        with open(self._index_path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    # --- writing ---
+
+    def append(self, url: str, page: int, html: str) -> bool:
+        """Store one fetched page; returns False if it was unchanged since last time."""
+        data = html.encode("utf-8")
+        sha = hashlib.sha1(data).hexdigest()
+        blob = gzip.compress(data)
+        with self._lock:
+            if self._last_sha.get(url) == sha:
+                return False
+            seg_path = os.path.join(self.path, self._segment)
+            offset = os.path.getsize(seg_path) if os.path.exists(seg_path) else 0
+            if offset and offset + len(blob) > self.segment_bytes:
+                self._segment = self._segment_name(int(self._segment[8:13]) + 1)
+                seg_path, offset = os.path.join(self.path, self._segment), 0
+            with open(seg_path, "ab") as f:
+                f.write(blob)
+            entry = {"url": url, "page": page, "fetched_at": time.time(), "sha1": sha,
+                     "segment": self._segment, "offset": offset, "length": len(blob)}
+            with open(self._index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._last_sha[url] = sha
+            return True
+
+    # --- reading ---
+
+    def latest(self) -> list[dict]:
+        """Newest index entry per page number, in page order."""
+        newest = {}
+        for e in self._read_index():
+            newest[e["page"]] = e  # later lines win
+        return [newest[p] for p in sorted(newest)]
+
+    def read(self, entry: dict) -> str:
+        """Decompress one stored page body."""
+        with open(os.path.join(self.path, entry["segment"]), "rb") as f:
+            f.seek(entry["offset"])
+            return gzip.decompress(f.read(entry["length"])).decode("utf-8")
+
+    def iter_pages(self, start_page: int = 1):
+        """Yield (page_number, html) for the newest copy of every archived page."""
+        for e in self.latest():
+            if e["page"] >= start_page:
+                yield e["page"], self.read(e)
+
+    def iter_copies(self, start_page: int = 1):
+        """
+        Yield (page_number, html) for every stored copy, oldest first (index order).
+        A row that moved to another page between crawls is then seen on each copy
+        it was on; a caller keeping the last version of each row gets its newest.
+        """
+        for e in self._read_index():
+            if e["page"] >= start_page:
+                yield e["page"], self.read(e)
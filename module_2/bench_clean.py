@@ -0,0 +1,150 @@
+# bench_clean.py
+# Throughput benchmark for clean.py's memoized normalizers.
+# Cleans a scraped file (or a synthetic one with realistic repetition: a couple
+# of years of added_on dates, a handful of terms, GRE/GPA values on their usual
+# grids) with the LRU caches on and off, checks both outputs are identical and
+# reports rows/s, the speedup and the cache hit rates. With --workers it also
+# times the process-pool mode (clean_stream(workers=N)) for each N.
+#
+#   python module_2/bench_clean.py                       # 30k synthetic rows
+#   python module_2/bench_clean.py --input scraped.json --repeat 5
+#   python module_2/bench_clean.py --rows 500000 --workers 1 4 8 16
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import clean
+from sinks import export_json_array
+
+TERMS = ["Fall 2025", "Fall 2025", "Fall 2025", "Spring 2025", "Fall 2024", "F25", "S26", ""]
+STUDENT_TYPES = ["International", "American", "Other"]
+
+
+def make_rows(n: int, seed: int = 0):
+    """n scraped rows shaped like the live site's, with its value repetition."""
+    rng = random.Random(seed)
+    first = date(2024, 1, 1)
+    for i in range(n):
+        day = first + timedelta(days=rng.randrange(730))
+        gre, gre_v = rng.randrange(290, 341), rng.randrange(130, 171)
+        gre_aw, gpa = rng.randrange(0, 13) / 2, round(rng.uniform(2.5, 4.0), 2)
+        has_gre, has_gpa = rng.random() < 0.3, rng.random() < 0.7
+        yield {
+            "university_name": f"University {rng.randrange(300)}",
+            "program_name": "Computer Science",
+            "masters_phd": rng.choice(["Masters", "PhD"]),
+            "added_on": f"{day:%B} {day.day}, {day.year}",
+            "status": f"Accepted on {day.day} {day:%b}",
+            "applicant_url": f"https://www.thegradcafe.com/result/{900000 + i}",
+            "term": rng.choice(TERMS),
+            "student_type": rng.choice(STUDENT_TYPES),
+            "gre": f"GRE {gre}" if has_gre else "",
+            "gre_v": f"GRE V {gre_v}" if has_gre else "",
+            "gre_aw": f"GRE AW {gre_aw:.2f}" if has_gre else "",
+            "gpa": f"GPA {gpa:.2f}" if has_gpa else "",
+            "gre_num": gre if has_gre else None,
+            "gre_v_num": gre_v if has_gre else None,
+            "gre_aw_num": gre_aw if has_gre else None,
+            "gpa_num": gpa if has_gpa else None,
+            "comments": "",
+        }
+
+
+@contextmanager
+def uncached():
+    """Run clean.py with the original, unmemoized normalizers."""
+    saved = {name: getattr(clean, name) for name in
+             ("_parse_date_iso", "_term_norm", "_sanitize_metric")}
+    for name, fn in saved.items():
+        setattr(clean, name, fn.__wrapped__)
+    try:
+        yield
+    finally:
+        for name, fn in saved.items():
+            setattr(clean, name, fn)
+
+
+def time_clean(src: str, dst: str, repeat: int) -> float:
+    """Best-of-`repeat` seconds for clean_stream(src, dst); caches start empty each time."""
+    best = float("inf")
+    for _ in range(repeat):
+        clean.clear_caches()
+        start = time.perf_counter()
+        clean.clean_stream(src, dst)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_workers(src: str, workers: int, chunk_size: int, repeat: int) -> float:
+    """Best-of-`repeat` seconds for clean_stream(src, workers=workers)."""
+    best = float("inf")
+    with tempfile.TemporaryDirectory() as tmp:
+        for _ in range(repeat):
+            clean.clear_caches()
+            start = time.perf_counter()
+            clean.clean_stream(src, os.path.join(tmp, "out.json"), workers=workers,
+                               chunk_size=chunk_size)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(src: str, repeat: int = 3) -> dict:
+    """Time cleaning src with and without the caches; outputs must match."""
+    rows = sum(1 for _ in clean.iter_rows(src))
+    with tempfile.TemporaryDirectory() as tmp:
+        plain_out, memo_out = os.path.join(tmp, "plain.json"), os.path.join(tmp, "memo.json")
+        with uncached():
+            plain = time_clean(src, plain_out, repeat)
+        memo = time_clean(src, memo_out, repeat)
+        with open(plain_out, "rb") as a, open(memo_out, "rb") as b:
+            same = a.read() == b.read()
+    return {"rows": rows, "same_output": same,
+            "uncached_rows_per_s": round(rows / plain), "cached_rows_per_s": round(rows / memo),
+            "speedup": round(plain / memo, 2), "caches": clean.cache_stats()}
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Time clean.py with and without memoization")
+    ap.add_argument("--input", help="scraped.json / scraped.ndjson (default: synthetic rows)")
+    ap.add_argument("--rows", type=int, default=30000, help="synthetic rows (default: %(default)s)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--workers", type=int, nargs="*", default=[],
+                    help="also time --workers N for each N given")
+    ap.add_argument("--chunk-size", type=int, default=clean.CHUNK_SIZE)
+    ap.add_argument("--json", metavar="PATH", help="also write the result as JSON")
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = args.input
+        if not src:
+            src = os.path.join(tmp, "scraped.json")
+            export_json_array(src, make_rows(args.rows, args.seed))
+        result = run(src, args.repeat)
+        result["workers"] = {n: round(result["rows"] / time_workers(src, n, args.chunk_size,
+                                                                    args.repeat))
+                             for n in args.workers}
+
+    print(f"{result['rows']} rows, identical output: {'ok' if result['same_output'] else 'FAIL'}")
+    print(f"  uncached {result['uncached_rows_per_s']:>9,} rows/s")
+    print(f"  cached   {result['cached_rows_per_s']:>9,} rows/s   x{result['speedup']:.2f}")
+    for name, st in result["caches"].items():
+        print(f"  {name:6s} hits {st['hits']:>7}  misses {st['misses']:>6}  hit rate {st['hit_rate']:.1%}")
+    base = result["workers"].get(1) or result["cached_rows_per_s"]
+    for n, rate in result["workers"].items():
+        print(f"  workers {n:3d} {rate:>9,} rows/s   x{rate / base:5.2f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0 if result["same_output"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# bench_parsers.py
+# Equivalence check + micro-benchmark for the parse_page() backends.
+# Parses every saved survey page with each backend, verifies the rows match the
+# BeautifulSoup reference exactly, and reports ms/page and speedup.
+#
+#   python module_2/bench_parsers.py                      # tests/fixtures/*.html
+#   python module_2/bench_parsers.py saved_pages/ --repeat 20
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+import scrape
+
+
+def load_pages(folder: str) -> list[str]:
+    """Read every *.html file in folder (sorted)."""
+    paths = sorted(glob.glob(os.path.join(folder, "*.html")))
+    pages = []
+    for p in paths:
+        with open(p, "r", encoding="utf-8") as f:
+            pages.append(f.read())
+    return pages
+
+
+def check_equivalence(pages: list[str]) -> list[str]:
+    """Names of backends whose rows differ from the bs4 reference on any page."""
+    bad = []
+    for name in scrape.PARSERS:
+        if any(scrape.parse_page(html, name) != scrape.parse_page(html, "bs4") for html in pages):
+            bad.append(name)
+    return bad
+
+
+def time_backend(name: str, pages: list[str], repeat: int) -> float:
+    """Best-of-`repeat` milliseconds per page."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in pages:
+            scrape.parse_page(html, name)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000 / max(1, len(pages))
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Check and time the parse_page() backends")
+    ap.add_argument("folder", nargs="?",
+                    default=os.path.join(os.path.dirname(__file__), "tests", "fixtures"))
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    pages = load_pages(args.folder)
+    if not pages:
+        print(f"No *.html pages in {args.folder}")
+        return 1
+    bad = check_equivalence(pages)
+    print(f"{len(pages)} pages, equivalence: {'FAIL ' + ', '.join(bad) if bad else 'ok'}")
+
+    ref = time_backend("bs4", pages, args.repeat)
+    for name in scrape.PARSERS:
+        ms = time_backend(name, pages, args.repeat) if name != "bs4" else ref
+        print(f"  {name:6s} {ms:8.2f} ms/page   x{ref / ms:5.1f}")
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+# bench_scrape.py
+# End-to-end throughput benchmark for scrape_data() against a local fixture
+# server (fixture_server.py) - no live requests.
+# Each configuration (concurrency x parser x parse workers) crawls the same
+# pages and reports pages/s, rows/s, parse ms/page and peak resident memory.
+# Memory is the peak RSS (getrusage ru_maxrss) of a fresh process that runs just
+# that configuration, plus its largest parse worker, so libxml2's C allocations
+# and the parse-worker processes are counted too.
+#
+#   python module_2/bench_scrape.py                                 # 50 synthetic pages
+#   python module_2/bench_scrape.py --latency 0.05 --concurrency 1 4 8
+#   python module_2/bench_scrape.py --recorded tests/fixtures --parser lxml bs4
+#   python module_2/bench_scrape.py --error-rate 0.05 --json bench.json
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage, memory is not reported
+    resource = None
+
+import scrape
+from bench_parsers import load_pages
+from fixture_server import start_server
+
+
+def _timed_parser(timings: list[float]):
+    """Wrap scrape.parse_page so every inline parse is timed."""
+    parse = scrape.parse_page
+
+    def timed(html, parser=None):
+        start = time.perf_counter()
+        try:
+            return parse(html, parser)
+        finally:
+            timings.append(time.perf_counter() - start)
+    return parse, timed
+
+
+def _peak_rss_mb() -> float:
+    """Peak RSS of this process plus its largest finished child, in MB."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    per_mb = 2**20 if sys.platform == "darwin" else 2**10  # bytes on macOS, KB elsewhere
+    return round((own + children) / per_mb, 2)
+
+
+def _crawl(url_prefix: str, concurrency: int, parser: str, workers: int, rate: float,
+           settings: dict | None = None, memory: bool = False) -> dict:
+    """
+    One scrape_data() crawl of url_prefix with the timings this process can see.
+    `settings` are scrape module globals to set first (a fresh process starts
+    from the defaults); memory=True adds the peak RSS, meaningful only when the
+    process ran nothing else (see run_once).
+    """
+    for name, value in (settings or {}).items():
+        setattr(scrape, name, value)
+    scrape.results = []
+    scrape.default_parser, scrape.parse_workers = parser, workers
+    scrape.configure_http(concurrency)
+    timings: list[float] = []
+    original, scrape.parse_page = _timed_parser(timings)
+    start = time.perf_counter()
+    try:
+        rows = scrape.scrape_data(base_url=url_prefix, rate=rate, concurrency=concurrency)
+    finally:
+        elapsed = time.perf_counter() - start
+        scrape.parse_page = original
+    return {
+        "rows": rows,
+        "seconds": elapsed,
+        # inline parses only; with parse workers the parsing happens in child processes
+        "parse_ms_per_page": round(1000 * sum(timings) / len(timings), 3) if timings else None,
+        "peak_rss_mb": _peak_rss_mb() if memory else None,
+        "wire_kb": round(scrape.http.stats["wire_bytes"] / 1024, 1),
+    }
+
+
+def run_once(server, concurrency: int, parser: str, workers: int,
+             rate: float, memory: bool = True) -> dict:
+    """
+    Crawl every page of `server` once with scrape_data(); return the measurements.
+    With memory=True (and getrusage available) the crawl runs in a fresh
+    process, so its peak RSS belongs to this configuration alone.
+    """
+    requests_before, errors_before = len(server.requests), server.errors
+    if memory and resource is not None:
+        settings = {name: getattr(scrape, name) for name in
+                    ("adaptive_concurrency", "backoff_base", "target_length")}
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+            crawl = pool.submit(_crawl, server.url_prefix, concurrency, parser, workers, rate,
+                                settings, True).result()
+    else:
+        crawl = _crawl(server.url_prefix, concurrency, parser, workers, rate)
+    elapsed, pages = crawl.pop("seconds"), server.pages
+    return {
+        "concurrency": concurrency,
+        "parser": parser,
+        "parse_workers": workers,
+        "pages": pages,
+        "rows": crawl["rows"],
+        "seconds": round(elapsed, 3),
+        "pages_per_s": round(pages / elapsed, 1),
+        "rows_per_s": round(crawl["rows"] / elapsed, 1),
+        "parse_ms_per_page": crawl["parse_ms_per_page"],
+        "peak_rss_mb": crawl["peak_rss_mb"],
+        "requests": len(server.requests) - requests_before,
+        "errors_served": server.errors - errors_before,
+        "wire_kb": crawl["wire_kb"],
+    }
+
+
+def _print_table(reports: list[dict]) -> None:
+    print(f"{'conc':>4} {'parser':>6} {'wrk':>3} {'pages/s':>8} {'rows/s':>9} "
+          f"{'parse ms/pg':>11} {'RSS MB':>8} {'reqs':>5} {'503s':>4}")
+    for r in reports:
+        parse_ms = f"{r['parse_ms_per_page']:.2f}" if r["parse_ms_per_page"] is not None else "-"
+        peak = f"{r['peak_rss_mb']:.2f}" if r["peak_rss_mb"] is not None else "-"
+        print(f"{r['concurrency']:>4} {r['parser']:>6} {r['parse_workers']:>3} "
+              f"{r['pages_per_s']:>8.1f} {r['rows_per_s']:>9.1f} {parse_ms:>11} "
+              f"{peak:>8} {r['requests']:>5} {r['errors_served']:>4}")
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark scrape_data() against a local fixture server")
+    ap.add_argument("--pages", type=int, default=50, help="synthetic pages to serve")
+    ap.add_argument("--rows-per-page", type=int, default=20)
+    ap.add_argument("--recorded", metavar="DIR",
+                    help="serve saved *.html pages from DIR (in name order) instead")
+    ap.add_argument("--latency", type=float, default=0.0, help="server delay per request, seconds")
+    ap.add_argument("--error-rate", type=float, default=0.0,
+                    help="fraction of requests answered with 503 (seeded, retried by the scraper)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--rate", type=float, default=1000.0,
+                    help="scraper requests/second budget (default: effectively unlimited)")
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[scrape.max_in_flight])
+    ap.add_argument("--parser", nargs="+", choices=sorted(scrape.PARSERS),
+                    default=[scrape.default_parser])
+    ap.add_argument("--parse-workers", type=int, nargs="+", default=[0])
+    ap.add_argument("--fixed-concurrency", action="store_true",
+                    help="disable AIMD so every run starts at full --concurrency")
+    ap.add_argument("--backoff-base", type=float, default=0.05,
+                    help="retry backoff base in seconds (scraper default is 1.0)")
+    ap.add_argument("--repeat", type=int, default=1, help="runs per configuration (best is kept)")
+    ap.add_argument("--no-memory", action="store_true",
+                    help="crawl in this process and skip the peak RSS measurement")
+    ap.add_argument("--json", metavar="PATH", help="also write the reports as JSON")
+    args = ap.parse_args(argv)
+
+    recorded = None
+    if args.recorded:
+        recorded = load_pages(args.recorded)
+        if not recorded:
+            print(f"No *.html pages in {args.recorded}")
+            return 1
+    scrape.adaptive_concurrency = not args.fixed_concurrency
+    scrape.backoff_base = args.backoff_base
+    scrape.target_length = sys.maxsize  # crawl until the pages run out
+
+    server = start_server(args.pages, args.rows_per_page, recorded,
+                          delay=args.latency, error_rate=args.error_rate, seed=args.seed)
+    reports = []
+    try:
+        print(f"{server.pages} pages, latency {args.latency}s, error rate {args.error_rate:.0%}, "
+              f"{os.cpu_count()} CPU(s)")
+        for conc, parser, workers in itertools.product(args.concurrency, args.parser,
+                                                       args.parse_workers):
+            runs = [run_once(server, conc, parser, workers, args.rate, not args.no_memory)
+                    for _ in range(max(1, args.repeat))]
+            reports.append(max(runs, key=lambda r: r["pages_per_s"]))
+    finally:
+        server.stop()
+
+    _print_table(reports)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+# checkpoint.py
+# Resume support for long scrapes.
+# After every completed page the scraper records:
+#   - last_page: the page number just written
+#   - offset: byte length of the NDJSON output at that point
+#   - rows: rows written so far
+#   - boundary_urls: applicant URLs of that page (to drop duplicates when the
+#     site shifts rows onto the next page between runs)
+# The file is replaced atomically so a crash never leaves half a checkpoint.
+
+import json
+import os
+
+
+class Checkpoint:
+    """Small JSON checkpoint; load() returns False when there is nothing to resume."""
+
+    def __init__(self, path: str = "scrape.checkpoint.json"):
+        self.path = path
+        self.last_page = 0
+        self.offset = 0
+        self.rows = 0
+        self.boundary_urls: list[str] = []
+
+    def load(self) -> bool:
+        """Read the checkpoint file if present and valid."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        self.last_page = int(data.get("last_page", 0))
+        self.offset = int(data.get("offset", 0))
+        self.rows = int(data.get("rows", 0))
+        self.boundary_urls = list(data.get("boundary_urls", []))
+        return self.last_page > 0
+
+    def save(self, page: int, offset: int, rows: int, boundary_urls: list[str]) -> None:
+        """Record a completed page (atomic replace)."""
+        self.last_page, self.offset, self.rows = page, offset, rows
+        self.boundary_urls = boundary_urls
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"last_page": page, "offset": offset, "rows": rows,
+                       "boundary_urls": boundary_urls}, f)
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        """Forget progress (crawl finished or starting over)."""
+        self.last_page = self.offset = self.rows = 0
+        self.boundary_urls = []
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def truncate_output(path: str, offset: int) -> bool:
+    """
+    Cut the NDJSON output back to the checkpointed offset, dropping rows from a
+    page that was only partly written. Returns False if the file is shorter
+    than the offset (output lost; the crawl must start over).
+    """
+    if not os.path.exists(path) or os.path.getsize(path) < offset:
+        return False
+    with open(path, "r+b") as f:
+        f.truncate(offset)
+    return True
@@ -4,15 +4,38 @@
 # - Formats dates to YYYY-MM-DD.
 # - Normalizes term codes (e.g., f20 -> Fall 2020).
 # - Blanks implausible GRE/GPA values (e.g., GRE > 800, GPA > 10).
-# - Keeps unavailable data as "" and does not introduce new keys.
+# - Uses the numbers the scraper already parsed (gre_num ... gpa_num) instead of
+#   re-reading them from the text, and passes them on for load_data.py.
+# - Keeps unavailable data as "" (numbers as null).
+# - Streams: rows are read (NDJSON, or the JSON array parsed incrementally),
+#   cleaned and written one at a time, so memory stays flat on big backfills.
+# - Memoizes the pure normalizers (dates, terms, GRE/GPA checks) in bounded LRU
+#   caches: the same few thousand values repeat across a crawl (cache_stats()).
+# - --workers N: chunks of rows are decoded, cleaned and encoded in a process
+#   pool and written back in input order (same output as one process).
+# - --incremental: a sidecar index of input-row content hashes lets a run clean
+#   only new or changed rows and merge them into the existing output.
 
+import argparse
+import hashlib
 import json
 import os
 import re
+import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from html import unescape
+from itertools import islice
+
+from sinks import array_item, iter_json_array, iter_ndjson, write_json_array
 
 # ------------------------- tiny utilities ------------------------- #
 
+CACHE_SIZE = 4096  # distinct inputs remembered per memoized normalizer
+CHUNK_SIZE = 2000  # rows per task in parallel mode (--workers)
+INDEX_VERSION = 3  # --incremental sidecar layout; older indexes are rebuilt
+
 _MONTHS = {
     "JAN": 1, "FEB": 2, "MAR": 3, "APR": 4, "MAY": 5, "JUN": 6,
     "JUL": 7, "AUG": 8, "SEP": 9, "SEPT": 9, "OCT": 10, "NOV": 11, "DEC": 12
@@ -33,6 +56,7 @@ _MONTHS = {
     "JUL": 7, "AUG": 8, "SEP": 9, "OCT": 10, "NOV": 11, "DEC": 12,
 }
 
+@lru_cache(maxsize=CACHE_SIZE)
 def _parse_date_iso(text: str, fallback_year: str = "") -> str:
     """Parse common user date shapes into YYYY-MM-DD; else ''."""
     s = _s(text)
@@ -75,6 +99,7 @@ def _parse_date_iso(text: str, fallback_year: str = "") -> str:
     return ""
 
 
+@lru_cache(maxsize=CACHE_SIZE)
 def _term_norm(term_text: str) -> str:
     """Normalize term like f20/S20/Fall 2020 -> 'Fall 2020'; else original."""
     raw = _s(term_text)
@@ -103,9 +128,11 @@ def _pick_date_from_status(status_text: str, keyword: str, fy: str) -> str:
     m = re.search(rf"(?i){keyword}\s+on\s+([A-Za-z0-9 ,/\-]+)", _s(status_text))
     return _parse_date_iso(m.group(1), fallback_year=fy) if m else ""
 
-def _sanitize_metric(text: str, kind: str) -> str:
+@lru_cache(maxsize=CACHE_SIZE)
+def _sanitize_metric(text: str, kind: str, value=None) -> str:
     """
     Keep original text if number is plausible; else "".
+    `value` is the number the scraper parsed from text (gre_num etc.), if any.
     - gre: allow 130-170 (subscore), 260-340 (new total), 200-800 (old total).
     - gre_v: 130-170.
     - gre_aw: 0-6.
@@ -114,10 +141,12 @@ def _sanitize_metric(text: str, kind: str) -> str:
     s = _s(text)
     if not s:
         return ""
-    m = re.search(r"(\d+(?:[.,]\d+)?)", s.replace(",", "."))
-    if not m:
-        return s
-    val = float(m.group(1))
+    if value is None:  # older scrapes: no parsed number, read it from the text
+        m = re.search(r"(\d+(?:[.,]\d+)?)", s.replace(",", "."))
+        if not m:
+            return s
+        value = m.group(1)
+    val = float(value)
     if kind == "gre":
         return s if (130 <= val <= 170) or (260 <= val <= 340) or (200 <= val <= 800) else ""
     if kind == "gre_v":
@@ -128,6 +157,23 @@ def _sanitize_metric(text: str, kind: str) -> str:
         return s if 0.0 <= val <= 10.0 else ""
     return s
 
+_MEMOIZED = {"date": _parse_date_iso, "term": _term_norm, "metric": _sanitize_metric}
+
+def cache_stats() -> dict:
+    """Hits, misses, entries and hit rate of each memoized normalizer."""
+    out = {}
+    for name, fn in _MEMOIZED.items():
+        info = fn.cache_info()
+        calls = info.hits + info.misses
+        out[name] = {"hits": info.hits, "misses": info.misses, "size": info.currsize,
+                     "hit_rate": round(info.hits / calls, 3) if calls else 0.0}
+    return out
+
+def clear_caches() -> None:
+    """Empty the normalizer caches and reset their statistics."""
+    for fn in _MEMOIZED.values():
+        fn.cache_clear()
+
 # ---------------------------- public API ---------------------------- #
 
 def load_data(path: str = "scraped.json"):
@@ -139,59 +185,330 @@ def save_data(data, path: str = "applicant_data.json"):
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
+def _clean_row(it: dict) -> dict:
+    """Clean one scraped row into one output row (see clean_data)."""
+    # Read all fields as strings
+    program    = _s(it.get("program_name", "")) + ", "+ _s(it.get("university_name", ""))
+    masters_phd     = _s(it.get("masters_phd", ""))
+    date_added        = _s(it.get("added_on", ""))
+    status          = _s(it.get("status", ""))
+    applicant_url   = _s(it.get("applicant_url", ""))
+    term            = _s(it.get("term", ""))
+    student_type    = _s(it.get("student_type", ""))
+    gre             = _s(it.get("gre", ""))
+    gre_v           = _s(it.get("gre_v", ""))
+    gre_aw          = _s(it.get("gre_aw", ""))
+    gpa             = _s(it.get("gpa", ""))
+    comments        = _s(it.get("comments", ""))
+
+    # Pull decision dates from status if missing; parse all dates to ISO
+    added_on    = _parse_date_iso(date_added) or ""
+
+    # Normalize term and metrics
+    term  = _term_norm(term)
+    gre   = _sanitize_metric(gre, "gre", it.get("gre_num"))
+    gre_v = _sanitize_metric(gre_v, "gre_v", it.get("gre_v_num"))
+    gre_aw= _sanitize_metric(gre_aw, "gre_aw", it.get("gre_aw_num"))
+    gpa   = _sanitize_metric(gpa, "gpa", it.get("gpa_num"))
+
+    return {
+        "program": program,
+        "Degree": masters_phd,
+        "date_added": added_on,
+        "status": status,
+        "url": applicant_url,
+        "term": term,
+        "US/International": student_type,
+        "gre": gre,
+        "gre_v": gre_v,
+        "gre_aw": gre_aw,
+        "GPA": gpa,
+        "gre_num": it.get("gre_num") if gre else None,
+        "gre_v_num": it.get("gre_v_num") if gre_v else None,
+        "gre_aw_num": it.get("gre_aw_num") if gre_aw else None,
+        "gpa_num": it.get("gpa_num") if gpa else None,
+        "comments": comments
+    }
+
 def clean_data(input_path: str = "scraped.json", output_path: str = "applicant_data.json"):
     """
     Minimal cleaning with few branches:
       - dates normalized to YYYY-MM-DD.
       - term normalized (f20/s20/etc.).
       - implausible GRE/GPA blanked.
-      - missing stays "".
-    """
-    rows = load_data(input_path)
-    out = []
-
-    for it in rows:
-        # Read all fields as strings (no new keys introduced)
-        program    = _s(it.get("program_name", "")) + ", "+ _s(it.get("university_name", ""))
-        masters_phd     = _s(it.get("masters_phd", ""))
-        date_added        = _s(it.get("added_on", ""))
-        status          = _s(it.get("status", ""))
-        applicant_url   = _s(it.get("applicant_url", ""))
-        term            = _s(it.get("term", ""))
-        student_type    = _s(it.get("student_type", ""))
-        gre             = _s(it.get("gre", ""))
-        gre_v           = _s(it.get("gre_v", ""))
-        gre_aw          = _s(it.get("gre_aw", ""))
-        gpa             = _s(it.get("gpa", ""))
-        comments        = _s(it.get("comments", ""))
-
-        # Pull decision dates from status if missing; parse all dates to ISO
-        added_on    = _parse_date_iso(date_added) or ""
-
-        # Normalize term and metrics
-        term  = _term_norm(term)
-        gre   = _sanitize_metric(gre, "gre")
-        gre_v = _sanitize_metric(gre_v, "gre_v")
-        gre_aw= _sanitize_metric(gre_aw, "gre_aw")
-        gpa   = _sanitize_metric(gpa, "gpa")
-
-        out.append({
-            "program": program,
-            "Degree": masters_phd,
-            "date_added": added_on,
-            "status": status,
-            "url": applicant_url,
-            "term": term,
-            "US/International": student_type,
-            "gre": gre,
-            "gre_v": gre_v,
-            "gre_aw": gre_aw,
-            "GPA": gpa,
-            "comments": comments
-        })
-
+      - GRE/GPA numbers carried as gre_num/gre_v_num/gre_aw_num/gpa_num.
+      - missing stays "" (numbers None).
+    Returns the cleaned list; for large files use clean_stream().
+    """
+    out = [_clean_row(it) for it in load_data(input_path)]
     save_data(out, output_path)
     return out
 
+# --------------------------- streaming mode --------------------------- #
+
+def _is_ndjson(path: str) -> bool:
+    return path.endswith((".ndjson", ".jsonl"))
+
+def iter_rows(path: str = "scraped.json"):
+    """
+    Yield input rows one at a time: NDJSON (.ndjson/.jsonl) line by line,
+    otherwise the JSON array read incrementally. Nothing if the file is missing.
+    """
+    if not os.path.exists(path):
+        return iter(())
+    return iter_ndjson(path) if _is_ndjson(path) else iter_json_array(path)
+
+def _encode(row: dict, out: str) -> str:
+    """One cleaned row as output text: an NDJSON line, or a JSON array element."""
+    if out == "ndjson":
+        return json.dumps(row, ensure_ascii=False)
+    return array_item(row, compact=out == "compact")
+
+def _write_items(path: str, items, out: str) -> int:
+    """Write encoded rows (see _encode) to path; returns the count."""
+    if out != "ndjson":
+        return write_json_array(path, items, compact=out == "compact")
+    count = 0
+    tmp = path + ".tmp"  # the old file may still be read while the new one is written
+    with open(tmp, "w", encoding="utf-8") as f:
+        for line in items:
+            f.write(line + "\n")
+            count += 1
+    os.replace(tmp, path)
+    return count
+
+# --------------------------- parallel mode --------------------------- #
+
+def _clean_chunk(items: list, from_lines: bool, out: str) -> list[str]:
+    """Runs in a worker process: decode (NDJSON lines), clean and encode one chunk."""
+    rows = map(json.loads, items) if from_lines else items
+    return [_encode(_clean_row(it), out) for it in rows]
+
+def _input_chunks(path: str, chunk_size: int):
+    """
+    Lists of up to chunk_size inputs: raw NDJSON lines (decoded by the workers)
+    or rows of a JSON array (decoded here, incrementally).
+    """
+    if not os.path.exists(path):
+        return
+    if not _is_ndjson(path):
+        items = iter_json_array(path)
+        while chunk := list(islice(items, chunk_size)):
+            yield chunk
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        lines = (line for line in f if line.strip())
+        while chunk := list(islice(lines, chunk_size)):
+            yield chunk
+
+def _clean_in_pool(path: str, out: str, workers: int, chunk_size: int):
+    """Yield encoded rows in input order, cleaned chunk by chunk in a process pool."""
+    from_lines = _is_ndjson(path)
+    pending = deque()  # at most 2 chunks per worker read ahead: memory stays bounded
+    chunks = _input_chunks(path, chunk_size)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            for chunk in chunks:
+                pending.append(pool.submit(_clean_chunk, chunk, from_lines, out))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for fut in pending:
+                fut.cancel()
+
+def _out_format(output_path: str, compact: bool) -> str:
+    return "ndjson" if _is_ndjson(output_path) else "compact" if compact else "pretty"
+
+def clean_stream(input_path: str = "scraped.json", output_path: str = "applicant_data.json",
+                 compact: bool = False, workers: int = 1, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Same cleaning as clean_data(), one row at a time: each row is read, cleaned
+    and written before the next is read, so memory stays flat however large
+    the input. Output is NDJSON for a .ndjson/.jsonl path, else a JSON array
+    (byte-identical to clean_data()'s unless compact). Returns rows written.
+    With workers > 1 the input is cut into chunk_size-row chunks that are
+    cleaned in a process pool and written back in input order (same output).
+    """
+    out = _out_format(output_path, compact)
+    if workers > 1:
+        items = _clean_in_pool(input_path, out, workers, max(1, chunk_size))
+    else:
+        items = (_encode(_clean_row(it), out) for it in iter_rows(input_path))
+    count = _write_items(output_path, items, out)
+    if os.path.exists(index_path(output_path)):
+        os.remove(index_path(output_path))  # describes the output just replaced
+    return count
+
+# ------------------------- incremental mode ------------------------- #
+
+def index_path(output_path: str) -> str:
+    """Sidecar index of output_path (see clean_incremental)."""
+    return output_path + ".index"
+
+def _rows_with_text(path: str):
+    """
+    (row, its source text) for each input row; the text is what gets hashed.
+    NDJSON rows come back as None: decode the line only if the row is needed.
+    """
+    if not os.path.exists(path):
+        return
+    if not _is_ndjson(path):
+        yield from iter_json_array(path, with_text=True)
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield None, line.strip()
+
+def _file_sha1(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        while block := f.read(1 << 20):
+            h.update(block)
+    return h.hexdigest()
+
+def _output_unchanged(output_path: str, header: dict) -> bool:
+    """
+    Is output_path still the file the index header was written for? Size and
+    mtime matching is enough; with a new mtime (a copy, a touch) the content
+    hash decides, so a same-size edit or rewrite is never trusted.
+    """
+    st = os.stat(output_path)
+    if header.get("bytes") != st.st_size:
+        return False
+    return header.get("mtime_ns") == st.st_mtime_ns or header.get("sha1") == _file_sha1(output_path)
+
+def _load_index(output_path: str, out: str):
+    """
+    (old, hashes) for the rows in output_path: old maps an input-row hash to
+    (key, byte offset, byte length) of its output text, hashes lists every row's
+    hash in output order. None if the index is missing or stale.
+    """
+    try:
+        with open(index_path(output_path), "r", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if (header.get("version") != INDEX_VERSION or header.get("format") != out
+                    or not _output_unchanged(output_path, header)):
+                return None  # output rewritten (or another layout asked for) since
+            old, hashes = {}, []
+            pos = 0 if out == "ndjson" else 1  # past "["
+            for line in f:
+                h, length, key = line.rstrip("\n").split("\t", 2)
+                if out != "ndjson" and hashes:
+                    pos += 1  # ","
+                old.setdefault(h, (key, pos, int(length)))
+                hashes.append(h)
+                pos += int(length) + (out == "ndjson")  # "\n"
+            return old, hashes
+    except (OSError, ValueError):
+        return None
+
+def clean_incremental(input_path: str = "scraped.json",
+                      output_path: str = "applicant_data.json", compact: bool = False) -> dict:
+    """
+    Clean only rows that are new or changed since the last run and merge them
+    into the existing output_path. The sidecar index (index_path) holds, per
+    output row, the sha1 of the input row's text, the byte length of its output
+    text and its key (applicant_url, or the hash when there is none). Rows are
+    written in input order, duplicates included, so the result is byte-identical
+    to clean_stream() over the same input:
+      - a row whose text was in the last input is copied from the old output
+        (no cleaning, no JSON decoding or encoding);
+      - any other row (new, or changed in place) is cleaned once, via a spool file;
+      - rows gone from the input are dropped, so `input_path` must hold the whole
+        data set (scraped.json), not the delta of an incremental scrape.
+    Memory holds the index and one hash per input row. The index header records
+    the output's size, mtime and sha1; without a valid index (first run, output
+    edited or rewritten by clean_stream since) every row is cleaned.
+    Returns {"rows", "cleaned", "reused", "dropped"} (dropped counts old keys
+    no longer in the input).
+    """
+    out = _out_format(output_path, compact)
+    old, old_hashes = (_load_index(output_path, out) if os.path.exists(output_path)
+                       else None) or ({}, [])
+    hashes, keys, spooled = [], set(), {}  # input order; keys seen; hash -> like old
+    spool_path = output_path + ".spool"
+    with open(spool_path, "wb") as spool:
+        for it, text in _rows_with_text(input_path):
+            h = hashlib.sha1(text.encode("utf-8")).hexdigest()
+            hashes.append(h)
+            if h in old:  # known text: unchanged, nothing to decode or clean
+                keys.add(old[h][0])
+            elif h not in spooled:
+                it = it if it is not None else json.loads(text)
+                key = _s(it.get("applicant_url", "")) or h
+                keys.add(key)
+                enc = _encode(_clean_row(it), out).encode("utf-8")
+                spooled[h] = (key, spool.tell(), len(enc))
+                spool.write(enc)
+    stats = {"rows": len(hashes), "cleaned": len(spooled),
+             "reused": len(hashes) - sum(h in spooled for h in hashes),
+             "dropped": len({key for key, _, _ in old.values()} - keys)}
+    try:
+        if old and hashes == old_hashes:
+            return stats  # same rows in the same order: leave the output alone
+
+        merged_path = output_path + ".merged"  # the old output is read while this is written
+        with open(index_path(output_path) + ".tmp", "w", encoding="utf-8") as idx, \
+                open(spool_path, "rb") as sp, \
+                open(output_path if old else os.devnull, "rb") as prev:
+
+            def merged():
+                for h in hashes:
+                    key, offset, length = old[h] if h in old else spooled[h]
+                    f = prev if h in old else sp
+                    f.seek(offset)
+                    idx.write(f"{h}\t{length}\t{key}\n")
+                    yield f.read(length).decode("utf-8")
+
+            idx.write(json.dumps({"format": out}) + "\n")  # placeholder, rewritten below
+            stats["rows"] = _write_items(merged_path, merged(), out)
+        os.replace(merged_path, output_path)  # only once prev is closed (Windows)
+        _finish_index(output_path, out, stats["rows"])
+    finally:
+        os.remove(spool_path)
+    return stats
+
+def _finish_index(output_path: str, out: str, rows: int) -> None:
+    """Replace the index with the new one, its header tied to the output just written."""
+    final, tmp = index_path(output_path), index_path(output_path) + ".tmp"
+    st = os.stat(output_path)
+    header = {"version": INDEX_VERSION, "format": out, "rows": rows, "bytes": st.st_size,
+              "mtime_ns": st.st_mtime_ns, "sha1": _file_sha1(output_path)}
+    with open(tmp, "r", encoding="utf-8") as body, open(final + ".new", "w", encoding="utf-8") as f:
+        body.readline()
+        f.write(json.dumps(header) + "\n")
+        shutil.copyfileobj(body, f)
+    os.replace(final + ".new", final)
+    os.remove(tmp)
+
+# ---------------------------- entrypoint ---------------------------- #
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Clean scraped Grad Café rows into applicant_data.json")
+    ap.add_argument("--input", default="scraped.json",
+                    help="scraped.json, or scraped.ndjson for line-by-line input (default: %(default)s)")
+    ap.add_argument("--output", default="applicant_data.json",
+                    help="JSON array, or NDJSON for a .ndjson path (default: %(default)s)")
+    ap.add_argument("--compact", action="store_true", help="write the array without indentation")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="cleaning processes; 1 cleans inline (default: %(default)s)")
+    ap.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                    help="rows per chunk handed to a worker (default: %(default)s)")
+    ap.add_argument("--incremental", action="store_true",
+                    help="clean only rows new or changed since the last run (index: <output>.index)")
+    return ap.parse_args(argv)
+
 if __name__ == "__main__":
-    clean_data()
+    args = _parse_args()
+    if args.incremental:  # the delta is small: cleaned in this process
+        stats = clean_incremental(args.input, args.output, args.compact)
+        print(f"Cleaned {stats['cleaned']} new/changed rows, reused {stats['reused']}, "
+              f"dropped {stats['dropped']}; {stats['rows']} rows in {args.output}.")
+    else:
+        n = clean_stream(args.input, args.output, args.compact, args.workers, args.chunk_size)
+        print(f"Cleaned {n} rows into {args.output}.")
+    if args.incremental or args.workers <= 1:  # workers keep their own caches
+        print("normalizer caches:", cache_stats())
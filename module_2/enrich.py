@@ -0,0 +1,203 @@
+# enrich.py
+# Optional enrichment of survey rows from each result's own page (applicant_url).
+# - parse_detail(): the result page's <dt>/<dd> pairs -> DETAIL_FIELDS keys.
+# - DetailStore: append-only NDJSON of {"url", "fields"} for every result page
+#   fetched so far; it is the persistent seen-set, so a URL is fetched once
+#   across runs and its fields are merged again from disk afterwards. Pages
+#   that still failed after the retries are recorded as {"url", "failed": true};
+#   pages that can never be fetched (robots.txt) as {"url", "skipped": true}.
+# - DetailEnricher: called with one page of rows; fetches the never-seen URLs
+#   concurrently (through the scraper's shared rate limiter) and returns the
+#   rows with the detail fields merged in. retry_failed() + refill() give rows
+#   that are already in scraped.json a second chance (incremental runs).
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# result-page label (lowercase, no trailing colon) -> key added to the row
+DETAIL_FIELDS = {
+    "decision": "decision",
+    "notification": "notification",
+    "degree's country of origin": "origin",
+    "undergrad gpa": "undergrad_gpa",
+    "gre general": "gre_general",
+    "gre verbal": "gre_verbal",
+    "analytical writing": "gre_writing",
+    "notes": "notes",
+}
+
+_only_dl = SoupStrainer("dl")
+
+def parse_detail(html: str) -> dict:
+    """Known <dt>label</dt><dd>value</dd> pairs of a result page, keyed by DETAIL_FIELDS."""
+    soup = BeautifulSoup(html, "html.parser", parse_only=_only_dl)
+    out = {}
+    for dt in soup.find_all("dt"):
+        key = DETAIL_FIELDS.get(dt.get_text(" ", strip=True).rstrip(":").strip().lower())
+        dd = dt.find_next_sibling("dd")
+        if key and dd is not None and key not in out:
+            out[key] = dd.get_text(" ", strip=True)
+    soup.decompose()
+    return out
+
+def merge_detail(row: dict, fields: dict | None) -> dict:
+    """Row plus every DETAIL_FIELDS key ("" where the result page had nothing)."""
+    merged = dict(row)
+    for key in DETAIL_FIELDS.values():
+        merged.setdefault(key, (fields or {}).get(key, ""))
+    return merged
+
+# ---------- persistent seen-set ----------
+
+class DetailStore:
+    """Result-page fields by URL, loaded from and appended to an NDJSON file."""
+
+    def __init__(self, path: str = "details.ndjson"):
+        self.path = path
+        self._fields: dict[str, dict] = {}
+        self._failed: set[str] = set()  # failed last time, never fetched since
+        self._skipped: set[str] = set()  # never to be fetched (e.g. robots.txt disallows it)
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line after a crash
+                    if entry.get("failed"):
+                        self._failed.add(entry["url"])
+                    elif entry.get("skipped"):
+                        self._skipped.add(entry["url"])
+                    else:
+                        self._fields[entry["url"]] = entry["fields"]
+        self._failed -= self._fields.keys() | self._skipped
+
+    def __contains__(self, url: str) -> bool:
+        """Settled: fetched, or skipped for good; either way not fetched again."""
+        return url in self._fields or url in self._skipped
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def get(self, url: str) -> dict | None:
+        return self._fields.get(url)
+
+    def failed(self) -> list[str]:
+        """URLs whose result page failed and has not been fetched since."""
+        return sorted(self._failed)
+
+    def add(self, url: str, fields: dict) -> None:
+        """Remember a fetched result page (flushed straight away)."""
+        with self._lock:
+            if url in self._fields:
+                return
+            self._fields[url] = fields
+            self._failed.discard(url)
+            self._append({"url": url, "fields": fields})
+
+    def add_failure(self, url: str) -> None:
+        """Remember a result page that still failed after the retries."""
+        with self._lock:
+            if url in self._fields or url in self._skipped or url in self._failed:
+                return
+            self._failed.add(url)
+            self._append({"url": url, "failed": True})
+
+    def add_skip(self, url: str) -> None:
+        """Remember a result page that must never be fetched; unlike a failure it is not retried."""
+        with self._lock:
+            if url in self._fields or url in self._skipped:
+                return
+            self._skipped.add(url)
+            self._failed.discard(url)
+            self._append({"url": url, "skipped": True})
+
+    def _append(self, entry: dict) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+# ---------- enrichment stage ----------
+
+class DetailEnricher:
+    """
+    Callable stage for scrape_data(): rows -> rows with detail fields.
+    fetch(url, limiter) must return the page HTML (scrape.fetch_with_retry);
+    URLs that still fail after its retries are recorded in the store as failed:
+    a later crawl that meets the row again fetches it, and retry_failed() +
+    refill() fix rows that only come back from scraped.json (incremental runs).
+    `origin` ("scheme://host") sends requests to the host being crawled instead
+    of the one in applicant_url; the store stays keyed by applicant_url.
+    `permanent` lists the exceptions that mean a page can never be fetched
+    (scrape.Disallowed): those URLs are recorded as skipped, not failed, and
+    neither a later crawl nor retry_failed() asks for them again.
+    """
+
+    def __init__(self, fetch, limiter, store: DetailStore, concurrency: int = 4,
+                 origin: str | None = None, permanent: tuple = ()):
+        self.fetch = fetch
+        self.limiter = limiter
+        self.store = store
+        self.origin = urlsplit(origin)[:2] if origin else None
+        self.permanent = tuple(permanent)
+        self.stats = {"fetched": 0, "reused": 0, "failed": 0, "skipped": 0, "recovered": 0}
+        self._recovered: set[str] = set()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, concurrency),
+                                        thread_name_prefix="enrich")
+
+    def _fetch_one(self, url: str) -> None:
+        target = urlunsplit(self.origin + urlsplit(url)[2:]) if self.origin else url
+        try:
+            html = self.fetch(target, self.limiter)
+        except self.permanent:
+            self.store.add_skip(url)
+            with self._lock:
+                self.stats["skipped"] += 1
+            return
+        except Exception:  # noqa: BLE001 - one bad result page must not stop the crawl
+            self.store.add_failure(url)
+            with self._lock:
+                self.stats["failed"] += 1
+            return
+        self.store.add(url, parse_detail(html))
+        with self._lock:
+            self.stats["fetched"] += 1
+
+    def __call__(self, rows: list[dict]) -> list[dict]:
+        urls = {r.get("applicant_url", "") for r in rows} - {""}
+        todo = sorted(u for u in urls if u not in self.store)
+        self.stats["reused"] += len(urls) - len(todo)
+        list(self._pool.map(self._fetch_one, todo))
+        return [merge_detail(r, self.store.get(r.get("applicant_url", ""))) for r in rows]
+
+    def retry_failed(self) -> int:
+        """Fetch the result pages that failed on earlier runs; returns how many now worked."""
+        todo = self.store.failed()
+        list(self._pool.map(self._fetch_one, todo))
+        self._recovered.update(u for u in todo if self.store.get(u) is not None)
+        self.stats["recovered"] = len(self._recovered)
+        return len(self._recovered)
+
+    def refill(self, rows):
+        """Yield rows, with fresh detail fields for those whose page retry_failed() recovered."""
+        for r in rows:
+            url = r.get("applicant_url", "")
+            if url in self._recovered:
+                fields = self.store.get(url)
+                r = {**r, **{key: fields.get(key, "") for key in DETAIL_FIELDS.values()}}
+            yield r
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,61 @@
+# fingerprint.py
+# Page fingerprints: a hash of the row keys (applicant URLs) extracted from one
+# survey page, in order.
+# - Within a crawl, a repeated fingerprint means the site is serving a page
+#   again (e.g. the last page for every out-of-range page number), so the
+#   crawler stops or skips it instead of collecting duplicates.
+# - FingerprintStore keeps every fingerprint seen across runs in a JSON file,
+#   so an incremental run recognises an unchanged page with one set lookup.
+#   It describes the pages behind scraped.json, so scrape.py only saves it
+#   after scraped.json has been exported.
+
+import hashlib
+import json
+import os
+
+
+def page_fingerprint(rows: list[dict]) -> str:
+    """sha1 over the page's applicant URLs (its row keys) in page order."""
+    h = hashlib.sha1()
+    for r in rows:
+        h.update(r.get("applicant_url", "").encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+class FingerprintStore:
+    """Set of page fingerprints persisted as a JSON list (atomic replace)."""
+
+    def __init__(self, path: str = "page_fingerprints.json", load: bool = True):
+        """load=False starts empty and replaces the file on the next save."""
+        self.path = path
+        self._prints: set[str] = set()
+        self._dirty = not load
+        if not load:
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._prints = set(json.load(f))
+        except (OSError, ValueError):
+            pass  # first run, or a damaged file: start empty
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return fingerprint in self._prints
+
+    def __len__(self) -> int:
+        return len(self._prints)
+
+    def add(self, fingerprint: str) -> None:
+        if fingerprint not in self._prints:
+            self._prints.add(fingerprint)
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write the set if anything was added since the last save."""
+        if not self._dirty:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(sorted(self._prints), f)
+        os.replace(tmp, self.path)
+        self._dirty = False
@@ -0,0 +1,246 @@
+# fixture_server.py
+# Local stand-in for thegradcafe.com/survey, shared by the tests and the
+# benchmarks so the scraper can run end to end without the live site.
+# - Pages are synthetic (make_page) or recorded HTML files served in order;
+#   /result/<id> serves a synthetic result page (make_detail).
+# - Knobs: latency per request, random 503 error rate, ETag/304, gzip,
+#   per-page status plans and Retry-After; every request is logged.
+# - Keep-alive HTTP/1.1 on a threaded server bound to 127.0.0.1:<free port>.
+# - result_id_of() / result_ids() / pages_requested() for the tests' assertions.
+
+import gzip
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# ---------- synthetic survey pages (same table shape as the live site) ----------
+
+def make_row(result_id: int, comment: str = "", added_on: str = "March 31, 2024") -> str:
+    """Return the 2-3 <tr> block for one result (parent + details + comments)."""
+    parent = (
+        "<tr>"
+        f"<td><div><div>University {result_id}</div></div></td>"
+        "<td><div><span>Computer Science</span><span>PhD</span></div></td>"
+        f"<td>{added_on}</td>"
+        "<td><div>Accepted on 30 Mar</div></td>"
+        "<td><div><dl><dt><a href='#'>Open</a>"
+        f"<a href='/result/{result_id}?ref=survey'>See more</a></dt></dl></div></td>"
+        "</tr>"
+    )
+    details = (
+        "<tr class='tw-border-none'><td><div>"
+        "<div>Accepted on 30 Mar</div><div>Fall 2024</div><div>International</div>"
+        "<div>GRE 320</div><div>GRE V 160</div><div>GRE AW 4.0</div><div>GPA 3.80</div>"
+        "</div></td></tr>"
+    )
+    notes = f"<tr class='tw-border-none'><td><p>{comment}</p></td></tr>" if comment else ""
+    return parent + details + notes
+
+
+def make_page(page: int, pages: int, rows_per_page: int, added_on=None) -> str:
+    """
+    Return a full survey page; pages past `pages` have an empty table.
+    `added_on(result_id)` gives each row's date text (default: one fixed date).
+    """
+    body = ""
+    if 1 <= page <= pages:
+        first = (pages - page) * rows_per_page  # newest results on page 1
+        body = "".join(
+            make_row(first + i, comment=f"note {first + i}" if i % 2 == 0 else "",
+                     **({"added_on": added_on(first + i)} if added_on else {}))
+            for i in range(rows_per_page - 1, -1, -1)
+        )
+    return (
+        "<html><head><title>Survey</title><script>var x = 1;</script></head><body>"
+        "<nav><a href='/'>Home</a></nav>"
+        "<table><thead><tr><th>School</th><th>Program</th></tr></thead>"
+        f"<tbody>{body}</tbody></table>"
+        "</body></html>"
+    )
+
+
+def make_detail(result_id: int) -> str:
+    """Return the result page for one applicant (definition list, like the live site)."""
+    items = [("Institution", f"University {result_id}"), ("Program", "Computer Science"),
+             ("Degree Type", "PhD"), ("Degree's Country of Origin", "International"),
+             ("Decision", "Accepted"), ("Notification", "on 30/03/2024 via E-mail"),
+             ("Undergrad GPA", "3.80"), ("GRE General:", "320"), ("GRE Verbal:", "160"),
+             ("Analytical Writing:", "4.00"), ("Notes", f"details for {result_id}")]
+    dl = "".join(f"<div><dt>{k}</dt><dd>{v}</dd></div>" for k, v in items)
+    return f"<html><body><nav>Home</nav><main><dl>{dl}</dl></main></body></html>"
+
+# ---------- server ----------
+
+class GradCafeServer:
+    """Handle for a running fixture server: base url + request log + knobs."""
+
+    def __init__(self, httpd, pages: int, rows_per_page: int,
+                 recorded: list[str] | None = None, seed: int = 0):
+        self.httpd = httpd
+        self.pages = len(recorded) if recorded else pages
+        self.rows_per_page = rows_per_page
+        self.recorded = recorded  # page N serves recorded[N - 1] when given
+        self.repeat_last = False  # pages past the end serve the last page again
+        self.page_alias = {}  # page -> page whose content it serves (duplicates)
+        self.robots_txt = None  # body of /robots.txt; None answers 404
+        self.added_on = None  # result_id -> date text for synthetic rows (make_page)
+        self.delay = 0.0  # seconds slept before answering (simulated latency)
+        self.error_rate = 0.0  # fraction of page requests answered with 503
+        self.etags = True  # send ETag and answer If-None-Match with 304
+        self.gzip = True  # gzip bodies for clients that send Accept-Encoding: gzip
+        self.requests = []  # (path, monotonic time) in arrival order (pages and result pages)
+        self.connections = set()  # client (host, port) pairs seen; keep-alive reuses them
+        self.not_modified = 0
+        self.errors = 0  # random 503s sent (error_rate)
+        self.fail_pages = set()  # page numbers answered with HTTP 503
+        self.status_plan = {}  # page -> statuses to answer first, e.g. [429, 503, "empty"]
+        self.retry_after = None  # Retry-After header value sent with 429/503
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._thread = None
+
+    @property
+    def origin(self) -> str:
+        """http://127.0.0.1:<port>"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def url_prefix(self) -> str:
+        """Drop-in replacement for scrape.url_prefix."""
+        return self.origin + "/survey/?page="
+
+    def page_html(self, page: int) -> str:
+        """Body served for /survey/?page=N."""
+        page = self.page_alias.get(page, page)
+        if self.repeat_last and page > self.pages:
+            page = self.pages
+        if self.recorded:
+            if 1 <= page <= len(self.recorded):
+                return self.recorded[page - 1]
+            return make_page(0, 0, 0)  # past the end: empty table
+        return make_page(page, self.pages, self.rows_per_page, self.added_on)
+
+    def _roll_error(self) -> bool:
+        with self.lock:
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.errors += 1
+                return True
+        return False
+
+    def start(self) -> "GradCafeServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, args=(0.05,),
+                                        name="fixture-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serve /survey/?page=N, /result/<id> and /robots.txt over keep-alive HTTP/1.1."""
+
+    protocol_version = "HTTP/1.1"
+
+    def _empty(self, status: int, retry_after: str | None = None) -> None:
+        self.send_response(status)
+        if retry_after is not None:
+            self.send_header("Retry-After", retry_after)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _send_html(self, body, etag: str | None = None) -> None:
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(200)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if self.server.fixture.gzip and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):  # noqa: N802 (http.server naming)
+        """Record the request, optionally sleep, then return the page."""
+        srv = self.server.fixture
+        with srv.lock:
+            srv.requests.append((self.path, time.monotonic()))
+            srv.connections.add(self.client_address)
+            srv.in_flight += 1
+            srv.max_in_flight = max(srv.max_in_flight, srv.in_flight)
+        try:
+            if srv.delay:
+                time.sleep(srv.delay)
+            if self.path == "/robots.txt":
+                if srv.robots_txt is None:
+                    self._empty(404)
+                else:
+                    self._send_html(srv.robots_txt)
+                return
+            if self.path.startswith("/result/"):
+                self._send_html(make_detail(result_id_of(self.path)))
+                return
+            page = int(parse_qs(urlparse(self.path).query).get("page", ["1"])[0])
+            with srv.lock:
+                plan = srv.status_plan.get(page)
+                planned = plan.pop(0) if plan else None
+            if planned == "empty":
+                self._empty(200)
+                return
+            if page in srv.fail_pages or planned or srv._roll_error():
+                self._empty(planned or 503, srv.retry_after)
+                return
+            body = srv.page_html(page).encode("utf-8")
+            etag = '"%s"' % hashlib.sha1(body).hexdigest()
+            if srv.etags and self.headers.get("If-None-Match") == etag:
+                with srv.lock:
+                    srv.not_modified += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self._send_html(body, etag if srv.etags else None)
+        finally:
+            with srv.lock:
+                srv.in_flight -= 1
+
+    def log_message(self, *_):
+        """Keep test and benchmark output quiet."""
+
+
+def start_server(pages: int = 5, rows_per_page: int = 4, recorded: list[str] | None = None,
+                 delay: float = 0.0, error_rate: float = 0.0, seed: int = 0) -> GradCafeServer:
+    """Start a fixture server on a free local port; call .stop() when done."""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    srv = GradCafeServer(httpd, pages, rows_per_page, recorded, seed)
+    srv.delay, srv.error_rate = delay, error_rate
+    httpd.fixture = srv
+    return srv.start()
+
+
+# ---------- assertion helpers ----------
+
+def result_id_of(url: str) -> int:
+    """Result id in a result page URL or path (".../result/7" -> 7)."""
+    return int(urlparse(url).path.rsplit("/", 1)[1])
+
+
+def result_ids(rows) -> list[int]:
+    """Result ids of scraped rows (the number ending each applicant_url), in order."""
+    return [result_id_of(r["applicant_url"]) for r in rows]
+
+
+def pages_requested(server: GradCafeServer) -> list[int]:
+    """Survey page numbers the server was asked for, in arrival order."""
+    return [int(p.rsplit("=", 1)[1]) for p, _ in server.requests if "page=" in p]
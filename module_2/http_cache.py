@@ -0,0 +1,165 @@
+# http_cache.py
+# Persistent on-disk response cache for scrape.fetch().
+# - One body file + one small JSON meta file per URL (sha256 of the URL).
+# - Stores ETag / Last-Modified so stale entries are revalidated with a
+#   conditional GET (If-None-Match / If-Modified-Since); a 304 reuses the body.
+# - Entries younger than `ttl` seconds are served without any request.
+# - Total body bytes are bounded by `max_bytes`; least recently used go first.
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+# ----------------------------- entry ----------------------------- #
+
+class CacheEntry:
+    """Metadata for one cached URL (body is read lazily from disk)."""
+
+    def __init__(self, url: str, etag: str = "", last_modified: str = "",
+                 stored_at: float = 0.0, last_used: float = 0.0, size: int = 0):
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.last_used = last_used
+        self.size = size
+
+    def to_dict(self) -> dict:
+        """Plain dict for the meta file."""
+        return dict(self.__dict__)
+
+# ----------------------------- cache ----------------------------- #
+
+class ResponseCache:
+    """Size-bounded URL -> body cache with HTTP validators; thread-safe."""
+
+    def __init__(self, path: str = ".http_cache", ttl: float = 600.0,
+                 max_bytes: int = 256 * 1024 * 1024, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._index: dict[str, CacheEntry] = {}
+        self.stats = {"fresh": 0, "revalidated": 0, "miss": 0, "stored": 0, "evicted": 0}
+        os.makedirs(path, exist_ok=True)
+        self._load_index()
+
+    # --- file layout ---
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _files(self, key: str) -> tuple[str, str]:
+        base = os.path.join(self.path, key)
+        return base + ".body", base + ".meta.json"
+
+    def _load_index(self) -> None:
+        """Scan meta files once at start-up; drop entries whose body is missing."""
+        for name in os.listdir(self.path):
+            if not name.endswith(".meta.json"):
+                continue
+            key = name[: -len(".meta.json")]
+            body_path, meta_path = self._files(key)
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    entry = CacheEntry(**json.load(f))
+            except (OSError, ValueError, TypeError):
+                continue
+            if os.path.exists(body_path):
+                self._index[key] = entry
+
+    def _write_meta(self, key: str, entry: CacheEntry) -> None:
+        _, meta_path = self._files(key)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(entry.to_dict(), f)
+
+    def _remove(self, key: str) -> None:
+        for p in self._files(key):
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+        self._index.pop(key, None)
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until total size fits (lock held)."""
+        total = sum(e.size for e in self._index.values())
+        for key, entry in sorted(self._index.items(), key=lambda kv: kv[1].last_used):
+            if total <= self.max_bytes:
+                break
+            total -= entry.size
+            self._remove(key)
+            self.stats["evicted"] += 1
+
+    # --- public API ---
+
+    def lookup(self, url: str) -> CacheEntry | None:
+        """Return the entry for url, or None."""
+        with self._lock:
+            return self._index.get(self._key(url))
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """True while the entry is younger than ttl."""
+        return self._clock() - entry.stored_at < self.ttl
+
+    def body(self, url: str) -> str | None:
+        """Read the cached body for url and mark it recently used."""
+        key = self._key(url)
+        body_path, _ = self._files(key)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            try:
+                with open(body_path, "r", encoding="utf-8") as f:
+                    text = f.read()
+            except OSError:
+                self._remove(key)
+                return None
+            entry.last_used = self._clock()
+            self._write_meta(key, entry)
+            return text
+
+    @staticmethod
+    def conditional_headers(entry: CacheEntry | None) -> dict:
+        """If-None-Match / If-Modified-Since for a stale entry."""
+        headers = {}
+        if entry and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def refresh(self, url: str) -> None:
+        """A 304 came back: the stored body is current again."""
+        key = self._key(url)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry:
+                entry.stored_at = entry.last_used = self._clock()
+                self._write_meta(key, entry)
+
+    def store(self, url: str, text: str, headers) -> None:
+        """Save a 200 body and its validators, then enforce the size bound."""
+        key = self._key(url)
+        body_path, _ = self._files(key)
+        data = text.encode("utf-8")
+        now = self._clock()
+        entry = CacheEntry(url, headers.get("ETag", "") or "", headers.get("Last-Modified", "") or "",
+                           stored_at=now, last_used=now, size=len(data))
+        with self._lock:
+            with open(body_path, "wb") as f:
+                f.write(data)
+            self._write_meta(key, entry)
+            self._index[key] = entry
+            self.stats["stored"] += 1
+            self._evict()
+
+    def count(self, outcome: str) -> None:
+        """Bump one of the fresh/revalidated/miss counters."""
+        with self._lock:
+            self.stats[outcome] += 1
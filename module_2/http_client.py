@@ -0,0 +1,141 @@
+# http_client.py
+# HTTP client layer for the scraper: one urllib3.PoolManager plus counters.
+# - Advertises every content coding urllib3 can decode (gzip, deflate; br and
+#   zstd when brotli / zstandard are installed) and decompresses bodies chunk
+#   by chunk while they stream off the socket.
+# - Connection pools are sized to the fetch concurrency and use TCP keep-alive,
+#   so parallel requests to one host reuse connections instead of opening
+#   throwaway ones ("Connection pool is full, discarding connection").
+# - Every request reports wire bytes, decoded bytes, connect time (DNS + TCP +
+#   TLS, 0 on a kept-alive connection), time to first byte and total latency;
+#   totals are kept in `stats` (thread-safe).
+
+import socket
+import threading
+import time
+from dataclasses import dataclass
+
+import urllib3
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+KEEPALIVE_OPTIONS = HTTPConnection.default_socket_options + [
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+]
+
+_timing = threading.local()  # connect seconds spent by the current thread's request
+
+
+class _TimedConnect:
+    """Mixin: add the time spent in connect() to the calling thread's tally."""
+
+    def connect(self):
+        start = time.monotonic()
+        try:
+            super().connect()
+        finally:
+            _timing.connect = getattr(_timing, "connect", 0.0) + time.monotonic() - start
+
+
+class _TimedHTTPConnection(_TimedConnect, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnect, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+@dataclass
+class Response:
+    """A fully read response and what it cost."""
+    status: int
+    headers: urllib3.HTTPHeaderDict
+    data: bytes        # decoded body
+    wire_bytes: int    # body bytes received on the socket (compressed size)
+    ttfb: float        # seconds until the response headers arrived (connect included)
+    elapsed: float     # seconds until the last body byte was read
+    connect: float = 0.0  # seconds opening a new connection; 0 when one was reused
+
+    @property
+    def encoding(self) -> str:
+        """Content-Encoding the server used ('' for identity)."""
+        return self.headers.get("Content-Encoding", "") or ""
+
+
+class HttpClient:
+    """GET-only wrapper around a PoolManager with compression and counters."""
+
+    def __init__(self, user_agent: str = "Mozilla/5.0", maxsize: int = 4,
+                 compress: bool = True, chunk_size: int = 64 * 1024, num_pools: int = 4):
+        self.compress = compress
+        self.chunk_size = chunk_size
+        self.num_pools = num_pools
+        self._headers = {"User-Agent": user_agent}
+        if compress:
+            self._headers.update(urllib3.make_headers(accept_encoding=True))
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "wire_bytes": 0, "body_bytes": 0, "seconds": 0.0}
+        self.pool = self._pool_manager(maxsize)
+
+    def _pool_manager(self, maxsize: int) -> urllib3.PoolManager:
+        self.maxsize = max(1, int(maxsize))
+        pm = urllib3.PoolManager(num_pools=self.num_pools, maxsize=self.maxsize,
+                                 block=False, headers=self._headers,
+                                 socket_options=KEEPALIVE_OPTIONS)
+        pm.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool,
+                                     "https": _TimedHTTPSConnectionPool}
+        return pm
+
+    @property
+    def headers(self) -> dict:
+        """Default request headers (User-Agent, Accept-Encoding)."""
+        return self.pool.headers
+
+    def ensure_maxsize(self, maxsize: int) -> None:
+        """Grow the per-host pool to at least `maxsize` connections."""
+        if maxsize > self.maxsize:
+            old, self.pool = self.pool, self._pool_manager(maxsize)
+            old.clear()
+
+    def get(self, url: str, headers: dict | None = None, **kwargs) -> Response:
+        """
+        GET url and read the whole body, decompressing as it streams in.
+        `headers` are merged over the defaults; kwargs go to urlopen (retries, timeout).
+        """
+        merged = {**self.pool.headers, **headers} if headers else None
+        _timing.connect = 0.0
+        start = time.monotonic()
+        r = self.pool.request("GET", url, headers=merged, preload_content=False, **kwargs)
+        ttfb = time.monotonic() - start
+        connect = _timing.connect
+        try:
+            data = b"".join(r.stream(self.chunk_size, decode_content=True))
+            wire = r.tell()
+        finally:
+            r.release_conn()  # hand the kept-alive connection back to the pool
+        resp = Response(r.status, r.headers, data, wire, ttfb, time.monotonic() - start, connect)
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["wire_bytes"] += wire
+            self.stats["body_bytes"] += len(data)
+            self.stats["seconds"] += resp.elapsed
+        return resp
+
+    def summary(self) -> dict:
+        """Totals plus per-request averages and the compression ratio."""
+        with self._lock:
+            s = dict(self.stats)
+        n = s["requests"] or 1
+        s["avg_wire_bytes"] = s["wire_bytes"] // n
+        s["avg_latency"] = round(s["seconds"] / n, 4)
+        s["compression"] = round(s["body_bytes"] / s["wire_bytes"], 2) if s["wire_bytes"] else None
+        s["seconds"] = round(s["seconds"], 3)
+        return s
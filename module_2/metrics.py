@@ -0,0 +1,97 @@
+# metrics.py
+# Run instrumentation for the scraper.
+# - Spans: named durations (connect, ttfb, download, parse, extract, ...),
+#   every sample kept so the report can give exact percentiles.
+# - Counters: pages, rows, empty pages, retries, bytes, ...
+# - report() / write(): one JSON document per run (milliseconds for spans).
+# Thread-safe; worker processes fill their own RunMetrics and the parent
+# merges the samples back (see pipeline._parse_worker).
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100) of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))  # ceil(n * q / 100)
+    return sorted_values[int(rank) - 1]
+
+
+class RunMetrics:
+    """Span samples and counters for one scrape run."""
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self._t0 = clock()
+        self.spans: dict[str, list[float]] = {}
+        self.counters: dict[str, int] = {}
+
+    @contextmanager
+    def span(self, name: str):
+        """Time the with-block as one `name` sample."""
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.add(name, self._clock() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.spans.setdefault(name, []).append(seconds)
+
+    def incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def merge(self, spans: dict[str, list[float]]) -> None:
+        """Add samples recorded elsewhere (e.g. in a parser process)."""
+        with self._lock:
+            for name, values in spans.items():
+                self.spans.setdefault(name, []).extend(values)
+
+    def summary(self, name: str) -> dict:
+        """count / total / mean / p50 / p90 / p99 / max of one span, in milliseconds."""
+        with self._lock:
+            values = sorted(self.spans.get(name, []))
+        ms = lambda s: round(s * 1000, 3)  # noqa: E731
+        return {"count": len(values), "total_ms": ms(sum(values)),
+                "mean_ms": ms(sum(values) / len(values)) if values else 0.0,
+                "p50_ms": ms(percentile(values, 50)), "p90_ms": ms(percentile(values, 90)),
+                "p99_ms": ms(percentile(values, 99)), "max_ms": ms(values[-1] if values else 0.0)}
+
+    def report(self, **extra) -> dict:
+        """The whole run as a JSON-ready dict; `extra` keys are added at the top level."""
+        elapsed = self._clock() - self._t0
+        with self._lock:
+            counters, names = dict(self.counters), sorted(self.spans)
+        pages = counters.get("pages", 0)
+        return {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "elapsed_s": round(elapsed, 3),
+            "pages_per_s": round(pages / elapsed, 3) if elapsed else 0.0,
+            "rows_per_s": round(counters.get("rows", 0) / elapsed, 3) if elapsed else 0.0,
+            "counters": counters,
+            "spans": {name: self.summary(name) for name in names},
+            **extra,
+        }
+
+    def write(self, path: str, **extra) -> dict:
+        """Write report() to path (atomic replace) and return it."""
+        data = self.report(**extra)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+        return data
+
+
+def span(metrics: RunMetrics | None, name: str):
+    """metrics.span(name), or a no-op when instrumentation is off."""
+    return metrics.span(name) if metrics is not None else nullcontext()
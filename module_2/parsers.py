@@ -0,0 +1,239 @@
+# parsers.py
+# lxml fast path for the Grad Café survey extractors, plus the row grouping
+# shared by both backends.
+# Mirrors scrape.py's BeautifulSoup extractors field for field: cells are
+# taken by position and each page is grouped into results with one linear
+# scan, while the C-backed libxml2 parser builds the tree. scrape.py keeps the
+# BeautifulSoup version as the reference and picks a backend with
+# parse_page(html, parser=...).
+# lxml is optional: without it only the "bs4" backend is available.
+
+import re
+from contextlib import nullcontext
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+try:
+    import lxml.html as lxml_html
+except ImportError:  # pragma: no cover - optional dependency
+    lxml_html = None
+
+available = lxml_html is not None
+
+_SKIP_TEXT = {"script", "style", "template"}  # BeautifulSoup's get_text() skips these too
+
+# details-row badges: one precompiled alternation classifies the badge by
+# prefix (the named group that matched) and captures its number in the same pass
+METRIC_KEYS = ("gre", "gre_v", "gre_aw", "gpa")
+_METRIC_RE = re.compile(r"""
+    ^(?: (?P<gre>GRE(?=\s+[0-9]))
+       | (?P<gre_v>GRE\s*V\b)
+       | (?P<gre_aw>GRE\s*AW\b)
+       | (?P<gpa>GPA\b) )
+    [^0-9]*(?P<value>[0-9]+(?:\.[0-9]+)?)?
+""", re.I | re.X)
+
+def parse_metric(txt: str) -> tuple[str, float | int | None] | None:
+    """
+    ('gre' | 'gre_v' | 'gre_aw' | 'gpa', number) for a details badge, else None.
+    The number is an int for whole values ('GRE 320' -> 320), a float otherwise
+    ('GPA 3.80' -> 3.8), or None when the badge has no digits.
+    """
+    m = _METRIC_RE.match(txt)
+    if m is None:
+        return None
+    key = next(k for k in METRIC_KEYS if m.group(k) is not None)
+    value = m.group("value")
+    if value is None:
+        return key, None
+    return key, float(value) if "." in value else int(value)
+
+def empty_details() -> dict:
+    """Details-row fields of a result without details: badge text "" and numbers None."""
+    return {"term": "", "student_type": "", "gre": "", "gre_v": "", "gre_aw": "", "gpa": "",
+            "gre_num": None, "gre_v_num": None, "gre_aw_num": None, "gpa_num": None}
+
+# ---------- pre-filter (both backends) ----------
+
+def table_region(html: str) -> str:
+    """
+    Cut the page down to the span from the first <table> to the last </table>.
+    Navigation, scripts, ads and footer never reach the parser; a page with no
+    table yields "" (no rows).
+    """
+    lower = html.lower()
+    start = lower.find("<table")
+    if start < 0:
+        return ""
+    end = lower.rfind("</table>")
+    return html[start:end + len("</table>")] if end > start else html[start:]
+
+def has_result_cells(html: str) -> bool:
+    """
+    Cheap check, no parsing: does the results table hold any <td>? A page past
+    the end of the survey has only the header row, so False means no rows.
+    """
+    return "<td" in table_region(html).lower()
+
+# ---------- row grouping (both backends) ----------
+
+def group_rows(elements, tag_of, classes_of):
+    """
+    Single pass over a row container's child elements.
+    A <tr> without class starts a result; up to two immediately following
+    'tw-border-none' rows (any casing) become its details and comments rows.
+    Anything else ends the current result. Yields (parent, details, comments).
+    """
+    record = None
+    for el in elements:
+        classes = classes_of(el) if tag_of(el) == "tr" else None
+        if classes is not None and not classes:
+            if record:
+                yield tuple(record)
+            record = [el, None, None]
+        elif (record and record[2] is None and classes
+              and any(c.lower() == "tw-border-none" for c in classes)):
+            record[1 if record[1] is None else 2] = el
+        elif record:
+            yield tuple(record)
+            record = None
+    if record:
+        yield tuple(record)
+
+# ---------- small helpers ----------
+
+def _text(el) -> str:
+    """Same result as BeautifulSoup get_text(strip=True): each string stripped, then joined."""
+    if el is None:
+        return ""
+    parts = []
+
+    def walk(node):
+        if node.text:
+            parts.append(node.text)
+        for child in node:
+            if isinstance(child.tag, str) and child.tag not in _SKIP_TEXT:
+                walk(child)
+            if child.tail:
+                parts.append(child.tail)
+
+    walk(el)
+    return "".join(p.strip() for p in parts)
+
+def _kids(el, tag: str) -> list:
+    """Direct child elements with the given tag (no subtree search)."""
+    return [c for c in el if c.tag == tag] if el is not None else []
+
+def _kid(el, tag: str, n: int = 1):
+    """n-th (1-based) direct child with the given tag, else None."""
+    kids = _kids(el, tag)
+    return kids[n - 1] if len(kids) >= n else None
+
+def _first(el, tag: str, test=lambda _: True):
+    """First descendant (document order) with tag that passes test, else None."""
+    if el is None:
+        return None
+    for node in el.iterdescendants(tag):
+        if test(node):
+            return node
+    return None
+
+def _classes(el) -> list[str]:
+    return (el.get("class") or "").split()
+
+def has_class(tr, cls: str) -> bool:
+    """True if tr has the given class among its classes."""
+    return cls in _classes(tr)
+
+# ---------- extractors for each row-kind ----------
+
+def extract_first_dataset(entry, origin: str) -> dict:
+    """Parent row; same columns as scrape.extract_first_dataset."""
+    tds = _kids(entry, "td")
+    cell = lambda n: tds[n - 1] if len(tds) >= n else None  # noqa: E731
+
+    university_name = _text(_kid(_kid(cell(1), "div"), "div"))
+    div2 = _kid(cell(2), "div")
+    program_name = _text(_kid(div2, "span", 1))
+    masters_phd = _text(_kid(div2, "span", 2))
+    added_on = _text(cell(3))
+    status_text = _text(_kid(cell(4), "div"))
+
+    # td5: 2nd anchor of the first <dt>, or its only anchor
+    td5 = cell(5)
+    dt1 = _first(td5, "dt")
+    anchors = list(dt1.iterdescendants("a")) if dt1 is not None else []
+    a = anchors[min(1, len(anchors) - 1)] if anchors else None
+
+    # fallback: any anchor in td5 that looks like a result link
+    if a is None:
+        a = _first(td5, "a", lambda x: "/result/" in (x.get("href") or ""))
+
+    if a is not None and a.get("href") is not None:
+        parts = urlsplit(urljoin(origin, a.get("href")))
+        url_link = urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+    else:
+        url_link = ""
+
+    return {
+        "university_name": university_name,
+        "program_name": program_name,
+        "masters_phd": masters_phd,
+        "added_on": added_on,
+        "status": status_text,
+        "applicant_url": url_link,
+    }
+
+def extract_second_dataset(entry) -> dict:
+    """Details row (class 'tw-border-none'); same keys as scrape.extract_second_dataset."""
+    out = empty_details()
+    if entry is None or not has_class(entry, "tw-border-none"):
+        return out
+
+    divs = [d for td in _kids(entry, "td") for box in _kids(td, "div") for d in _kids(box, "div")]
+    out["term"] = _text(divs[1]) if len(divs) > 1 else ""
+    out["student_type"] = _text(divs[2]) if len(divs) > 2 else ""
+
+    for i in range(3, min(len(divs), 7)):
+        txt = _text(divs[i])
+        hit = parse_metric(txt) if txt else None
+        if hit:
+            out[hit[0]], out[hit[0] + "_num"] = txt, hit[1]
+    return out
+
+def extract_comments(entry) -> str:
+    """Comments row (class 'tw-border-none'): text of the first <p> in its cells."""
+    if entry is None or not has_class(entry, "tw-border-none"):
+        return ""
+    for td in _kids(entry, "td"):
+        p = _first(td, "p")
+        if p is not None:
+            return _text(p)
+    return ""
+
+# ---------- page ----------
+
+def parse_page(html: str, origin: str, metrics=None) -> list[dict]:
+    """
+    lxml twin of scrape.parse_page_bs4: parent + details + comments rows per result.
+    With `metrics` (metrics.RunMetrics) tree building and row extraction are
+    timed as the "parse" and "extract" spans.
+    """
+    span = metrics.span if metrics is not None else lambda _: nullcontext()
+    with span("parse"):
+        html = table_region(html)
+        if not html:
+            return []
+        root = lxml_html.fragment_fromstring(html, create_parent="div")
+
+    rows = []
+    with span("extract"):
+        for container in root.iter("table", "thead", "tbody", "tfoot"):
+            children = [c for c in container if isinstance(c.tag, str)]  # skip comments
+            for parent, tr2, tr3 in group_rows(children, lambda el: el.tag, _classes):
+                row1 = extract_first_dataset(parent, origin)
+                row2 = extract_second_dataset(tr2) if tr2 is not None else {}
+                comments = extract_comments(tr3) if tr3 is not None else ""
+                if row1["university_name"] != "":
+                    rows.append({**row1, **row2, "comments": comments})
+    root.clear()  # drop the page tree as soon as its rows are out
+    return rows
@@ -0,0 +1,110 @@
+# pipeline.py
+# Two-stage fetch -> parse pipeline for the scraper.
+# - Stage 1 (I/O): a feeder thread drains the page fetcher (itself a thread
+#   pool) and pushes raw HTML onto a bounded queue. When the queue is full the
+#   feeder blocks, so fetching never runs more than `queue_size` pages ahead.
+# - Stage 2 (CPU): a process pool parses pages outside the GIL. At most
+#   2 x parse_workers parses are pending; results come back in page order.
+#   Parse/extract timings from the workers are merged into the caller's metrics.
+#   A page without result cells ends the feed, so fetching stops at the end of
+#   the survey rather than filling the queue with empty pages.
+#   Workers are started by a forkserver, never forked from this process: the
+#   fetch threads and their locks are already running, and a forked child could
+#   inherit a lock held by one of them and deadlock.
+
+import multiprocessing
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+_DONE = object()  # end-of-pages marker on the queue
+
+
+def mp_context():
+    """forkserver where the platform has it (POSIX), else spawn (Windows)."""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _parse_worker(html: str, parser: str, timed: bool = False):
+    """Runs in a worker process: parse one page; returns (rows, span samples or None)."""
+    import scrape  # imported lazily so the parent can be `python scrape.py`
+    from metrics import RunMetrics
+    scrape.metrics = RunMetrics() if timed else None
+    rows = scrape.parse_page(html, parser)
+    return rows, scrape.metrics.spans if timed else None
+
+
+def _feed(pages, q: queue.Queue, stop: threading.Event, is_last=None) -> None:
+    """
+    Feeder thread: copy (page, html) into the bounded queue until told to stop,
+    or until is_last(html) says nothing comes after this page.
+    """
+    try:
+        for item in pages:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if stop.is_set() or (is_last is not None and is_last(item[1])):
+                break
+        q.put(_DONE)
+    except Exception as exc:  # hand fetch errors to the consumer  # noqa: BLE001
+        q.put(exc)
+    finally:
+        close = getattr(pages, "close", None)
+        if close:
+            close()
+
+
+def parse_pipeline(pages, parser: str, parse_workers: int = 2, queue_size: int = 16,
+                   metrics=None, is_last=None):
+    """
+    Yield (page_number, rows) for an iterable of (page_number, html), in order.
+    Fetching (whatever drives `pages`) and parsing overlap; both are bounded.
+    Stop early by closing the generator (break in a for loop).
+    `is_last(html)` (e.g. not parsers.has_result_cells) ends the input at that
+    page: an endless fetcher is closed there instead of running up to
+    queue_size + 2 x parse_workers pages past the end of the survey.
+    """
+    q: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+    stop = threading.Event()
+    feeder = threading.Thread(target=_feed, args=(pages, q, stop, is_last), name="feed",
+                              daemon=True)
+    feeder.start()
+
+    pool = ProcessPoolExecutor(max_workers=max(1, parse_workers), mp_context=mp_context())
+    pending = deque()
+    finished = False
+    try:
+        while pending or not finished:
+            # keep every worker busy (plus one spare page each) while input lasts
+            while not finished and len(pending) < 2 * max(1, parse_workers):
+                item = q.get()
+                if item is _DONE:
+                    finished = True
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    page, html = item
+                    pending.append((page, pool.submit(_parse_worker, html, parser,
+                                                      metrics is not None)))
+            if pending:
+                page, fut = pending.popleft()
+                rows, spans = fut.result()
+                if spans:
+                    metrics.merge(spans)
+                yield page, rows
+    finally:
+        stop.set()
+        while feeder.is_alive():  # unblock a feeder waiting on a full queue
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                feeder.join(timeout=0.05)
+        for _, fut in pending:
+            fut.cancel()
+        pool.shutdown(wait=True, cancel_futures=True)
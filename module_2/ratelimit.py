@@ -0,0 +1,200 @@
+# ratelimit.py
+# Politeness controls for the Grad Café scraper.
+# - TokenBucket: refills at `rate` tokens/second up to `capacity`.
+# - AimdLimit: in-flight cap that grows by one per healthy window and halves
+#   on throttling (429/503/timeouts).
+# - HostRateLimiter: one bucket + one in-flight limit per host.
+# - backoff_delay / parse_retry_after: retry timing helpers.
+# All are thread-safe so the concurrent page fetcher can share them.
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# --------------------------- token bucket --------------------------- #
+
+class TokenBucket:
+    """Classic token bucket; acquire() blocks until a token is available."""
+
+    def __init__(self, rate: float, capacity: float = 1.0,
+                 clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def defer(self, seconds: float) -> None:
+        """Hand out no tokens for the next `seconds` (e.g. a Retry-After)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+
+    def _refill(self) -> None:
+        """Add tokens for the time elapsed since the last refill (lock held)."""
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self) -> float:
+        """Take a token if possible and return 0.0; else return seconds to wait."""
+        with self._lock:
+            self._refill()
+            if self._clock() < self._blocked_until:
+                return self._blocked_until - self._clock()
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+
+    def acquire(self) -> None:
+        """Block until one token has been taken."""
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            self._sleep(wait)
+
+# ------------------------- adaptive in-flight ------------------------- #
+
+class AimdLimit:
+    """
+    Additive-increase / multiplicative-decrease cap on requests in flight.
+    +1 after `limit` consecutive healthy responses (latency <= latency_target),
+    x`decrease` on a throttle signal, at most once per `cooldown` seconds.
+    """
+
+    def __init__(self, initial: int = 1, minimum: int = 1, maximum: int = 8,
+                 latency_target: float = 5.0, decrease: float = 0.5,
+                 cooldown: float = 1.0, clock=time.monotonic):
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum))
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.latency_target = latency_target
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self._clock = clock
+        self._in_flight = 0
+        self._healthy = 0
+        self._last_cut = float("-inf")
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        """Block until fewer than int(limit) requests are in flight."""
+        with self._cond:
+            while self._in_flight >= int(self.limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self, latency: float) -> None:
+        """Healthy and fast: count toward the next +1."""
+        with self._cond:
+            if latency > self.latency_target:
+                self._healthy = 0  # slow: hold steady
+                return
+            self._healthy += 1
+            if self._healthy >= int(self.limit):
+                self._healthy = 0
+                self.limit = min(self.maximum, self.limit + 1)
+                self._cond.notify_all()
+
+    def on_throttle(self) -> None:
+        """429/503/timeout: cut the limit (once per cooldown)."""
+        with self._cond:
+            now = self._clock()
+            self._healthy = 0
+            if now - self._last_cut >= self.cooldown:
+                self._last_cut = now
+                self.limit = max(self.minimum, self.limit * self.decrease)
+
+# ------------------------- per-host limiter ------------------------- #
+
+class HostRateLimiter:
+    """
+    Per-host requests/second budget plus an in-flight limit.
+    adaptive=False: fixed max_in_flight. adaptive=True: AIMD from 1 up to max_in_flight.
+    Use as:  with limiter.slot(url): fetch(url)   then report the outcome.
+    """
+
+    def __init__(self, rate: float, max_in_flight: int = 1, burst: float = 1.0,
+                 adaptive: bool = False):
+        self.rate = rate
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.burst = burst
+        self.adaptive = adaptive
+        self._buckets: dict[str, TokenBucket] = {}
+        self._limits: dict[str, AimdLimit] = {}
+        self._lock = threading.Lock()
+
+    def _for_host(self, url: str) -> tuple[TokenBucket, AimdLimit]:
+        """Return (bucket, limit) for the url's host, creating them on first use."""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+                start = 1 if self.adaptive else self.max_in_flight
+                self._limits[host] = AimdLimit(start, maximum=self.max_in_flight)
+            return self._buckets[host], self._limits[host]
+
+    @contextmanager
+    def slot(self, url: str):
+        """Hold an in-flight slot and one token for the url's host."""
+        bucket, limit = self._for_host(url)
+        limit.acquire()
+        try:
+            bucket.acquire()
+            yield
+        finally:
+            limit.release()
+
+    def success(self, url: str, latency: float) -> None:
+        """Report a good response (only matters when adaptive)."""
+        if self.adaptive:
+            self._for_host(url)[1].on_success(latency)
+
+    def throttled(self, url: str) -> None:
+        """Report a throttle signal (429/503/timeout); only matters when adaptive."""
+        if self.adaptive:
+            self._for_host(url)[1].on_throttle()
+
+    def pause(self, url: str, seconds: float) -> None:
+        """Send nothing to the url's host for `seconds` (Retry-After)."""
+        self._for_host(url)[0].defer(seconds)
+
+    def in_flight_limit(self, url: str) -> int:
+        """Current in-flight cap for the url's host."""
+        return int(self._for_host(url)[1].limit)
+
+# ----------------------------- retry timing ----------------------------- #
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0, rng=random.random) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt))."""
+    return rng() * min(cap, base * (2 ** attempt))
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After as seconds (delta-seconds or HTTP-date); None if absent/invalid."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
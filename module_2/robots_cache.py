@@ -0,0 +1,185 @@
+# robots_cache.py
+# robots.txt kept on disk between runs.
+# - RobotsCache stores each origin's robots.txt (status, body, fetch time) in
+#   one JSON file and re-downloads it only when older than `ttl` seconds.
+# - RobotsPolicy wraps the parsed file: can_fetch(url) for any URL on that
+#   origin (survey and result pages alike, no network), plus Crawl-delay and
+#   Request-rate turned into a requests/second ceiling for the rate limiter.
+#   Allow/Disallow come from urllib.robotparser; Crawl-delay and Request-rate
+#   are read here, because robotparser drops fractional delays ("2.5") and
+#   rates with a unit ("1/5s").
+# Status handling follows RFC 9309: 4xx means no restrictions; 5xx or an
+# unreachable host means full disallow, unless an older copy is on disk.
+
+import json
+import os
+import re
+import threading
+import time
+from urllib import robotparser
+from urllib.parse import urlsplit
+
+
+_RATE_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*/\s*(\d+(?:\.\d+)?)\s*([smh]?)$", re.I)
+_UNIT_SECONDS = {"": 1, "s": 1, "m": 60, "h": 3600}
+
+
+def _group_fields(content: str, user_agent: str) -> dict:
+    """
+    Lowercased field -> first value in the robots.txt group for `user_agent`,
+    picked like robotparser does: the first group naming the agent's product
+    token ("mozilla" for "Mozilla/5.0"), else the "*" group.
+    """
+    token = user_agent.split("/")[0].lower()
+    groups, agents, fields, in_rules = [], [], {}, False
+    for line in content.splitlines():
+        name, sep, value = line.split("#", 1)[0].partition(":")
+        if not sep:
+            continue
+        name, value = name.strip().lower(), value.strip()
+        if name == "user-agent":
+            if in_rules:  # a User-agent after rules starts the next group
+                groups.append((agents, fields))
+                agents, fields, in_rules = [], {}, False
+            agents.append(value.lower())
+        else:
+            in_rules = True
+            fields.setdefault(name, value)
+    groups.append((agents, fields))
+    for agents, fields in groups:
+        if any(a != "*" and a in token for a in agents):
+            return fields
+    return next((fields for agents, fields in groups if "*" in agents), {})
+
+
+def parse_crawl_delay(value: str | None) -> float | None:
+    """Seconds of a Crawl-delay value ("4", "2.5"); None if missing or unreadable."""
+    try:
+        delay = float(value)
+    except (TypeError, ValueError):
+        return None
+    return delay if delay >= 0 else None
+
+
+def parse_request_rate(value: str | None) -> float | None:
+    """Requests/second of a Request-rate value ("1/2", "1/5s", "30/1m"); else None."""
+    m = _RATE_RE.match((value or "").strip())
+    if m is None:
+        return None
+    seconds = float(m.group(2)) * _UNIT_SECONDS[m.group(3).lower()]
+    return float(m.group(1)) / seconds if seconds else None
+
+
+class RobotsPolicy:
+    """Parsed robots.txt for one origin, evaluated for one user agent."""
+
+    def __init__(self, content: str, status: int | None, user_agent: str = "Mozilla/5.0",
+                 loaded_at: float = 0.0):
+        self.user_agent = user_agent
+        self.status = status
+        self.loaded_at = loaded_at
+        self._rp = robotparser.RobotFileParser()
+        fields = {}
+        if status is not None and 400 <= status < 500:
+            self._rp.allow_all = True
+        elif status is None or status >= 500:
+            self._rp.disallow_all = True
+        else:
+            self._rp.parse(content.splitlines())
+            fields = _group_fields(content, user_agent)
+        self._crawl_delay = parse_crawl_delay(fields.get("crawl-delay"))
+        self._request_rate = parse_request_rate(fields.get("request-rate"))
+
+    def can_fetch(self, url: str) -> bool:
+        return bool(self._rp.can_fetch(self.user_agent, url))
+
+    @property
+    def crawl_delay(self) -> float | None:
+        """Crawl-delay in seconds for our user agent (or *), else None."""
+        return self._crawl_delay
+
+    @property
+    def request_rate(self) -> float | None:
+        """Request-rate as requests/second for our user agent (or *), else None."""
+        return self._request_rate
+
+    def rate_ceiling(self) -> float | None:
+        """Highest requests/second the file allows (Crawl-delay and Request-rate), else None."""
+        limits = [self.request_rate] if self.request_rate else []
+        if self.crawl_delay:
+            limits.append(1.0 / self.crawl_delay)
+        return min(limits) if limits else None
+
+    def cap_rate(self, rate: float) -> float:
+        """`rate` lowered to the ceiling if robots.txt asks for less."""
+        ceiling = self.rate_ceiling()
+        return min(rate, ceiling) if ceiling else rate
+
+
+class RobotsCache:
+    """
+    robots.txt per origin, persisted in `path` and refreshed after `ttl` seconds.
+    fetch(robots_url) -> (status, text); status None means the host was unreachable.
+    """
+
+    def __init__(self, fetch, path: str = ".robots_cache.json", ttl: float = 24 * 3600,
+                 user_agent: str = "Mozilla/5.0", clock=time.time):
+        self.fetch = fetch
+        self.path = path
+        self.ttl = ttl
+        self.user_agent = user_agent
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._policies: dict[str, RobotsPolicy] = {}
+        self.stats = {"cached": 0, "fetched": 0}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    @staticmethod
+    def origin(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc.lower()}"
+
+    def _save(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp, self.path)
+
+    def content(self, url: str) -> str:
+        """Raw robots.txt text for the url's origin ("" if none)."""
+        self.policy(url)
+        return self._entries.get(self.origin(url), {}).get("content", "")
+
+    def policy(self, url: str) -> RobotsPolicy:
+        """Policy for the url's origin: from memory, from disk if fresh, else downloaded."""
+        origin = self.origin(url)
+        with self._lock:
+            policy = self._policies.get(origin)
+            if policy and self._clock() - policy.loaded_at < self.ttl:
+                return policy
+            entry = self._entries.get(origin)
+            if entry and self._clock() - entry["fetched_at"] < self.ttl:
+                self.stats["cached"] += 1
+            else:
+                status, text = self.fetch(origin + "/robots.txt")
+                self.stats["fetched"] += 1
+                if status is not None and status < 500:
+                    entry = {"status": status, "content": text, "fetched_at": self._clock()}
+                    self._entries[origin] = entry
+                    self._save()
+                elif entry is None:  # unreachable and nothing on disk: disallow, retry next run
+                    entry = {"status": status, "content": "", "fetched_at": self._clock()}
+                # else: server trouble, keep using the older copy for this run
+            # policy kept in memory for ttl from now, whatever the age of the copy
+            policy = RobotsPolicy(entry["content"], entry["status"], self.user_agent,
+                                  self._clock())
+            self._policies[origin] = policy
+            return policy
+
+    def allowed(self, url: str) -> bool:
+        """True if robots.txt lets our user agent fetch url."""
+        return self.policy(url).can_fetch(url)
@@ -1,100 +1,250 @@
-import re
+import os
 import json
 import time
-
-from bs4 import BeautifulSoup, Tag, NavigableString
+import logging
+import argparse
+from collections import deque
+from datetime import date, datetime
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+
+from bs4 import BeautifulSoup, SoupStrainer, Tag
 from urllib.parse import urljoin, urlsplit, urlunsplit, urlparse
 import urllib3
-http = urllib3.PoolManager(headers={"User-Agent": "Mozilla/5.0"})
+
+from ratelimit import HostRateLimiter, backoff_delay, parse_retry_after
+from http_cache import ResponseCache
+from sinks import NdjsonSink, export_json_array, iter_json_array, iter_ndjson
+from checkpoint import Checkpoint, truncate_output
+import parsers
+from pipeline import parse_pipeline
+from archive import PageArchive
+from http_client import HttpClient
+from enrich import DetailEnricher, DetailStore
+from fingerprint import FingerprintStore, page_fingerprint
+from robots_cache import RobotsCache
+from metrics import RunMetrics, span
+
+log = logging.getLogger(__name__)
+
+cache: ResponseCache | None = None  # set by enable_cache(); None = always hit the network
+archive: PageArchive | None = None  # set by enable_archive(); None = fetched pages are not kept
+robots: RobotsCache | None = None  # set by enable_robots(); None = URLs are not checked
+metrics: RunMetrics | None = None  # set by enable_metrics(); None = no timing spans/counters
+user_agent = "Mozilla/5.0"
 
 url_prefix = "https://www.thegradcafe.com/survey/?page="
 target_url = "https://www.thegradcafe.com/survey/"
 results = []
 target_length = 30000
 
-# ---------- small helpers ----------
+# politeness budget: same average rate as the old fixed 2 s sleep,
+# but several requests may be in flight so we never idle on a slow page
+requests_per_second = 0.5
+max_in_flight = 4
+adaptive_concurrency = True  # AIMD: start at 1 in flight, grow while healthy, halve on 429/503
 
-def fetch(url: str) -> str:
-    r = http.request("GET", url, timeout=urllib3.Timeout(connect=5, read=15))
-    return r.data.decode("utf-8", "ignore")
+# transient failures: retried with Retry-After or full-jitter exponential backoff
+max_retries = 4
+backoff_base = 1.0   # seconds; attempt n waits up to base * 2**n
+backoff_cap = 60.0
+_redirects_only = urllib3.Retry(total=None, connect=0, read=0, status=0, other=0, redirect=5)
 
-def t(entry: Tag, selector: str) -> str:
-    """Return stripped text for the first match of CSS selector under entry, else empty string."""
-    node = entry.select_one(selector)
-    return node.get_text(strip=True) if node else ""
+# HTML parser backend for parse_page(): "lxml" (fast, optional) or "bs4" (reference)
+default_parser = "lxml" if parsers.available else "bs4"
 
-def first_tr_sibling_tw(tr: Tag) -> Tag | None:
+# parse stage: 0 = parse on the calling thread; N = process pool of N parsers
+# fed through a bounded queue of at most parse_queue_size fetched pages
+parse_workers = 0
+parse_queue_size = 16
+
+# pages whose row keys repeat an earlier page: this many in a row end the crawl
+max_duplicate_pages = 3
+
+# HTTP client: gzip/deflate (br/zstd if installed) negotiated and decoded while
+# streaming; one kept-alive connection per request in flight
+http = HttpClient(user_agent, maxsize=max_in_flight)
+
+# ---------- small helpers ----------
+
+class Disallowed(RuntimeError):
+    """robots.txt does not let us fetch this URL; never retried."""
+
+class FetchError(RuntimeError):
     """
-    Return the **immediate next** element-sibling <tr> iff it exists
-    and has class 'tw-border-none' (case-insensitive). Otherwise None.
+    Page could not be fetched: 429/5xx status, or an empty body (status 200).
+    Raised instead of handing back an error body; retry_after is in seconds.
     """
-    sib = tr.next_sibling
-    # skip whitespace nodes
-    while sib and isinstance(sib, NavigableString):
-        sib = sib.next_sibling
 
-    # must be a <tr>
-    if not (isinstance(sib, Tag) and sib.name == "tr"):
+    def __init__(self, url: str, status: int, retry_after: float | None = None):
+        super().__init__(f"HTTP {status} for {url}" if status != 200 else f"empty body for {url}")
+        self.url = url
+        self.status = status
+        self.retry_after = retry_after
+
+def _check(r, url: str) -> None:
+    """Raise FetchError for throttling (429) and server errors (5xx)."""
+    if r.status == 429 or r.status >= 500:
+        raise FetchError(url, r.status, parse_retry_after(r.headers.get("Retry-After")))
+
+def enable_cache(path: str = ".http_cache", ttl: float = 600.0,
+                 max_bytes: int = 256 * 1024 * 1024) -> ResponseCache:
+    """Turn on the persistent response cache used by fetch()."""
+    global cache
+    cache = ResponseCache(path, ttl=ttl, max_bytes=max_bytes)
+    return cache
+
+def enable_archive(path: str = "page_archive") -> PageArchive:
+    """Keep a compressed copy of every fetched survey page (see archive.py)."""
+    global archive
+    archive = PageArchive(path)
+    return archive
+
+def configure_http(pool_size: int = max_in_flight, compress: bool = True) -> HttpClient:
+    """Replace the module-level client (pool size, Accept-Encoding on/off)."""
+    global http
+    http = HttpClient(user_agent, maxsize=pool_size, compress=compress)
+    return http
+
+def enable_metrics() -> RunMetrics:
+    """Start collecting timing spans and counters for a run report (metrics.py)."""
+    global metrics
+    metrics = RunMetrics()
+    return metrics
+
+def _count(name: str, n: int = 1) -> None:
+    if metrics is not None:
+        metrics.incr(name, n)
+
+def _get(url: str, extra_headers: dict | None = None):
+    # urllib3 only follows redirects here; retries are fetch_with_retry()'s job
+    r = http.get(url, extra_headers, retries=_redirects_only,
+                 timeout=urllib3.Timeout(connect=5, read=15))
+    if metrics is not None:
+        if r.connect:  # DNS + TCP + TLS; kept-alive requests skip it
+            metrics.add("connect", r.connect)
+            metrics.incr("connections")
+        metrics.add("ttfb", r.ttfb - r.connect)
+        metrics.add("download", r.elapsed - r.ttfb)
+        metrics.incr("requests")
+        metrics.incr("wire_bytes", r.wire_bytes)
+        metrics.incr("body_bytes", len(r.data))
+    return r
+
+def _fresh_from_cache(url: str) -> str | None:
+    """Body of a fresh, non-blank cache entry for url (no request needed), else None."""
+    if cache is None:
         return None
+    entry = cache.lookup(url)
+    if entry and cache.is_fresh(entry):
+        text = cache.body(url)
+        if text is not None and text.strip():
+            cache.count("fresh")
+            return text
+    return None
 
-    # must include class 'tw-border-none' (any casing)
-    classes = sib.get("class") or []
-    if isinstance(classes, str):
-        classes = classes.split()
-
-    return sib if any(c.lower() == "tw-border-none" for c in classes) else None
+def fetch(url: str) -> str:
+    """
+    GET url and return the decoded body; 429/5xx raise FetchError.
+    With the cache on: fresh entries skip the network, stale ones are
+    revalidated with a conditional GET and reused on 304.
+    """
+    if cache is None:
+        r = _get(url)
+        _check(r, url)
+        return r.data.decode("utf-8", "ignore")
+
+    text = _fresh_from_cache(url)
+    if text is not None:
+        return text
+
+    entry = cache.lookup(url)
+    r = _get(url, cache.conditional_headers(entry))
+    if r.status == 304:
+        text = cache.body(url)
+        if text is not None:
+            cache.refresh(url)
+            cache.count("revalidated")
+            return text
+        r = _get(url)  # body vanished from disk; fetch it in full
+
+    _check(r, url)
+    cache.count("miss")
+    text = r.data.decode("utf-8", "ignore")
+    if r.status == 200 and text.strip():  # a blank body is a failure; never serve it again
+        cache.store(url, text, r.headers)
+    return text
+
+def _kids(tag: Tag | None, name: str) -> list[Tag]:
+    """Direct child elements named `name` (no subtree search)."""
+    return [c for c in tag.children if isinstance(c, Tag) and c.name == name] if tag else []
+
+def _kid(tag: Tag | None, name: str, n: int = 1) -> Tag | None:
+    """n-th (1-based) direct child named `name`, else None."""
+    kids = _kids(tag, name)
+    return kids[n - 1] if len(kids) >= n else None
+
+def _txt(tag: Tag | None) -> str:
+    """Stripped text of tag, else empty string."""
+    return tag.get_text(strip=True) if tag else ""
 
 def has_class(tr: Tag, cls: str) -> bool:
     """True if tr has the given class among its classes."""
     classes = tr.get("class", [])
     return cls in classes if isinstance(classes, list) else classes == cls
 
-# ---------- extractors for each row-kind ----------
+def _classes(tag: Tag) -> list[str]:
+    classes = tag.get("class") or []
+    return classes.split() if isinstance(classes, str) else classes
 
-def extract_first_dataset(entry: Tag) -> dict:
+def iter_result_rows(soup: BeautifulSoup):
     """
-    Parent row (<tr> with no class).
-    Expected columns:
-      td1 div>div -> university_name
-      td2 div>span(1) -> program_name, span(2) -> masters_phd
-      td3 -> added_on (we'll keep full text; can post-process to year)
-      td4 div -> parse 'accepted on <date>' / 'rejected on <date>'
-      td5 div dt-1 a-2 -> href (applicant URL)
+    One linear scan over every row container (table/thead/tbody/tfoot):
+    yield (parent_tr, details_tr | None, comments_tr | None) per result.
     """
-    # td1
-    university_name = t(entry, "td:nth-of-type(1) div > div")
-
-    # td2
-    program_name = t(entry, "td:nth-of-type(2) div > span:nth-of-type(1)")
-    masters_phd  = t(entry, "td:nth-of-type(2) div > span:nth-of-type(2)")
-
-    # td3 (keep raw text; optionally pull year elsewhere)
-    added_on = t(entry, "td:nth-of-type(3)")
+    for container in soup.find_all(["table", "thead", "tbody", "tfoot"]):
+        children = [c for c in container.children if isinstance(c, Tag)]  # skip whitespace/comments
+        yield from parsers.group_rows(children, lambda el: el.name, _classes)
 
-    # td4: parse accepted/rejected dates
-    status_text = t(entry, "td:nth-of-type(4) div")
+# only <table> subtrees are turned into a tree (see parsers.table_region for the text cut)
+_only_tables = SoupStrainer("table")
 
-    # td5: href to applicant
-    # inside extract_first_dataset(...)
-    origin = f"{urlparse(target_url).scheme}://{urlparse(target_url).netloc}"
-    a = entry.select_one("td:nth-of-type(5) div dt:nth-of-type(1) > a:nth-of-type(2)")
+# absolute applicant links are built against the site origin (computed once)
+_origin = f"{urlparse(target_url).scheme}://{urlparse(target_url).netloc}"
 
-    # fallback 1: still inside first <dt>, but if there is only one <a>, use it
-    if not a:
-        dt1 = entry.select_one("td:nth-of-type(5) dt:nth-of-type(1)")
-        if dt1:
-            anchors = dt1.select("a")
-            if anchors:
-                a = anchors[min(1, len(anchors) - 1)]  # pick 2nd if exists, else 1st
+# ---------- extractors for each row-kind ----------
 
-    # fallback 2: any anchor in td5 that looks like a result link
-    if not a:
-        a = entry.select_one("td:nth-of-type(5) a[href*='/result/']")
+def extract_first_dataset(entry: Tag) -> dict:
+    """
+    Parent row (<tr> with no class). Cells are taken by position:
+      td1 > div > div -> university_name
+      td2 > div > span(1) -> program_name, span(2) -> masters_phd
+      td3 -> added_on (we'll keep full text; can post-process to year)
+      td4 > div -> status, e.g. 'Accepted on <date>' / 'Rejected on <date>'
+      td5 first dt, 2nd anchor (or the only one) -> href (applicant URL)
+    """
+    tds = _kids(entry, "td")
+    cell = lambda n: tds[n - 1] if len(tds) >= n else None  # noqa: E731
+
+    university_name = _txt(_kid(_kid(cell(1), "div"), "div"))
+    div2 = _kid(cell(2), "div")
+    program_name = _txt(_kid(div2, "span", 1))
+    masters_phd = _txt(_kid(div2, "span", 2))
+    added_on = _txt(cell(3))  # keep raw text; optionally pull year elsewhere
+    status_text = _txt(_kid(cell(4), "div"))
+
+    # td5: 2nd anchor of the first <dt>, or its only anchor
+    td5 = cell(5)
+    dt1 = td5.find("dt") if td5 else None
+    anchors = dt1.find_all("a") if dt1 else []
+    a = anchors[min(1, len(anchors) - 1)] if anchors else None
+
+    # fallback: any anchor in td5 that looks like a result link
+    if a is None and td5:
+        a = td5.find("a", href=lambda h: h and "/result/" in h)
 
     if a and a.has_attr("href"):
-        href = a["href"]
-        abs_url = urljoin(origin, href)  # make absolute
-        parts = urlsplit(abs_url)
+        parts = urlsplit(urljoin(_origin, a["href"]))  # make absolute
         url_link = urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))  # strip ? and #
     else:
         url_link = ""  # no link found (leave empty string)
@@ -111,131 +261,712 @@ def extract_first_dataset(entry: Tag) -> dict:
 def extract_second_dataset(entry: Tag | None) -> dict:
     """
     Second row (tr2): must have class 'tw-border-none'.
-    Cells:
-      td.div.div(2) -> Semester + Year of program start
-      td.div.div(3) -> International/American
-      td.div.div(4..7) -> any of  'GRE 310', 'GRE V 150', 'GRE AW 3.5', 'GPA 3.62'
+    Badges are td > div > div, by position:
+      div(2) -> Semester + Year of program start
+      div(3) -> International/American
+      div(4..7) -> any of  'GRE 310', 'GRE V 150', 'GRE AW 3.5', 'GPA 3.62'
+                   (raw text, plus the number as gre_num / ... / gpa_num)
     Return empty dict if entry isn’t a matching tr2.
     """
-    out = {"term": "", "student_type": "", "gre": "", "gre_v": "", "gre_aw": "", "gpa": ""}
+    out = parsers.empty_details()
     if not entry or not has_class(entry, "tw-border-none"):
         return out
 
-    # Grab all divs inside td>div>div in order
-    divs = entry.select("td > div > div")
-    # Defensive indexing per your position notes
-    out["term"] = divs[1].get_text(strip=True) if len(divs) > 1 else ""
-    out["student_type"] = divs[2].get_text(strip=True) if len(divs) > 2 else ""
+    divs = [d for td in _kids(entry, "td") for box in _kids(td, "div") for d in _kids(box, "div")]
+    out["term"] = _txt(divs[1]) if len(divs) > 1 else ""
+    out["student_type"] = _txt(divs[2]) if len(divs) > 2 else ""
 
     # The remaining slots (4..7) may or may not be present; map by prefix
     for i in range(3, min(len(divs), 7)):
-        txt = divs[i].get_text(strip=True)
+        txt = _txt(divs[i])
         if not txt:
             continue
-        if re.match(r"^GRE\s+[0-9]", txt, re.I):
-            out["gre"] = txt
-        elif re.match(r"^GRE\s*V\b", txt, re.I):
-            out["gre_v"] = txt
-        elif re.match(r"^GRE\s*AW\b", txt, re.I):
-            out["gre_aw"] = txt
-        elif re.match(r"^GPA\b", txt, re.I):
-            out["gpa"] = txt
+        hit = parsers.parse_metric(txt)  # GRE / GRE V / GRE AW / GPA by prefix, and its number
+        if hit:
+            out[hit[0]], out[hit[0] + "_num"] = txt, hit[1]
 
     return out
 
 def extract_comments(entry: Tag | None) -> str:
     """
     Third row (tr3): only if it ALSO has class 'tw-border-none'; else return blank.
-    Content lives under 'td p'.
+    Content is the first <p> in the row's cells.
     """
     if not entry or not has_class(entry, "tw-border-none"):
         return ""
-    p = entry.select_one("td p")
-    return p.get_text(strip=True) if p else ""
+    for td in _kids(entry, "td"):
+        p = td.find("p")
+        if p:
+            return _txt(p)
+    return ""
 
-# ---------- main scraper ----------
+# ---------- page fetching ----------
 
-def scrape_data():
+def _is_timeout(exc: Exception) -> bool:
+    return isinstance(exc, urllib3.exceptions.TimeoutError) or isinstance(
+        getattr(exc, "reason", None), urllib3.exceptions.TimeoutError)
+
+def fetch_with_retry(url: str, limiter: HostRateLimiter) -> str:
     """
-    Iterate pages and build a list of result rows by stitching:
-      parent tr (no class) + its next tr (tw-border-none) + optional 3rd tr (tw-border-none for comments).
-    Stop when results reach target_length or pages exhaust.
+    fetch() under the limiter, retrying transient failures up to max_retries times:
+      - 429/503 and timeouts are throttle signals: the limiter cuts concurrency,
+        and a Retry-After pauses the whole host for that long;
+      - other 5xx, connection errors and empty bodies are retried as well.
+    Without Retry-After the wait is jittered exponential backoff.
+    The last failure is re-raised (FetchError or urllib3 HTTPError).
+    With robots enabled, a URL robots.txt disallows raises Disallowed up front.
+    A fresh cache hit is returned before the limiter is asked for a slot.
     """
-    param_page = 1
-    while len(results) <= target_length:
-        url = url_prefix + str(param_page)
-        html = fetch(url)
-        soup = BeautifulSoup(html, "html.parser")
+    if robots is not None and not robots.allowed(url):
+        raise Disallowed(f"robots.txt disallows {url}")
+    html = _fresh_from_cache(url)
+    if html is not None:
+        return html  # no request is sent, so no rate-limit token is spent
+    attempt = 0
+    while True:
+        retry_after = None
+        try:
+            with limiter.slot(url):
+                start = time.monotonic()
+                html = fetch(url)
+            if html.strip():
+                limiter.success(url, time.monotonic() - start)
+                return html
+            failure = FetchError(url, 200)
+        except FetchError as exc:
+            failure, retry_after = exc, exc.retry_after
+            if exc.status in (429, 503):
+                limiter.throttled(url)
+                _count("throttled")
+            if retry_after is not None:
+                limiter.pause(url, retry_after)
+        except urllib3.exceptions.HTTPError as exc:
+            failure = exc
+            if _is_timeout(exc):
+                limiter.throttled(url)
+                _count("timeouts")
+        if attempt >= max_retries:
+            raise failure
+        if retry_after is None:  # with Retry-After the host's bucket already waits
+            time.sleep(backoff_delay(attempt, backoff_base, backoff_cap))
+        attempt += 1
+        _count("retries")
+
+def make_limiter(rate: float = requests_per_second,
+                 concurrency: int = max_in_flight) -> HostRateLimiter:
+    """Per-host politeness budget shared by every request of one crawl."""
+    return HostRateLimiter(rate, max_in_flight=concurrency, adaptive=adaptive_concurrency)
+
+def fetch_pages(start_page: int = 1, base_url: str = url_prefix,
+                rate: float = requests_per_second, concurrency: int = max_in_flight,
+                limiter: HostRateLimiter | None = None, end_page: int | None = None):
+    """
+    Yield (page_number, html) for start_page, start_page+1, ... in page order.
+    Up to `concurrency` pages are fetched ahead on a thread pool; every request
+    waits for a token from a per-host bucket refilled at `rate` requests/second.
+    With adaptive_concurrency the in-flight cap starts at 1 and follows AIMD
+    (see fetch_with_retry). Pass `limiter` to share the budget with other
+    requests (e.g. result-page enrichment). The generator ends after `end_page`
+    if given, else it is endless: the caller stops it (break/close) when done,
+    which cancels any pages still queued.
+    """
+    limiter = limiter or make_limiter(rate, concurrency)
+    http.ensure_maxsize(concurrency)  # one pooled connection per request in flight
+
+    def _fetch_one(page: int) -> str:
+        url = base_url + str(page)
+        html = fetch_with_retry(url, limiter)
+        if archive is not None:
+            archive.append(url, page, html)
+        return html
+
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="fetch")
+    pending = deque()
+    next_page = start_page
+    try:
+        while True:
+            # keep the window full, then hand back the oldest page first
+            while (len(pending) < max(1, concurrency)
+                   and (end_page is None or next_page <= end_page)):
+                pending.append((next_page, pool.submit(_fetch_one, next_page)))
+                next_page += 1
+            if not pending:
+                return
+            page, fut = pending.popleft()
+            yield page, fut.result()
+    finally:
+        for _, fut in pending:
+            fut.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
 
-        # Only parent rows: <tr> with no 'class' attribute
-        parent_rows = [tr for tr in soup.find_all("tr") if not tr.get("class")]
+# ---------- main scraper ----------
 
-        if not parent_rows:
-            break  # nothing on this page; stop
+def parse_page_bs4(html: str) -> list[dict]:
+    """
+    Reference parser (BeautifulSoup). Build result rows for one survey page by stitching:
+      parent tr (no class) + its next tr (tw-border-none) + optional 3rd tr (tw-border-none for comments).
+    Returns [] when the page has no parent rows.
+    Only the results table is parsed, and the tree is freed before returning.
+    Tree building and row extraction are timed as "parse" / "extract" spans.
+    """
+    with span(metrics, "parse"):
+        soup = BeautifulSoup(parsers.table_region(html), "html.parser", parse_only=_only_tables)
 
-        for parent in parent_rows:
+    rows = []
+    with span(metrics, "extract"):
+        for parent, tr2, tr3 in iter_result_rows(soup):
             row1 = extract_first_dataset(parent)
-
-            # tr2 (details row) : next element <tr>
-            tr2 = first_tr_sibling_tw(parent)
             row2 = extract_second_dataset(tr2) if tr2 else {}
-
-            # tr3 (comments row) : next element <tr> after tr2 (may not exist)
-            tr3 = first_tr_sibling_tw(tr2) if tr2 else None
             comments = extract_comments(tr3) if tr3 else ""
             if row1["university_name"] != "":
-                result_row = {
+                rows.append({
                     **row1,
                     **row2,
                     "comments": comments,
-                }
-                results.append(result_row)
-        time.sleep(2) #to prevent throttling
-        param_page += 1
+                })
+    soup.decompose()
+    return rows
+
+def parse_page_lxml(html: str) -> list[dict]:
+    """Fast parser (lxml); yields the same rows as parse_page_bs4."""
+    return parsers.parse_page(html, _origin, metrics)
+
+PARSERS = {"bs4": parse_page_bs4}
+if parsers.available:
+    PARSERS["lxml"] = parse_page_lxml
+
+def parse_page(html: str, parser: str | None = None) -> list[dict]:
+    """Rows for one survey page using the chosen backend (default_parser if None)."""
+    return PARSERS[parser or default_parser](html)
+
+def load_scraped_json(path: str = "scraped.json") -> list[dict]:
+    """Rows from a previous run; missing file -> []."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def iter_scraped_json(path: str = "scraped.json"):
+    """Rows of a previous run's scraped.json one at a time; missing file -> nothing."""
+    if os.path.exists(path):
+        yield from iter_json_array(path)
+
+def merge_replayed(ndjson_path: str, previous_path: str = "scraped.json",
+                   placement: dict | None = None):
+    """
+    Rows for scraped.json after an archive replay (--from-archive). The replay
+    re-extracts every archived copy of every page, oldest first, so a row can
+    come back several times (it moved down a page between crawls) and an
+    incremental run's copies only cover the first pages. Re-extracted rows are
+    merged into scraped.json by applicant_url: rows new to it first, then its
+    rows in their order, each replaced by its re-extracted version when there
+    is one (the last copy, i.e. the newest, wins).
+    New rows come newest first, ordered by `placement` (see replay_pages) when
+    given, else as first re-extracted. Re-extracted rows without an
+    applicant_url cannot be matched; each distinct one follows the new rows.
+    """
+    offsets = {}  # applicant_url -> offset of its last re-extracted line
+    unkeyed, seen = [], set()  # offsets of distinct rows without applicant_url
+    with open(ndjson_path, "rb") as f:
+        while line := f.readline():
+            if not line.strip():
+                continue
+            url = json.loads(line).get("applicant_url")
+            if url:
+                offsets[url] = f.tell() - len(line)
+            elif line not in seen:
+                seen.add(line)
+                unkeyed.append(f.tell() - len(line))
+    previous = known_urls(iter_scraped_json(previous_path))
+    new = [url for url in offsets if url not in previous]
+    if placement:
+        new.sort(key=lambda url: placement.get(url, ()))
+    with open(ndjson_path, "rb") as f:
+
+        def read_at(offset):
+            f.seek(offset)
+            return json.loads(f.readline())
+
+        for url in new:
+            yield read_at(offsets[url])
+        for offset in unkeyed:
+            yield read_at(offset)
+        for row in iter_scraped_json(previous_path):
+            url = row.get("applicant_url")
+            yield read_at(offsets[url]) if url in offsets else row
+
+def replay_pages(source, sink: NdjsonSink, placement: dict | None = None) -> int:
+    """
+    Re-extract every (page_number, html) of `source` (PageArchive.iter_copies(),
+    oldest copy first) into `sink`; returns rows written. No paging rules
+    apply: copies from several crawls repeat page numbers, and an archived
+    empty page ends nothing.
+    `placement` collects where each applicant_url sits in the newest copy
+    holding it, as a sort key (page, newer copies first, position on the page):
+    the site's newest-first order, for merge_replayed.
+    """
+    total = 0
+    pages = iter_page_rows(source=source)
+    try:
+        for copy, (page, rows) in enumerate(pages):
+            _count("pages")
+            sink.write_rows(rows)
+            total += len(rows)
+            if placement is not None:
+                for pos, row in enumerate(rows):
+                    if row.get("applicant_url"):
+                        placement[row["applicant_url"]] = (page, -copy, pos)
+    finally:
+        pages.close()
+    _count("rows", total)
+    return total
+
+_DATE_FORMATS = ("%B %d, %Y", "%b %d, %Y", "%Y-%m-%d")
+
+def parse_added_on(text: str) -> date | None:
+    """Date of a row's added_on text ("March 31, 2024"); None if unrecognised."""
+    text = (text or "").strip()
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+def known_urls(rows: list[dict]) -> set[str]:
+    """Applicant URLs already captured (scraped 'applicant_url' or cleaned 'url')."""
+    return {u for r in rows for u in (r.get("applicant_url") or r.get("url"),) if u}
+
+def _past_the_end(html: str) -> bool:
+    """A fetched page with no result cells: the survey ends here."""
+    return not parsers.has_result_cells(html)
+
+def iter_page_rows(start_page: int = 1, base_url: str = url_prefix,
+                   rate: float = requests_per_second, concurrency: int = max_in_flight,
+                   source=None, limiter: HostRateLimiter | None = None,
+                   end_page: int | None = None):
+    """
+    Yield (page_number, rows) in page order. Pages are fetched, or taken from
+    `source` ((page_number, html) pairs, e.g. PageArchive.iter_pages()),
+    up to `end_page` when given.
+    With parse_workers > 0, fetching and parsing run as separate stages
+    (see pipeline.py); otherwise each page is parsed inline as it arrives.
+    """
+    pages = (source if source is not None
+             else fetch_pages(start_page, base_url, rate, concurrency, limiter, end_page))
+    if parse_workers > 0:
+        is_last = None if source is not None else _past_the_end  # archives hold empty pages mid-way
+        yield from parse_pipeline(pages, default_parser, parse_workers, parse_queue_size, metrics,
+                                  is_last)
+        return
+    try:
+        for page, html in pages:
+            yield page, parse_page(html)
+    finally:
+        if hasattr(pages, "close"):
+            pages.close()
+
+@dataclass
+class CrawlOptions:
+    """Which rows a crawl keeps and where it ends; see new_page_rows()."""
+    known: set[str] | None = None  # incremental mode: applicant URLs already captured
+    fingerprints: FingerprintStore | None = None
+    since: date | None = None  # date window, inclusive
+    until: date | None = None
+    end_page: int | None = None  # last page of a shard's range
+    skip_urls: tuple = ()  # dropped without ending the crawl (a checkpoint's boundary page)
+    enricher: DetailEnricher | None = None
+
+def new_page_rows(start_page: int = 1, base_url: str = url_prefix,
+                  rate: float = requests_per_second, concurrency: int = max_in_flight,
+                  source=None, limiter: HostRateLimiter | None = None,
+                  options: CrawlOptions | None = None):
+    """
+    Yield (page_number, rows) in page order with only the rows worth keeping;
+    shared by scrape_data() and scrape_iter(). Pages are fetched concurrently
+    (or read from `source`, see iter_page_rows) and paging stops at an empty
+    page, a repeated page, or after `end_page` (shards). The other settings
+    below are fields of `options` (CrawlOptions).
+    Each page's row keys are fingerprinted (fingerprint.py): a page identical to
+    the one before ends the crawl (the site repeats its last page), an earlier
+    duplicate is skipped, and max_duplicate_pages duplicates in a row end it too.
+    A page is added to `fingerprints` only when all of its rows are in the output
+    (none dropped by the date window); in incremental mode a page already in it
+    is unchanged since the last pull, so paging stops there. The store is not
+    saved here: run() saves it once scraped.json has been exported.
+    Incremental mode (`known` given): only unseen applicant URLs are kept, and
+    paging stops at the first page made up entirely of known results.
+    `skip_urls` are dropped without ending the crawl (a checkpoint's boundary page).
+    Date window (`since` / `until`, inclusive): only rows whose added_on falls
+    inside are kept (rows with an unreadable date are kept too). Pages are newest
+    first, so the first page holding a row older than `since` is the last one
+    needed and paging stops after it; pages newer than `until` are skipped.
+    With `since`, a page where no row's date can be read is also the last one
+    (a warning is logged): nothing else would end the crawl.
+    `enricher` (enrich.DetailEnricher) adds result-page fields to each page's new
+    rows; give it the same `limiter` as the page fetcher.
+    Close the generator to stop early; fetches still queued are cancelled.
+    """
+    opts = options or CrawlOptions()
+    known, fingerprints, end_page = opts.known, opts.fingerprints, opts.end_page
+    since, until, enricher = opts.since, opts.until, opts.enricher
+    skip = set(opts.skip_urls)
+    whole_page = True  # no date window: every row of a page is kept
+    seen_prints, last_print, duplicates = set(), None, 0
+    pages = iter_page_rows(start_page, base_url, rate, concurrency, source, limiter, end_page)
+    try:
+        for page, rows in pages:
+            if end_page is not None and page > end_page:
+                break  # archive sources are not cut at end_page
+            _count("pages")
+            if not rows:
+                _count("empty_pages")
+                break  # nothing on this page; stop
+            fp = page_fingerprint(rows)
+            if fp == last_print:
+                break  # same page again: past the end
+            if fp in seen_prints:
+                _count("duplicate_pages")
+                duplicates += 1
+                if duplicates >= max_duplicate_pages:
+                    break
+                continue  # duplicate of an earlier page; nothing new on it
+            seen_prints.add(fp)
+            last_print, duplicates = fp, 0
+            if fingerprints is not None and known is not None and fp in fingerprints:
+                break  # page unchanged since the previous pull
+            if skip:
+                rows = [r for r in rows if r["applicant_url"] not in skip]
+            past_window = False
+            if since is not None or until is not None:
+                dates = [parse_added_on(r["added_on"]) for r in rows]
+                past_window = since is not None and any(d and d < since for d in dates)
+                if since is not None and not any(dates):
+                    # nothing to compare with `since` (added_on changed format?): without
+                    # this the crawl would walk the whole survey
+                    _count("undated_pages")
+                    log.warning("page %d has no readable added_on date; stopping the "
+                                "date-window crawl after it", page)
+                    past_window = True
+                kept = [r for r, d in zip(rows, dates) if d is None or
+                        ((since is None or d >= since) and (until is None or d <= until))]
+                _count("out_of_window", len(rows) - len(kept))
+                whole_page = len(kept) == len(rows)
+                if not kept:
+                    if past_window:
+                        break  # whole page older than the window
+                    continue  # whole page newer than the window
+                rows = kept
+            if fingerprints is not None and whole_page:
+                fingerprints.add(fp)  # known / skipped rows are already in the output
+            if known is not None:
+                rows = [r for r in rows if r["applicant_url"] not in known]
+                if not rows:
+                    break  # caught up with the previous pull
+            if enricher is not None:
+                rows = enricher(rows)
+            _count("rows", len(rows))
+            yield page, rows
+            if past_window:
+                break  # the rest of the survey is older than `since`
+    finally:
+        pages.close()
+
+def scrape_data(start_page: int = 1, base_url: str = url_prefix,
+                rate: float = requests_per_second, concurrency: int = max_in_flight,
+                sink: NdjsonSink | None = None, checkpoint: Checkpoint | None = None,
+                source=None, limiter: HostRateLimiter | None = None,
+                options: CrawlOptions | None = None) -> int:
+    """
+    Collect the rows of new_page_rows() (see there for paging and the CrawlOptions:
+    incremental mode, the date window, fingerprints and enrichment) and append
+    them to `results`, or stream them to `sink` page by page so memory stays flat.
+    Returns rows collected.
+    Stop when rows reach target_length or pages exhaust; with a date window
+    (`since` given) the window alone decides where the crawl ends, and with
+    `end_page` (a shard) the page range does.
+    With a sink and a checkpoint, progress is saved after every page; rows of the
+    checkpoint's boundary page are skipped so a resumed crawl adds no duplicates.
+    """
+    opts = options or CrawlOptions()
+    total = checkpoint.rows if checkpoint else 0
+    if checkpoint:
+        opts = replace(opts, skip_urls=tuple(checkpoint.boundary_urls))
+    pages = new_page_rows(start_page, base_url, rate, concurrency, source, limiter, opts)
+    try:
+        for page, rows in pages:
+            if sink is not None:
+                sink.write_rows(rows)
+                if checkpoint is not None:
+                    checkpoint.save(page, sink.tell(), total + len(rows),
+                                    [r["applicant_url"] for r in rows])
+            else:
+                results.extend(rows)
+            total += len(rows)
+            if opts.since is None and opts.end_page is None and total > target_length:
+                break
+    finally:
+        pages.close()
+    return total
+
+def scrape_iter(start_page: int = 1, max_rows: int | None = None, since=None,
+                base_url: str = url_prefix, rate: float = requests_per_second,
+                concurrency: int = max_in_flight, enricher=None,
+                limiter: HostRateLimiter | None = None, until: date | None = None):
+    """
+    Library API: yield row dicts lazily, newest first, as pages arrive - nothing
+    is written to disk and nothing accumulates in `results`.
+      max_rows: stop after this many rows (None = until the pages run out).
+      since:    what an earlier pull already has - either the applicant_url of
+                its newest row (stop when it is reached) or a collection of
+                applicant URLs (skip them; stop at a page with nothing new) -
+                or a datetime.date (or datetime, whose day is used): only
+                rows added on or after it.
+      until:    a datetime.date or datetime; rows added after its day are skipped.
+    Pages are still fetched ahead concurrently; closing the generator (or
+    breaking out of the loop) cancels them.
+
+        for row in scrape_iter(max_rows=500, since=last_url):
+            handle(row)
+    """
+    since_date = since if isinstance(since, date) else None
+    if isinstance(since_date, datetime):
+        since_date = since_date.date()  # rows are compared by day
+    if isinstance(until, datetime):
+        until = until.date()
+    stop_at = since if isinstance(since, str) else None
+    known = (set(since) if since is not None and stop_at is None and since_date is None
+             else None)
+    count = 0
+    pages = new_page_rows(start_page, base_url, rate, concurrency, limiter=limiter,
+                          options=CrawlOptions(known=known, since=since_date, until=until,
+                                               enricher=enricher))
+    try:
+        for _, rows in pages:
+            for row in rows:
+                if stop_at is not None and row["applicant_url"] == stop_at:
+                    return
+                yield row
+                count += 1
+                if max_rows is not None and count >= max_rows:
+                    return
+    finally:
+        pages.close()
 
 def create_scraped_json(payload: list[dict], path: str = "scraped.json"):
     """Write the scraped list of dicts to JSON file (UTF-8)."""
     with open(path, "w", encoding="utf-8") as f:
         json.dump(payload, f, ensure_ascii=False, indent=2)
 
+def _fetch_robots(robots_url: str) -> tuple[int | None, str]:
+    """(status, text) for RobotsCache; status None when the host is unreachable."""
+    try:
+        r = http.get(robots_url, timeout=urllib3.Timeout(connect=5, read=10))
+    except urllib3.exceptions.HTTPError:
+        return None, ""
+    return r.status, r.data.decode("utf-8", "ignore")
+
+def enable_robots(path: str = ".robots_cache.json", ttl: float = 24 * 3600) -> RobotsCache:
+    """Check every fetched URL against a robots.txt cached on disk for `ttl` seconds."""
+    global robots
+    robots = RobotsCache(_fetch_robots, path, ttl=ttl, user_agent=user_agent)
+    return robots
+
 def check_and_save_robots() -> dict:
     """
-    Download robots.txt for the site hosting `target_url`, save it locally,
-    and check whether crawling `target_url` is allowed for `user_agent`.
+    Load robots.txt for the site hosting `target_url` (from the on-disk cache
+    when fresh, see robots_cache.py), save it locally, and check whether
+    crawling `target_url` is allowed for `user_agent`.
 
-    Returns a small dict: {"robots_url": ..., "saved_to": ..., "allowed": True/False}
+    Returns a small dict: {"robots_url", "saved_to", "allowed", "crawl_delay",
+    "request_rate", "cached"}; request_rate is in requests/second.
     """
-    user_agent = "Mozilla/5.0"
     save_path = "robots.txt"
-    origin = f"{urlparse(target_url).scheme}://{urlparse(target_url).netloc}"
-    robots_url = urljoin(origin, "/robots.txt")
-
-    r = http.request("GET", robots_url, timeout=urllib3.Timeout(connect=5, read=10))
-    content = r.data.decode("utf-8", "ignore")
+    rc = robots or enable_robots()
+    fetched = rc.stats["fetched"]
+    policy = rc.policy(target_url)
 
     with open(save_path, "w", encoding="utf-8") as f:
-        f.write(content)
-
-    # Use robotparser to evaluate (can_fetch ignores UA wildcards unless matched)
-    from urllib import robotparser
-    rp = robotparser.RobotFileParser()
-    rp.parse(content.splitlines())
-    allowed = rp.can_fetch(user_agent, target_url)
+        f.write(rc.content(target_url))
 
-    return {"robots_url": robots_url, "saved_to": save_path, "allowed": bool(allowed)}
+    return {"robots_url": rc.origin(target_url) + "/robots.txt", "saved_to": save_path,
+            "allowed": policy.can_fetch(target_url), "crawl_delay": policy.crawl_delay,
+            "request_rate": policy.request_rate, "cached": rc.stats["fetched"] == fetched}
 
 
 # ---------- entrypoint ----------
 
+def _parse_args(argv=None) -> argparse.Namespace:
+    """Command-line options; defaults match the polite production settings."""
+    ap = argparse.ArgumentParser(description="Scrape Grad Café survey results into scraped.json")
+    ap.add_argument("--rate", type=float, default=requests_per_second,
+                    help="requests/second budget per host (default: %(default)s)")
+    ap.add_argument("--concurrency", type=int, default=max_in_flight,
+                    help="max requests in flight per host (default: %(default)s)")
+    ap.add_argument("--fixed-concurrency", action="store_true",
+                    help="always use --concurrency instead of adapting it (AIMD)")
+    ap.add_argument("--retries", type=int, default=max_retries,
+                    help="retries per page for 429/5xx/timeouts (default: %(default)s)")
+    ap.add_argument("--pool-size", type=int,
+                    help="kept-alive connections per host (default: --concurrency)")
+    ap.add_argument("--no-compress", action="store_true",
+                    help="do not send Accept-Encoding (download pages uncompressed)")
+    ap.add_argument("--start-page", type=int, default=1)
+    ap.add_argument("--parser", choices=sorted(PARSERS), default=default_parser,
+                    help="HTML parser backend (default: %(default)s)")
+    ap.add_argument("--parse-workers", type=int, default=parse_workers,
+                    help="parser processes fed by the fetchers; 0 parses inline (default: %(default)s)")
+    ap.add_argument("--queue-size", type=int, default=parse_queue_size,
+                    help="max fetched pages waiting for a parser (default: %(default)s)")
+    ap.add_argument("--cache-dir", default=".http_cache",
+                    help="on-disk response cache (default: %(default)s)")
+    ap.add_argument("--cache-ttl", type=float, default=600.0,
+                    help="seconds a cached page is reused without revalidation")
+    ap.add_argument("--cache-max-mb", type=float, default=256.0,
+                    help="size bound for cached bodies; least recently used are evicted")
+    ap.add_argument("--no-cache", action="store_true", help="always download every page")
+    ap.add_argument("--robots-cache", default=".robots_cache.json",
+                    help="robots.txt kept between runs (default: %(default)s)")
+    ap.add_argument("--robots-ttl", type=float, default=24 * 3600,
+                    help="seconds before robots.txt is downloaded again (default: one day)")
+    ap.add_argument("--since", type=date.fromisoformat, metavar="YYYY-MM-DD",
+                    help="only rows added on or after this date; stops at the first older page"
+                         " (replaces the target_length row cap)")
+    ap.add_argument("--until", type=date.fromisoformat, metavar="YYYY-MM-DD",
+                    help="skip rows added after this date")
+    ap.add_argument("--incremental", action="store_true",
+                    help="stop at the first page already in scraped.json and prepend only new rows")
+    ap.add_argument("--ndjson", default="scraped.ndjson",
+                    help="rows are appended here as each page finishes (default: %(default)s)")
+    ap.add_argument("--fsync-every", type=int, default=10, help="fsync the NDJSON file every N pages")
+    ap.add_argument("--compact", action="store_true",
+                    help="write scraped.json as one compact array instead of indent=2")
+    ap.add_argument("--checkpoint", default="scrape.checkpoint.json",
+                    help="progress file updated after every page (default: %(default)s)")
+    ap.add_argument("--resume", action="store_true",
+                    help="continue after the last page recorded in --checkpoint")
+    ap.add_argument("--archive", default="page_archive",
+                    help="compressed store of every fetched page (default: %(default)s)")
+    ap.add_argument("--no-archive", action="store_true", help="do not keep fetched pages")
+    ap.add_argument("--fingerprints", default="page_fingerprints.json",
+                    help="row-key hashes of crawled pages; --incremental stops at a known one")
+    ap.add_argument("--enrich", action="store_true",
+                    help="also fetch each new result's page (applicant_url) and add its fields")
+    ap.add_argument("--details", default="details.ndjson",
+                    help="result pages fetched so far; never refetched (default: %(default)s)")
+    ap.add_argument("--report", default="scrape_report.json",
+                    help="JSON run report: timing percentiles and counters ('' to skip)")
+    ap.add_argument("--from-archive", metavar="DIR",
+                    help="re-run extraction over an archive instead of fetching (offline, parallel)")
+    return ap.parse_args(argv)
+
+
+def run(args: argparse.Namespace, base_url: str = url_prefix) -> int:
+    """
+    Scrape into args.ndjson (resuming if asked), export scraped.json; return rows written.
+    Page fingerprints are saved only after the export succeeds. An incremental or
+    resumed run adds to the stored set; any other run rewrites scraped.json, so
+    it replaces it.
+    A JSON run report (timing spans with percentiles, counters) goes to args.report,
+    also when the run fails; the module's collector is then put back as it was.
+    """
+    global metrics
+    ckpt = Checkpoint(args.checkpoint)
+    start_page, append = args.start_page, False
+    if args.resume and ckpt.load():
+        if truncate_output(args.ndjson, ckpt.offset):
+            start_page, append = ckpt.last_page + 1, True
+            print(f"Resuming after page {ckpt.last_page} ({ckpt.rows} rows).")
+        else:
+            print(f"{args.ndjson} is shorter than the checkpoint; starting over.")
+            ckpt.clear()
+    else:
+        ckpt.clear()
+
+    # streamed twice (known URLs now, rows again at export), never held in memory
+    previous = iter_scraped_json() if args.incremental else ()
+    known = known_urls(iter_scraped_json()) if args.incremental else None
+    source = PageArchive(args.from_archive).iter_copies(start_page) if args.from_archive else None
+    placement = {}  # replay: applicant_url -> newest position (replay_pages)
+    rate = args.rate
+    if robots is not None and not args.from_archive:
+        rate = robots.policy(base_url).cap_rate(rate)  # Crawl-delay / Request-rate
+        if rate < args.rate:
+            print(f"robots.txt limits the crawl to {rate:g} requests/second.")
+    limiter = make_limiter(rate, args.concurrency)
+    enricher = None
+    if args.enrich and not args.from_archive:  # result pages are fetched live
+        enricher = DetailEnricher(fetch_with_retry, limiter, DetailStore(args.details),
+                                  concurrency=args.concurrency, origin=base_url,
+                                  permanent=(Disallowed,))
+    # a resumed run adds to the stored set: its first pages' prints are not in this run
+    fingerprints = FingerprintStore(args.fingerprints, load=args.incremental or append)
+    total, completed = 0, False
+    outer_metrics = metrics  # restored at the end: the collector is for this run only
+    run_metrics = enable_metrics() if args.report else None
+    try:
+        with NdjsonSink(args.ndjson, fsync_every=args.fsync_every, append=append) as sink:
+            if source is not None:
+                total = replay_pages(source, sink, placement)
+            else:
+                options = CrawlOptions(known=known, fingerprints=fingerprints,
+                                       since=args.since, until=args.until, enricher=enricher)
+                total = scrape_data(start_page, base_url, rate=rate, concurrency=args.concurrency,
+                                    sink=sink, checkpoint=ckpt, limiter=limiter, options=options)
+        if enricher is not None and args.incremental:
+            # rows already in scraped.json are skipped by the crawl: retry their failed pages here
+            enricher.retry_failed()
+            previous = enricher.refill(previous)
+        # newest first, like the site
+        with span(run_metrics, "export"):
+            rows = ((merge_replayed(args.ndjson, placement=placement),) if args.from_archive
+                    else (iter_ndjson(args.ndjson), previous))
+            export_json_array("scraped.json", *rows, compact=args.compact)
+        fingerprints.save()  # only now do these pages' rows exist in scraped.json
+        ckpt.clear()  # finished cleanly; nothing to resume
+        completed = True
+    finally:
+        if enricher is not None:
+            enricher.close()
+            print("result pages:", enricher.stats)
+        if run_metrics is not None:
+            run_metrics.write(args.report, completed=completed, start_page=start_page,
+                              rows_total=total, rate=rate, concurrency=args.concurrency,
+                              since=args.since and args.since.isoformat(),
+                              until=args.until and args.until.isoformat(),
+                              parser=default_parser, parse_workers=parse_workers,
+                              http=http.summary(), cache=cache.stats if cache else None,
+                              result_pages=enricher.stats if enricher else None)
+        metrics = outer_metrics
+    return total
+
+
 if __name__ == "__main__":
-    robot_output = check_and_save_robots()
-    if robot_output["allowed"]:
-        scrape_data()
-        create_scraped_json(results)
+    args = _parse_args()
+    default_parser = args.parser
+    parse_workers, parse_queue_size = args.parse_workers, args.queue_size
+    adaptive_concurrency, max_retries = not args.fixed_concurrency, args.retries
+    configure_http(args.pool_size or args.concurrency, compress=not args.no_compress)
+    if args.from_archive:
+        # offline re-extraction: no robots check, no fetching, parse on every core
+        parse_workers = args.parse_workers or os.cpu_count() or 1
+        print(f"Re-extracted {run(args)} rows from {args.from_archive}.")
     else:
-        print(f"Not allowed by robots.txt ({robot_output['robots_url']}).")
-        if robot_output.get("error"):
-            print("Fetch error:", robot_output["error"])
+        if not args.no_cache:
+            enable_cache(args.cache_dir, args.cache_ttl, int(args.cache_max_mb * 1024 * 1024))
+        if not args.no_archive:
+            enable_archive(args.archive)
+        enable_robots(args.robots_cache, args.robots_ttl)
+        robot_output = check_and_save_robots()
+        if robot_output["allowed"]:
+            run(args)
+            if cache is not None:
+                print("http cache:", cache.stats)
+            print("http:", http.summary())
+        else:
+            print(f"Not allowed by robots.txt ({robot_output['robots_url']}).")
+            if robot_output.get("error"):
+                print("Fetch error:", robot_output["error"])
 
 
 #a.	Confirm the robot.txt file permits scraping.
@@ -0,0 +1,297 @@
+# shard.py
+# Sharded backfills: split the survey's page range across worker processes
+# (or machines sharing a directory) and merge the results deterministically.
+# - WorkQueue: SQLite table of page-range shards. Workers claim one at a time
+#   inside BEGIN IMMEDIATE, so two workers never get the same shard; a shard
+#   whose worker died is handed out again once its lease expires. A live
+#   worker renews its lease after every page, so long shards are never re-claimed.
+# - run_worker(): claim -> scrape_data(start, end) into the shard's own
+#   NDJSON file -> mark done, until the queue is empty. Each worker process
+#   loads robots.txt from the parent's on-disk cache and checks every URL.
+# - merge_shards(): completed shards in page order, rows deduplicated by
+#   applicant_url (first occurrence wins), into scraped.ndjson + scraped.json.
+#
+#   python module_2/shard.py plan --last 1500 --shard-pages 50
+#   python module_2/shard.py work --workers 4        # on each machine
+#   python module_2/shard.py status
+#   python module_2/shard.py merge
+
+import argparse
+import os
+import socket
+import sqlite3
+import sys
+import time
+
+import scrape
+from pipeline import mp_context
+from sinks import NdjsonSink, export_json_array, iter_ndjson
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shards (
+    id         INTEGER PRIMARY KEY,
+    start_page INTEGER NOT NULL,
+    end_page   INTEGER NOT NULL,
+    status     TEXT    NOT NULL DEFAULT 'pending',  -- pending | running | done | failed
+    worker     TEXT,
+    claimed_at REAL,
+    attempts   INTEGER NOT NULL DEFAULT 0,
+    rows       INTEGER,
+    output     TEXT,
+    error      TEXT,
+    UNIQUE (start_page, end_page)
+)
+"""
+
+# ---------- work queue ----------
+
+class WorkQueue:
+    """Shard table in one SQLite file; safe to share between processes."""
+
+    def __init__(self, path: str = "shards.sqlite", clock=time.time):
+        self.path = path
+        self._clock = clock
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute(_SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def plan(self, first_page: int, last_page: int, shard_pages: int = 50) -> int:
+        """Add shards covering first_page..last_page; existing ranges are kept. Returns shards added."""
+        before = self._db.total_changes
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")
+            for start in range(first_page, last_page + 1, shard_pages):
+                self._db.execute("INSERT OR IGNORE INTO shards (start_page, end_page) VALUES (?, ?)",
+                                 (start, min(start + shard_pages - 1, last_page)))
+        return self._db.total_changes - before
+
+    def claim(self, worker: str, lease: float = 900.0, max_attempts: int = 3) -> sqlite3.Row | None:
+        """
+        Take the lowest pending shard (or a running one whose lease expired, or a
+        failed one with attempts left) and mark it running for `worker`.
+        """
+        now = self._clock()
+        with self._db:
+            self._db.execute("BEGIN IMMEDIATE")  # one claimer at a time across processes
+            row = self._db.execute(
+                "SELECT id FROM shards WHERE status = 'pending'"
+                " OR (status = 'running' AND claimed_at < ?)"
+                " OR (status = 'failed' AND attempts < ?)"
+                " ORDER BY start_page LIMIT 1", (now - lease, max_attempts)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE shards SET status = 'running', worker = ?, claimed_at = ?,"
+                             " attempts = attempts + 1, error = NULL WHERE id = ?",
+                             (worker, now, row["id"]))
+            return self._db.execute("SELECT * FROM shards WHERE id = ?", (row["id"],)).fetchone()
+
+    def renew(self, shard_id: int, worker: str) -> bool:
+        """Restart the lease of a running shard; False if it was lost to another worker."""
+        with self._db:
+            cur = self._db.execute("UPDATE shards SET claimed_at = ?"
+                                   " WHERE id = ? AND worker = ? AND status = 'running'",
+                                   (self._clock(), shard_id, worker))
+        return cur.rowcount == 1
+
+    def complete(self, shard_id: int, worker: str, rows: int, output: str) -> bool:
+        """Mark done; False if the lease was lost to another worker meanwhile."""
+        with self._db:
+            cur = self._db.execute("UPDATE shards SET status = 'done', rows = ?, output = ?"
+                                   " WHERE id = ? AND worker = ? AND status = 'running'",
+                                   (rows, output, shard_id, worker))
+        return cur.rowcount == 1
+
+    def fail(self, shard_id: int, worker: str, error: str) -> None:
+        with self._db:
+            self._db.execute("UPDATE shards SET status = 'failed', error = ?"
+                             " WHERE id = ? AND worker = ? AND status = 'running'",
+                             (error[:500], shard_id, worker))
+
+    def shards(self) -> list[sqlite3.Row]:
+        """All shards in page order."""
+        return self._db.execute("SELECT * FROM shards ORDER BY start_page").fetchall()
+
+    def counts(self) -> dict:
+        """Shards per status."""
+        return {r["status"]: r["n"] for r in
+                self._db.execute("SELECT status, COUNT(*) AS n FROM shards GROUP BY status")}
+
+# ---------- worker ----------
+
+class LeaseLost(Exception):
+    """The shard was handed to another worker while this one was still scraping it."""
+
+class _HeartbeatSink(NdjsonSink):
+    """Shard output that renews the shard's lease after every page written."""
+
+    def __init__(self, path: str, queue: WorkQueue, shard_id: int, worker: str):
+        super().__init__(path)
+        self._queue, self._shard_id, self._worker = queue, shard_id, worker
+
+    def write_rows(self, rows: list[dict]) -> None:
+        super().write_rows(rows)
+        if not self._queue.renew(self._shard_id, self._worker):
+            raise LeaseLost(f"shard {self.path} was re-claimed")
+
+def shard_path(out_dir: str, shard) -> str:
+    """Output file for one claim of a shard (the attempt number keeps re-runs apart)."""
+    return os.path.join(out_dir, f"shard-{shard['start_page']:06d}-{shard['end_page']:06d}"
+                                 f"-{shard['attempts']}.ndjson")
+
+def run_worker(db: str = "shards.sqlite", out_dir: str = "shards",
+               base_url: str = scrape.url_prefix, worker: str | None = None,
+               rate: float = scrape.requests_per_second,
+               concurrency: int = scrape.max_in_flight, lease: float = 900.0,
+               robots_cache: str | None = None, robots_ttl: float = 24 * 3600) -> int:
+    """
+    Scrape shards until none are left; returns the number completed by this worker.
+    The worker opens its own HTTP client: a forked process would otherwise share
+    the parent's kept-alive sockets (e.g. from the robots.txt fetch) with its
+    siblings and read their responses.
+    With `robots_cache` every URL is checked against robots.txt (scrape.enable_robots);
+    a spawned process inherits nothing from the parent, so the worker loads the
+    rules itself, from the cache file the parent has just written.
+    """
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    scrape.configure_http(concurrency)
+    if robots_cache is not None:
+        scrape.enable_robots(robots_cache, robots_ttl)
+    os.makedirs(out_dir, exist_ok=True)
+    queue = WorkQueue(db)
+    done = 0
+    try:
+        while (shard := queue.claim(worker, lease)) is not None:
+            path = shard_path(out_dir, shard)
+            try:
+                with _HeartbeatSink(path, queue, shard["id"], worker) as sink:
+                    rows = scrape.scrape_data(
+                        shard["start_page"], base_url, rate, concurrency, sink=sink,
+                        options=scrape.CrawlOptions(end_page=shard["end_page"]))
+            except LeaseLost:
+                continue  # the new owner scrapes it; stop fetching the same pages twice
+            except Exception as exc:  # noqa: BLE001 - record it, the shard is retried later
+                queue.fail(shard["id"], worker, f"{type(exc).__name__}: {exc}")
+                continue
+            done += queue.complete(shard["id"], worker, rows, path)
+    finally:
+        queue.close()
+    return done
+
+def run_workers(n: int, context=None, **kwargs) -> int:
+    """
+    run_worker() in n processes; returns shards completed. The start method is
+    chosen explicitly (pipeline.mp_context(), or `context`), so workers set up
+    their state the same way on every platform.
+    """
+    if n <= 1:
+        return run_worker(**kwargs)
+    with (context or mp_context()).Pool(n) as pool:
+        results = [pool.apply_async(run_worker, kwds=kwargs) for _ in range(n)]
+        return sum(r.get() for r in results)
+
+# ---------- merge ----------
+
+def merge_shards(db: str = "shards.sqlite", ndjson: str = "scraped.ndjson",
+                 out: str = "scraped.json", partial: bool = False, compact: bool = False) -> dict:
+    """
+    Concatenate completed shards in page order, dropping rows whose
+    applicant_url was already written (a result that moved pages between
+    shards). The same shards always merge to the same file.
+    Raises RuntimeError if any shard is unfinished, unless partial=True.
+    """
+    queue = WorkQueue(db)
+    try:
+        shards = queue.shards()
+    finally:
+        queue.close()
+    unfinished = [s for s in shards if s["status"] != "done"]
+    if unfinished and not partial:
+        first = unfinished[0]
+        raise RuntimeError(f"{len(unfinished)} shard(s) not done (first: pages "
+                           f"{first['start_page']}-{first['end_page']}, {first['status']})")
+    seen, duplicates = set(), 0
+    with NdjsonSink(ndjson) as sink:
+        for s in shards:
+            if s["status"] != "done":
+                continue
+            rows = []
+            for row in iter_ndjson(s["output"]):
+                key = row.get("applicant_url") or repr(sorted(row.items()))
+                if key in seen:
+                    duplicates += 1
+                    continue
+                seen.add(key)
+                rows.append(row)
+            sink.write_rows(rows)
+    total = export_json_array(out, iter_ndjson(ndjson), compact=compact)
+    return {"shards": len(shards) - len(unfinished), "rows": total,
+            "duplicates": duplicates, "unfinished": len(unfinished)}
+
+# ---------- entrypoint ----------
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Sharded Grad Café backfill")
+    ap.add_argument("--db", default="shards.sqlite", help="work queue (default: %(default)s)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("plan", help="add page-range shards to the queue")
+    p.add_argument("--first", type=int, default=1)
+    p.add_argument("--last", type=int, required=True)
+    p.add_argument("--shard-pages", type=int, default=50)
+
+    w = sub.add_parser("work", help="scrape shards until the queue is empty")
+    w.add_argument("--workers", type=int, default=1, help="processes on this machine")
+    w.add_argument("--out-dir", default="shards")
+    w.add_argument("--rate", type=float, default=scrape.requests_per_second,
+                   help="requests/second for this machine, split across its workers")
+    w.add_argument("--concurrency", type=int, default=scrape.max_in_flight)
+    w.add_argument("--lease", type=float, default=900.0,
+                   help="seconds without a finished page before a worker's shard is handed out again")
+    w.add_argument("--robots-cache", default=".robots_cache.json",
+                   help="robots.txt shared with the workers (default: %(default)s)")
+    w.add_argument("--robots-ttl", type=float, default=24 * 3600,
+                   help="seconds before robots.txt is downloaded again (default: one day)")
+
+    sub.add_parser("status", help="shards per status")
+
+    m = sub.add_parser("merge", help="write scraped.json from the finished shards")
+    m.add_argument("--ndjson", default="scraped.ndjson")
+    m.add_argument("--out", default="scraped.json")
+    m.add_argument("--partial", action="store_true", help="merge even if shards are unfinished")
+    m.add_argument("--compact", action="store_true")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "plan":
+        queue = WorkQueue(args.db)
+        print(f"Added {queue.plan(args.first, args.last, args.shard_pages)} shard(s).")
+        queue.close()
+    elif args.cmd == "status":
+        queue = WorkQueue(args.db)
+        print(queue.counts())
+        queue.close()
+    elif args.cmd == "work":
+        scrape.enable_robots(args.robots_cache, args.robots_ttl)
+        robot_output = scrape.check_and_save_robots()
+        if not robot_output["allowed"]:
+            print(f"Not allowed by robots.txt ({robot_output['robots_url']}).")
+            return 1
+        rate = scrape.robots.policy(scrape.url_prefix).cap_rate(args.rate)
+        done = run_workers(args.workers, db=args.db, out_dir=args.out_dir,
+                           rate=rate / max(1, args.workers), concurrency=args.concurrency,
+                           lease=args.lease, robots_cache=args.robots_cache,
+                           robots_ttl=args.robots_ttl)
+        print(f"Completed {done} shard(s).")
+    else:
+        try:
+            print(merge_shards(args.db, args.ndjson, args.out, args.partial, args.compact))
+        except RuntimeError as exc:
+            print(exc)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+# sinks.py
+# Streaming output for the scraper.
+# - NdjsonSink: appends one JSON object per line as soon as a page is parsed,
+#   flushes every page and fsyncs every `fsync_every` pages.
+# - iter_ndjson / export_json_array: turn the NDJSON file back into the
+#   scraped.json array one row at a time (pretty or compact).
+# - iter_json_array: read a JSON array file (scraped.json) row by row without
+#   loading it whole.
+# Nothing here keeps more than one row in memory.
+
+import json
+import os
+
+# ----------------------------- writer ----------------------------- #
+
+class NdjsonSink:
+    """Append-only NDJSON writer; use as a context manager."""
+
+    def __init__(self, path: str = "scraped.ndjson", fsync_every: int = 10, append: bool = False):
+        self.path = path
+        self.fsync_every = max(1, int(fsync_every))
+        self.rows_written = 0
+        self._pages = 0
+        self._f = open(path, "a" if append else "w", encoding="utf-8")
+
+    def write_rows(self, rows: list[dict]) -> None:
+        """Write one page worth of rows and flush; fsync periodically."""
+        for row in rows:
+            self._f.write(json.dumps(row, ensure_ascii=False))
+            self._f.write("\n")
+        self.rows_written += len(rows)
+        self._pages += 1
+        self._f.flush()
+        if self._pages % self.fsync_every == 0:
+            os.fsync(self._f.fileno())
+
+    def tell(self) -> int:
+        """Current byte offset (end of the last complete line)."""
+        return self._f.tell()
+
+    def close(self) -> None:
+        """Final flush + fsync."""
+        if not self._f.closed:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+        return False
+
+# ----------------------------- readers ----------------------------- #
+
+def iter_ndjson(path: str):
+    """Yield row dicts from an NDJSON file; blank lines are skipped."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def iter_json_array(path: str, chunk_size: int = 64 * 1024, with_text: bool = False):
+    """
+    Yield the elements of a top-level JSON array file one at a time.
+    The file is read in chunk_size pieces and each element is decoded as soon
+    as it is complete, so memory holds one chunk plus one element.
+    with_text=True yields (element, its source text) pairs instead.
+    Raises ValueError if the file is not a JSON array.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf, pos, eof = "", 0, False
+
+        def more() -> bool:
+            nonlocal buf, pos, eof
+            chunk = "" if eof else f.read(chunk_size)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0  # drop what was already decoded
+            return not eof
+
+        def next_char() -> str:
+            """First non-whitespace character at pos ('' at end of file)."""
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n":
+                    pos += 1
+                if pos < len(buf) or not more():
+                    return buf[pos] if pos < len(buf) else ""
+
+        if next_char() != "[":
+            raise ValueError(f"{path}: not a JSON array")
+        pos += 1
+        first = True
+        while True:
+            c = next_char()
+            if c == "]":
+                return
+            if not first:
+                if c != ",":
+                    raise ValueError(f"{path}: expected ',' or ']' in the array")
+                pos += 1
+                next_char()
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if not more():  # element cut off by the end of the file
+                        raise
+                    continue
+                if not eof and (end == len(buf) or buf[end] not in " \t\r\n,]"):
+                    more()  # a number cut after "1", "1." or "1e" goes on in the next chunk
+                    continue
+                break
+            yield (item, buf[pos:end]) if with_text else item
+            pos, first = end, False
+
+def array_item(row: dict, compact: bool = False) -> str:
+    """One element as export_json_array writes it (without the separating comma)."""
+    if compact:
+        return json.dumps(row, ensure_ascii=False, separators=(",", ":"))
+    return "\n  " + json.dumps(row, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+
+def write_json_array(path: str, items, compact: bool = False) -> int:
+    """
+    Write already encoded elements (array_item) into a JSON array at `path`;
+    returns the element count. Lets callers encode rows elsewhere (e.g. in
+    worker processes) and still get export_json_array's exact layout.
+    """
+    count = 0
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("[")
+        for item in items:
+            f.write(("," if count else "") + item)
+            count += 1
+        f.write("]" if compact or not count else "\n]")
+    os.replace(tmp, path)  # never leave a half-written scraped.json behind
+    return count
+
+def export_json_array(path: str, *row_iters, compact: bool = False) -> int:
+    """
+    Stream rows into a JSON array at `path` and return the row count.
+    compact=True writes one minimal line; otherwise matches json.dump(indent=2).
+    """
+    return write_json_array(path, (array_item(row, compact) for rows in row_iters for row in rows),
+                            compact)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+conftest.py - Test fixtures for module_2 (scraper + cleaner).
+
+Purpose:
+  - Make "import scrape" / "import clean" work from module_2/
+  - Run every test in its own temp dir with an empty scrape.results
+  - Serve synthetic Grad Café survey pages from a local HTTP server
+    (fixture_server.py) so the scraper can be exercised end to end without
+    touching the live site
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]  # -> module_2/
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fixture_server import start_server  # noqa: E402
+
+
+# =============================================================================
+# 1) Retry timing
+# =============================================================================
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    """Keep retry backoff in the millisecond range so failure tests stay quick."""
+    import scrape  # pylint: disable=import-outside-toplevel
+    monkeypatch.setattr(scrape, "backoff_base", 0.001)
+    monkeypatch.setattr(scrape, "backoff_cap", 0.01)
+
+
+# =============================================================================
+# 2) Fresh scraper state
+# =============================================================================
+@pytest.fixture(autouse=True)
+def fresh_results(monkeypatch, tmp_path):
+    """Each test runs in its own temp dir and starts with an empty results list."""
+    import scrape  # pylint: disable=import-outside-toplevel
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scrape, "results", [])
+
+
+# =============================================================================
+# 3) Local HTTP server fixture
+# =============================================================================
+@pytest.fixture
+def gradcafe_server():
+    """Start a threaded HTTP server with 5 pages x 4 results; stop it after the test."""
+    server = start_server(pages=5, rows_per_page=4)
+    yield server
+    server.stop()
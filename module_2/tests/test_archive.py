@@ -0,0 +1,111 @@
+# module_2/tests/test_archive.py
+"""
+Page archive tests: pages fetched once can be re-extracted offline.
+"""
+
+import json
+import os
+
+import pytest
+
+import scrape
+from archive import PageArchive
+from fixture_server import result_ids
+
+
+@pytest.fixture
+def archived(monkeypatch, tmp_path):
+    """Archive every page scrape.fetch_pages() fetches into a temp dir."""
+    arc = PageArchive(str(tmp_path / "arc"))
+    monkeypatch.setattr(scrape, "archive", arc)
+    return arc
+
+
+def test_append_and_read_back(tmp_path):
+    """Each page is its own gzip member addressed by segment/offset."""
+    arc = PageArchive(str(tmp_path), segment_bytes=60)
+    assert arc.append("u1", 1, "<p>one</p>" * 20)
+    assert arc.append("u2", 2, "<p>two</p>" * 20)
+    assert not arc.append("u1", 1, "<p>one</p>" * 20)  # unchanged body skipped
+    entries = arc.latest()
+    assert [e["page"] for e in entries] == [1, 2]
+    assert entries[0]["segment"] != entries[1]["segment"]  # rotated past 60 bytes
+    assert arc.read(entries[1]) == "<p>two</p>" * 20
+
+
+def test_newest_copy_wins(tmp_path):
+    """A re-fetched page with a new body replaces the old one for replay."""
+    arc = PageArchive(str(tmp_path))
+    arc.append("u1", 1, "old")
+    arc.append("u1", 1, "new")
+    assert list(PageArchive(str(tmp_path)).iter_pages()) == [(1, "new")]
+
+
+def test_every_copy_replayed_oldest_first(tmp_path):
+    """iter_copies() keeps superseded copies, which iter_pages() drops."""
+    arc = PageArchive(str(tmp_path))
+    arc.append("u1", 1, "old")
+    arc.append("u2", 2, "two")
+    arc.append("u1", 1, "new")
+    assert list(arc.iter_copies()) == [(1, "old"), (2, "two"), (1, "new")]
+    assert list(arc.iter_copies(start_page=2)) == [(2, "two")]
+
+
+def test_scrape_archives_then_replays_offline(gradcafe_server, archived, monkeypatch):
+    """--from-archive reproduces the crawl without a single request."""
+    scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=100, concurrency=1)
+    crawled = list(scrape.results)
+    fetched = len(gradcafe_server.requests)
+
+    args = scrape._parse_args(["--from-archive", archived.path])  # pylint: disable=protected-access
+    monkeypatch.setattr(scrape, "parse_workers", 2)
+    assert scrape.run(args) == len(crawled)
+    assert len(gradcafe_server.requests) == fetched
+    with open("scraped.json", encoding="utf-8") as f:
+        assert json.load(f) == crawled
+
+
+def test_replay_after_incremental_run_keeps_every_row(gradcafe_server, archived, monkeypatch):
+    """Every copy from both crawls is replayed and merged into scraped.json, newest winning."""
+    def cli(*extra):
+        return scrape._parse_args(["--rate", "100", "--concurrency", "1", "--report", "",  # pylint: disable=protected-access
+                                   *extra])
+
+    scrape.run(cli(), gradcafe_server.url_prefix)
+    gradcafe_server.pages = 6  # four newer results shift everything one page down
+    assert scrape.run(cli("--incremental"), gradcafe_server.url_prefix) == 4
+    with open("scraped.json", encoding="utf-8") as f:
+        before = json.load(f)
+    assert len(before) == 24
+    stale = [dict(r, program_name="old extractor") for r in before]
+    with open("scraped.json", "w", encoding="utf-8") as f:
+        json.dump(stale, f)  # re-extraction replaces rows by applicant_url
+
+    monkeypatch.setattr(scrape, "parse_workers", 2)
+    scrape.run(cli("--from-archive", archived.path))
+    with open("scraped.json", encoding="utf-8") as f:
+        assert json.load(f) == before  # every row re-extracted, old page copies included
+
+
+def test_replay_without_scraped_json_is_newest_first(gradcafe_server, archived):
+    """Rows new to scraped.json follow the newest crawl's order, not the oldest copy's."""
+    def cli(*extra):
+        return scrape._parse_args(["--rate", "100", "--concurrency", "1", "--report", "",  # pylint: disable=protected-access
+                                   *extra])
+
+    scrape.run(cli(), gradcafe_server.url_prefix)
+    gradcafe_server.pages = 6
+    scrape.run(cli("--incremental"), gradcafe_server.url_prefix)
+    os.remove("scraped.json")
+    scrape.run(cli("--from-archive", archived.path))
+    with open("scraped.json", encoding="utf-8") as f:
+        assert result_ids(json.load(f)) == list(range(23, -1, -1))
+
+
+def test_rows_without_url_are_kept_once(tmp_path):
+    ndjson = tmp_path / "replay.ndjson"
+    rows = [{"applicant_url": "u1", "v": 1}, {"v": "no url"}, {"applicant_url": "u1", "v": 2},
+            {"v": "no url"}]
+    ndjson.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+    assert list(scrape.merge_replayed(str(ndjson), str(tmp_path / "none.json"))) == [
+        {"applicant_url": "u1", "v": 2}, {"v": "no url"}]
@@ -0,0 +1,61 @@
+# module_2/tests/test_bench_scrape.py
+"""
+bench_scrape.py: the fixture server knobs and one end-to-end benchmark run.
+"""
+
+import json
+
+import pytest
+
+import bench_scrape
+import scrape
+from fixture_server import start_server
+
+
+@pytest.fixture(autouse=True)
+def restore_scrape(monkeypatch):
+    """run_once()/main() set scrape module globals; put them back afterwards."""
+    for name in ("results", "http", "default_parser", "parse_workers", "parse_page",
+                 "adaptive_concurrency", "backoff_base", "target_length"):
+        monkeypatch.setattr(scrape, name, getattr(scrape, name))
+
+
+def test_run_once_reports_throughput_and_memory():
+    """All pages are crawled once; every metric is filled in."""
+    server = start_server(pages=6, rows_per_page=5)
+    try:
+        report = bench_scrape.run_once(server, concurrency=2, parser="bs4", workers=0, rate=1000)
+    finally:
+        server.stop()
+    assert report["rows"] == 30
+    assert report["pages_per_s"] > 0 and report["rows_per_s"] > 0
+    assert report["parse_ms_per_page"] > 0
+    assert report["peak_rss_mb"] > 10  # a whole interpreter, measured in a fresh process
+    assert report["requests"] >= 7  # 6 pages + the empty page that ends the crawl
+    assert scrape.parse_page.__name__ == "parse_page"  # timing wrapper removed
+
+
+def test_error_rate_is_served_and_retried():
+    """Random 503s are absorbed by the scraper's retries; no rows are lost."""
+    server = start_server(pages=10, rows_per_page=2, error_rate=0.3, seed=1)
+    try:
+        report = bench_scrape.run_once(server, concurrency=2, parser="bs4", workers=0,
+                                       rate=1000, memory=False)
+    finally:
+        server.stop()
+    assert report["rows"] == 20
+    assert report["errors_served"] > 0
+    assert report["requests"] >= 11 + report["errors_served"]  # plus pages fetched ahead
+
+
+def test_main_recorded_pages_to_json(tmp_path, capsys):
+    """--recorded serves the saved fixtures; --json writes one report per configuration."""
+    out = tmp_path / "bench.json"
+    fixtures = bench_scrape.os.path.join(bench_scrape.os.path.dirname(scrape.__file__),
+                                         "tests", "fixtures")
+    assert bench_scrape.main(["--recorded", fixtures, "--concurrency", "1", "2",
+                              "--parser", "bs4", "--no-memory", "--json", str(out)]) == 0
+    reports = json.loads(out.read_text())
+    assert [r["concurrency"] for r in reports] == [1, 2]
+    assert all(r["pages"] == 3 and r["rows"] > 0 for r in reports)
+    assert "pages/s" in capsys.readouterr().out
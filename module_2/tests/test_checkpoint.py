@@ -0,0 +1,69 @@
+# module_2/tests/test_checkpoint.py
+"""
+Checkpoint/resume tests: a crawl that dies on a 5xx picks up after the last
+completed page and does not duplicate rows from the boundary page.
+"""
+
+import json
+
+import pytest
+
+import scrape
+from checkpoint import Checkpoint, truncate_output
+from fixture_server import result_ids
+from sinks import iter_ndjson
+
+
+@pytest.fixture
+def args():
+    """CLI defaults; output files land in the test's temp dir (conftest.fresh_results)."""
+    a = scrape._parse_args([])  # pylint: disable=protected-access
+    a.rate, a.concurrency = 100, 2
+    return a
+
+
+def test_crash_then_resume_continues_after_last_page(gradcafe_server, args):
+    """Pages 1-2 are kept across the failure; resume starts at page 3."""
+    gradcafe_server.fail_pages = {3}
+    with pytest.raises(scrape.FetchError):
+        scrape.run(args, gradcafe_server.url_prefix)
+    ckpt = Checkpoint(args.checkpoint)
+    assert ckpt.load() and ckpt.last_page == 2 and ckpt.rows == 8
+
+    gradcafe_server.fail_pages = set()
+    gradcafe_server.requests.clear()
+    args.resume = True
+    assert scrape.run(args, gradcafe_server.url_prefix) == 20
+    assert gradcafe_server.requests[0][0] == "/survey/?page=3"
+    assert result_ids(iter_ndjson(args.ndjson)) == list(range(19, -1, -1))
+    with open("scraped.json", encoding="utf-8") as f:
+        assert len(json.load(f)) == 20
+    assert not Checkpoint(args.checkpoint).load()  # cleared after success
+
+
+def test_resume_skips_rows_shifted_from_boundary_page(gradcafe_server, args):
+    """New results push page 2's rows onto page 3; they are not written twice."""
+    gradcafe_server.fail_pages = {3}
+    with pytest.raises(scrape.FetchError):
+        scrape.run(args, gradcafe_server.url_prefix)
+    gradcafe_server.fail_pages = set()
+    gradcafe_server.pages = 6  # four newer results shift everything one page down
+    args.resume = True
+    scrape.run(args, gradcafe_server.url_prefix)
+    ids = result_ids(iter_ndjson(args.ndjson))
+    assert len(ids) == len(set(ids))
+
+
+def test_resume_without_checkpoint_starts_fresh(gradcafe_server, args):
+    """--resume with nothing recorded behaves like a normal run."""
+    args.resume = True
+    assert scrape.run(args, gradcafe_server.url_prefix) == 20
+
+
+def test_truncate_output_drops_partial_page(tmp_path):
+    """Bytes written after the checkpoint offset are discarded."""
+    path = tmp_path / "out.ndjson"
+    path.write_text('{"a": 1}\n{"b": 2', encoding="utf-8")
+    assert truncate_output(str(path), 9)
+    assert path.read_text(encoding="utf-8") == '{"a": 1}\n'
+    assert not truncate_output(str(path), 100)
@@ -0,0 +1,211 @@
+# module_2/tests/test_clean.py
+"""
+clean.py: GRE/GPA numbers parsed at scrape time are used and passed on;
+clean_stream() cleans row by row with flat memory, or chunk by chunk in a
+process pool; normalizers are memoized; --incremental cleans only the delta.
+"""
+
+import json
+import tracemalloc
+
+import pytest
+
+import bench_clean
+import clean
+from sinks import NdjsonSink, export_json_array, iter_ndjson
+
+
+def _row(**kw):
+    row = {"program_name": "CS", "university_name": "MIT", "added_on": "March 31, 2024",
+           "status": "Accepted on 30 Mar", "applicant_url": "u", "term": "F24",
+           "gre": "GRE 320", "gre_v": "GRE V 190", "gre_aw": "", "gpa": "GPA 3.80",
+           "gre_num": 320, "gre_v_num": 190, "gre_aw_num": None, "gpa_num": 3.8}
+    row.update(kw)
+    return row
+
+
+def test_clean_uses_and_passes_on_parsed_numbers(tmp_path):
+    src, dst = tmp_path / "scraped.json", tmp_path / "out.json"
+    src.write_text(json.dumps([_row()]), encoding="utf-8")
+    [out] = clean.clean_data(str(src), str(dst))
+    assert (out["gre"], out["gre_num"]) == ("GRE 320", 320)
+    assert (out["gre_v"], out["gre_v_num"]) == ("", None)  # 190 is implausible: blanked
+    assert (out["GPA"], out["gpa_num"]) == ("GPA 3.80", 3.8)
+    assert out["gre_aw_num"] is None and out["date_added"] == "2024-03-31"
+
+
+def test_sanitize_metric_prefers_the_parsed_value():
+    assert clean._sanitize_metric("GPA 3.80", "gpa", 3.8) == "GPA 3.80"  # pylint: disable=protected-access
+    assert clean._sanitize_metric("GPA 38", "gpa", 38) == ""  # pylint: disable=protected-access
+    assert clean._sanitize_metric("GPA 3.80", "gpa") == "GPA 3.80"  # pylint: disable=protected-access
+
+
+def _write_rows(path, n):
+    rows = (_row(applicant_url=f"https://x/result/{i}", comments="c" * (i % 40)) for i in range(n))
+    export_json_array(str(path), rows)
+
+
+def test_stream_output_matches_clean_data(tmp_path):
+    src = tmp_path / "scraped.json"
+    _write_rows(src, 50)
+    clean.clean_data(str(src), str(tmp_path / "a.json"))
+    assert clean.clean_stream(str(src), str(tmp_path / "b.json")) == 50
+    assert (tmp_path / "a.json").read_bytes() == (tmp_path / "b.json").read_bytes()
+
+
+def test_stream_ndjson_in_and_out(tmp_path):
+    src, dst = tmp_path / "scraped.ndjson", tmp_path / "applicant_data.ndjson"
+    with NdjsonSink(str(src)) as sink:
+        sink.write_rows([_row(), _row(term="S25")])
+    assert clean.clean_stream(str(src), str(dst)) == 2
+    assert [r["term"] for r in iter_ndjson(str(dst))] == ["Fall 2024", "Spring 2025"]
+
+
+def test_stream_missing_input_writes_empty_array(tmp_path):
+    dst = tmp_path / "out.json"
+    assert clean.clean_stream(str(tmp_path / "nope.json"), str(dst)) == 0
+    assert json.loads(dst.read_text(encoding="utf-8")) == []
+
+
+def _peak(src, dst):
+    tracemalloc.start()
+    try:
+        clean.clean_stream(str(src), str(dst))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize("fmt", ["json", "ndjson"])
+def test_stream_memory_does_not_grow_with_input(tmp_path, fmt):
+    """Peak memory for 8x the rows stays about the same."""
+    small, big = tmp_path / f"small.{fmt}", tmp_path / f"big.{fmt}"
+    if fmt == "json":
+        _write_rows(small, 1000)
+        _write_rows(big, 8000)
+    else:
+        for path, n in ((small, 1000), (big, 8000)):
+            with NdjsonSink(str(path)) as sink:
+                sink.write_rows([_row(applicant_url=f"u{i}") for i in range(n)])
+    small_peak = _peak(small, tmp_path / f"o1.{fmt}")
+    assert _peak(big, tmp_path / f"o2.{fmt}") < small_peak * 2
+
+
+def test_normalizer_caches_count_hits(tmp_path):
+    src = tmp_path / "scraped.json"
+    _write_rows(src, 20)  # every row has the same date, term and scores
+    clean.clear_caches()
+    clean.clean_stream(str(src), str(tmp_path / "out.json"))
+    stats = clean.cache_stats()
+    assert stats["date"] == {"hits": 19, "misses": 1, "size": 1, "hit_rate": 0.95}
+    assert stats["term"]["misses"] == 1 and stats["metric"]["misses"] == 4
+    clean.clear_caches()
+    assert clean.cache_stats()["date"]["hits"] == 0
+
+
+def test_bench_clean_cached_output_matches_uncached(tmp_path):
+    src = tmp_path / "scraped.json"
+    export_json_array(str(src), bench_clean.make_rows(300))
+    result = bench_clean.run(str(src), repeat=1)
+    assert result["rows"] == 300 and result["same_output"]
+    assert result["caches"]["term"]["hit_rate"] > 0.9
+    assert hasattr(clean._term_norm, "cache_info")  # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize("src_name", ["scraped.json", "scraped.ndjson"])
+@pytest.mark.parametrize("dst_name", ["out.json", "out.ndjson"])
+def test_workers_write_the_same_output_in_order(tmp_path, src_name, dst_name):
+    """Chunks cleaned in a process pool come back in input order, byte for byte."""
+    src = tmp_path / src_name
+    rows = list(bench_clean.make_rows(257))
+    if src_name.endswith(".ndjson"):
+        with NdjsonSink(str(src)) as sink:
+            sink.write_rows(rows)
+    else:
+        export_json_array(str(src), rows)
+    serial, parallel = tmp_path / ("1" + dst_name), tmp_path / ("2" + dst_name)
+    assert clean.clean_stream(str(src), str(serial)) == 257
+    assert clean.clean_stream(str(src), str(parallel), workers=2, chunk_size=10) == 257
+    assert serial.read_bytes() == parallel.read_bytes()
+
+
+def test_workers_with_missing_input(tmp_path):
+    dst = tmp_path / "out.json"
+    assert clean.clean_stream(str(tmp_path / "nope.json"), str(dst), workers=2) == 0
+    assert dst.read_text(encoding="utf-8") == "[]"
+
+
+@pytest.mark.parametrize("dst_name", ["applicant_data.json", "applicant_data.ndjson"])
+def test_incremental_cleans_only_new_and_changed_rows(tmp_path, dst_name):
+    src, dst, full = tmp_path / "scraped.json", tmp_path / dst_name, tmp_path / ("full" + dst_name)
+    rows = list(bench_clean.make_rows(60))
+    export_json_array(str(src), rows[10:])
+    assert clean.clean_incremental(str(src), str(dst)) == {
+        "rows": 50, "cleaned": 50, "reused": 0, "dropped": 0}
+    before = dst.read_bytes()
+    assert clean.clean_incremental(str(src), str(dst))["reused"] == 50
+    assert dst.read_bytes() == before  # nothing new: output untouched
+
+    rows[20]["term"] = "S26"  # changed in place
+    export_json_array(str(src), rows[:10], rows[10:58])  # 10 new, 2 gone
+    assert clean.clean_incremental(str(src), str(dst)) == {
+        "rows": 58, "cleaned": 11, "reused": 47, "dropped": 2}
+    clean.clean_stream(str(src), str(full))
+    assert dst.read_bytes() == full.read_bytes()  # same as cleaning everything again
+
+
+@pytest.mark.parametrize("dst_name", ["applicant_data.json", "applicant_data.ndjson"])
+@pytest.mark.parametrize("edit", ["appended", "reordered", "duplicated"])
+def test_incremental_matches_full_clean(tmp_path, dst_name, edit):
+    """Rows appended at the end, a reordered input and duplicate rows come out
+    exactly as a full clean writes them."""
+    src, dst, full = tmp_path / "scraped.json", tmp_path / dst_name, tmp_path / ("full" + dst_name)
+    rows = list(bench_clean.make_rows(30))
+    export_json_array(str(src), rows[:20])
+    clean.clean_incremental(str(src), str(dst))
+    if edit == "appended":
+        rows = rows[:20] + rows[20:]
+    elif edit == "reordered":
+        rows = rows[10:20] + rows[:10]
+    else:
+        rows = rows[:20] + rows[5:8] + [rows[0]]
+    export_json_array(str(src), rows)
+    stats = clean.clean_incremental(str(src), str(dst))
+    assert stats["rows"] == len(rows)
+    assert stats["cleaned"] == (10 if edit == "appended" else 0)
+    clean.clean_stream(str(src), str(full))
+    assert dst.read_bytes() == full.read_bytes()
+    assert clean.clean_incremental(str(src), str(dst))["cleaned"] == 0  # index still valid
+
+
+def test_incremental_rebuilds_when_output_changed(tmp_path):
+    src, dst = tmp_path / "scraped.ndjson", tmp_path / "applicant_data.json"
+    with NdjsonSink(str(src)) as sink:
+        sink.write_rows(list(bench_clean.make_rows(5)))
+    clean.clean_incremental(str(src), str(dst))
+    dst.write_text("[]", encoding="utf-8")  # edited behind the index's back
+    assert clean.clean_incremental(str(src), str(dst))["cleaned"] == 5
+    assert len(json.loads(dst.read_text(encoding="utf-8"))) == 5
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "applicant_data.json", "applicant_data.json.index", "scraped.ndjson"]
+
+
+def test_incremental_rebuilds_after_same_size_edit(tmp_path):
+    """The index checks the output's content, not just its size."""
+    src, dst = tmp_path / "scraped.json", tmp_path / "applicant_data.json"
+    rows = list(bench_clean.make_rows(5))
+    export_json_array(str(src), rows)
+    clean.clean_incremental(str(src), str(dst))
+    text = dst.read_text(encoding="utf-8")
+    dst.write_text(text.replace(rows[0]["applicant_url"], rows[0]["applicant_url"][::-1]),
+                   encoding="utf-8")
+    assert clean.clean_incremental(str(src), str(dst))["cleaned"] == 5
+    assert dst.read_text(encoding="utf-8") == text
+
+
+def test_full_clean_drops_the_index(tmp_path):
+    src, dst = tmp_path / "scraped.json", tmp_path / "applicant_data.json"
+    export_json_array(str(src), list(bench_clean.make_rows(5)))
+    clean.clean_incremental(str(src), str(dst))
+    clean.clean_stream(str(src), str(dst))
+    assert not (tmp_path / "applicant_data.json.index").exists()
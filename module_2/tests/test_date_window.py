@@ -0,0 +1,87 @@
+# module_2/tests/test_date_window.py
+"""
+Date-window crawls (--since / --until): rows filtered on added_on, paging stops
+at the first page older than the window.
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import scrape
+from fixture_server import pages_requested, result_ids
+
+DAY0 = date(2024, 1, 1)
+
+
+def _day(result_id: int) -> date:
+    return DAY0 + timedelta(days=result_id)  # newer results, later dates
+
+
+@pytest.fixture
+def dated_server(gradcafe_server):
+    gradcafe_server.added_on = lambda rid: f"{_day(rid):%B} {_day(rid).day}, {_day(rid).year}"
+    return gradcafe_server
+
+
+def test_parse_added_on():
+    assert scrape.parse_added_on("March 31, 2024") == date(2024, 3, 31)
+    assert scrape.parse_added_on(" Sep 7, 2025 ") == date(2025, 9, 7)
+    assert scrape.parse_added_on("2024-02-29") == date(2024, 2, 29)
+    assert scrape.parse_added_on("") is None
+    assert scrape.parse_added_on("yesterday") is None
+
+
+def test_since_stops_at_first_older_page(dated_server):
+    """Pages 1-3 hold results 19..8; the window ends inside page 3, page 5 is never fetched."""
+    rows = list(scrape.scrape_iter(since=_day(10), base_url=dated_server.url_prefix,
+                                   rate=100, concurrency=1))
+    assert result_ids(rows) == list(range(19, 9, -1))
+    assert 5 not in pages_requested(dated_server)
+
+
+def test_until_skips_newer_rows(dated_server):
+    rows = list(scrape.scrape_iter(since=_day(6), until=_day(15),
+                                   base_url=dated_server.url_prefix, rate=100, concurrency=1))
+    assert result_ids(rows) == list(range(15, 5, -1))
+
+
+def test_datetime_bounds_use_their_day(dated_server):
+    """datetime is a date subclass; its day is compared, not the datetime itself."""
+    rows = list(scrape.scrape_iter(since=datetime(2024, 1, 7, 18, 30),
+                                   until=datetime(2024, 1, 16, 0, 5),
+                                   base_url=dated_server.url_prefix, rate=100, concurrency=1))
+    assert result_ids(rows) == list(range(15, 5, -1))
+
+
+def test_date_window_replaces_target_length(dated_server, monkeypatch):
+    """With --since the row cap does not cut the crawl short."""
+    monkeypatch.setattr(scrape, "target_length", 2)
+    total = scrape.scrape_data(base_url=dated_server.url_prefix, rate=100, concurrency=2,
+                               options=scrape.CrawlOptions(since=_day(3)))
+    assert total == 17
+    assert result_ids(scrape.results) == list(range(19, 2, -1))
+
+
+def test_unreadable_dates_are_kept(gradcafe_server):
+    """Rows whose added_on cannot be parsed are not dropped (or used to stop)."""
+    gradcafe_server.added_on = lambda rid: "" if rid % 2 else f"{_day(rid):%Y-%m-%d}"
+    rows = list(scrape.scrape_iter(since=_day(12), base_url=gradcafe_server.url_prefix,
+                                   rate=100, concurrency=1))
+    assert result_ids(rows) == [19, 18, 17, 16, 15, 14, 13, 12, 11, 9]  # stops after page 3
+
+
+def test_undated_pages_end_a_since_crawl(gradcafe_server, caplog):
+    """If no added_on on a page parses (the format changed), --since stops after it
+    instead of walking the whole survey."""
+    gradcafe_server.added_on = lambda rid: f"{rid} days after launch"
+    rows = list(scrape.scrape_iter(since=_day(10), base_url=gradcafe_server.url_prefix,
+                                   rate=100, concurrency=1))
+    assert result_ids(rows) == [19, 18, 17, 16]  # page 1, kept as undated rows
+    assert max(pages_requested(gradcafe_server)) <= 2
+    assert "no readable added_on" in caplog.text
+
+
+def test_cli_dates():
+    args = scrape._parse_args(["--since", "2024-09-01", "--until", "2024-12-31"])  # pylint: disable=protected-access
+    assert (args.since, args.until) == (date(2024, 9, 1), date(2024, 12, 31))
@@ -0,0 +1,150 @@
+# module_2/tests/test_enrich.py
+"""
+Result-page enrichment: detail parsing, the persistent seen-set, and the
+concurrent fetch stage inside scrape_data()/run().
+"""
+
+import json
+
+import scrape
+from enrich import DETAIL_FIELDS, DetailEnricher, DetailStore, merge_detail, parse_detail
+from fixture_server import make_detail, result_id_of
+
+
+def _result_requests(server):
+    return [p for p, _ in server.requests if p.startswith("/result/")]
+
+
+def test_parse_detail_reads_known_labels():
+    """dt/dd pairs map to DETAIL_FIELDS keys; trailing colons and unknown labels are ignored."""
+    fields = parse_detail(make_detail(7))
+    assert fields == {
+        "decision": "Accepted", "notification": "on 30/03/2024 via E-mail",
+        "origin": "International", "undergrad_gpa": "3.80", "gre_general": "320",
+        "gre_verbal": "160", "gre_writing": "4.00", "notes": "details for 7",
+    }
+    assert parse_detail("<html><body>Not found</body></html>") == {}
+
+
+def test_merge_keeps_survey_fields_and_fills_blanks():
+    """Existing keys win; every detail key is present."""
+    row = merge_detail({"gpa": "GPA 3.80", "decision": "kept"}, {"decision": "Accepted"})
+    assert row["gpa"] == "GPA 3.80" and row["decision"] == "kept"
+    assert set(DETAIL_FIELDS.values()) <= set(row)
+    assert merge_detail({}, None)["notes"] == ""
+
+
+def test_store_persists_and_skips_torn_line(tmp_path):
+    """Entries survive a reopen; a half-written last line is ignored."""
+    path = tmp_path / "details.ndjson"
+    store = DetailStore(str(path))
+    store.add("u1", {"decision": "Accepted"})
+    store.add("u1", {"decision": "ignored"})  # first one wins
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"url": "u2", "fiel')
+    again = DetailStore(str(path))
+    assert len(again) == 1 and "u1" in again and "u2" not in again
+    assert again.get("u1") == {"decision": "Accepted"}
+
+
+def test_enrichment_fetches_each_url_once_across_runs(gradcafe_server, tmp_path):
+    """First crawl fetches 20 result pages; a second crawl reuses all of them."""
+    store_path = str(tmp_path / "details.ndjson")
+    limiter = scrape.make_limiter(100, 2)
+    with DetailEnricher(scrape.fetch_with_retry, limiter, DetailStore(store_path), 2,
+                        gradcafe_server.origin) as enricher:
+        scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=100, concurrency=2,
+                           limiter=limiter, options=scrape.CrawlOptions(enricher=enricher))
+    assert len(_result_requests(gradcafe_server)) == 20
+    assert enricher.stats == {"fetched": 20, "reused": 0, "failed": 0, "skipped": 0, "recovered": 0}
+    first = scrape.results[0]
+    assert first["decision"] == "Accepted"
+    assert first["notes"] == f"details for {result_id_of(first['applicant_url'])}"
+    assert first["gpa"] == "GPA 3.80"  # survey field untouched
+
+    scrape.results = []
+    gradcafe_server.requests.clear()
+    with DetailEnricher(scrape.fetch_with_retry, limiter, DetailStore(store_path), 2,
+                        gradcafe_server.origin) as again:
+        scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=100, concurrency=2,
+                           limiter=limiter, options=scrape.CrawlOptions(enricher=again))
+    assert _result_requests(gradcafe_server) == []
+    assert again.stats["reused"] == 20
+    assert scrape.results[0]["decision"] == "Accepted"
+
+
+def test_failed_result_page_is_retried_next_run(tmp_path):
+    """A result page that keeps failing is blank now and not marked as seen."""
+    def fetch(url, _limiter):
+        if url.endswith("/2"):
+            raise scrape.FetchError(url, 503)
+        return make_detail(result_id_of(url))
+
+    store = DetailStore(str(tmp_path / "details.ndjson"))
+    rows = [{"applicant_url": f"http://x/result/{i}"} for i in (1, 2)]
+    with DetailEnricher(fetch, None, store) as enricher:
+        out = enricher(rows)
+    assert [r["decision"] for r in out] == ["Accepted", ""]
+    assert enricher.stats["failed"] == 1
+    assert "http://x/result/2" not in store
+    assert DetailStore(store.path).failed() == ["http://x/result/2"]
+
+
+def test_disallowed_result_page_is_skipped_for_good(tmp_path):
+    """A robots.txt denial is recorded as skipped: not failed, and never fetched again."""
+    calls = []
+
+    def fetch(url, _limiter):
+        calls.append(url)
+        if url.endswith("/2"):
+            raise scrape.Disallowed(url)
+        return make_detail(result_id_of(url))
+
+    store = DetailStore(str(tmp_path / "details.ndjson"))
+    rows = [{"applicant_url": f"http://x/result/{i}"} for i in (1, 2)]
+    with DetailEnricher(fetch, None, store, permanent=(scrape.Disallowed,)) as enricher:
+        out = enricher(rows)
+    assert [r["decision"] for r in out] == ["Accepted", ""]
+    assert enricher.stats["skipped"] == 1 and enricher.stats["failed"] == 0
+
+    calls.clear()
+    reopened = DetailStore(store.path)
+    assert reopened.failed() == [] and "http://x/result/2" in reopened
+    with DetailEnricher(fetch, None, reopened, permanent=(scrape.Disallowed,)) as again:
+        assert again.retry_failed() == 0
+        assert [r["decision"] for r in again(rows)] == ["Accepted", ""]
+    assert calls == []
+
+
+def test_incremental_run_refills_rows_whose_page_failed(gradcafe_server, monkeypatch):
+    """A row already in scraped.json gets its result page retried by a later --incremental run."""
+    args = scrape._parse_args(["--enrich", "--rate", "100", "--concurrency", "2",  # pylint: disable=protected-access
+                               "--report", ""])
+    fetch = scrape.fetch_with_retry
+
+    def flaky(url, limiter):
+        if url.endswith("/7"):
+            raise scrape.FetchError(url, 503)
+        return fetch(url, limiter)
+    monkeypatch.setattr(scrape, "fetch_with_retry", flaky)
+    scrape.run(args, gradcafe_server.url_prefix)
+    [failed] = DetailStore(args.details).failed()
+    assert failed.endswith("/result/7")
+
+    monkeypatch.setattr(scrape, "fetch_with_retry", fetch)
+    args.incremental = True
+    assert scrape.run(args, gradcafe_server.url_prefix) == 0
+    with open("scraped.json", encoding="utf-8") as f:
+        rows = json.load(f)
+    assert len(rows) == 20 and all(r["decision"] == "Accepted" for r in rows)
+    assert DetailStore(args.details).failed() == []
+
+
+def test_run_with_enrich_flag(gradcafe_server):
+    """--enrich adds the detail keys to scraped.json and records them in --details."""
+    args = scrape._parse_args(["--enrich", "--rate", "100", "--concurrency", "2"])  # pylint: disable=protected-access
+    assert scrape.run(args, gradcafe_server.url_prefix) == 20
+    with open("scraped.json", encoding="utf-8") as f:
+        rows = json.load(f)
+    assert all(r["decision"] == "Accepted" for r in rows)
+    assert len(DetailStore(args.details)) == 20
@@ -0,0 +1,125 @@
+# module_2/tests/test_fingerprint.py
+"""
+Page fingerprints: repeated or duplicate pages stop/skip the crawl, and
+incremental runs stop at a page unchanged since the last pull.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+import scrape
+from fingerprint import FingerprintStore, page_fingerprint
+from fixture_server import pages_requested, result_ids
+
+
+def test_fingerprint_depends_on_row_keys_and_order():
+    rows = [{"applicant_url": "a", "status": "x"}, {"applicant_url": "b"}]
+    assert page_fingerprint(rows) == page_fingerprint([{"applicant_url": "a"}, {"applicant_url": "b"}])
+    assert page_fingerprint(rows) != page_fingerprint(rows[::-1])
+
+
+def test_store_round_trip(tmp_path):
+    """Saved fingerprints are found again; a damaged file starts empty."""
+    path = str(tmp_path / "prints.json")
+    store = FingerprintStore(path)
+    store.add("abc")
+    store.save()
+    assert "abc" in FingerprintStore(path)
+    (tmp_path / "bad.json").write_text("{not json")
+    assert len(FingerprintStore(str(tmp_path / "bad.json"))) == 0
+
+
+def test_repeated_last_page_ends_crawl(gradcafe_server):
+    """Out-of-range page numbers serving the last page again add no rows."""
+    gradcafe_server.repeat_last = True
+    total = scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=100, concurrency=1)
+    assert total == 20
+    assert len({r["applicant_url"] for r in scrape.results}) == 20
+
+
+def test_duplicate_page_is_skipped(gradcafe_server):
+    """Page 4 repeating page 2 is skipped; page 5 is still collected."""
+    gradcafe_server.page_alias = {4: 2}
+    total = scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=100, concurrency=1)
+    assert total == 16
+    assert len({r["applicant_url"] for r in scrape.results}) == 16
+
+
+def test_endless_duplicates_stop_after_limit(gradcafe_server, monkeypatch):
+    """A site that answers every later page with page 1 stops after max_duplicate_pages."""
+    monkeypatch.setattr(scrape, "max_duplicate_pages", 2)
+    gradcafe_server.page_alias = {p: 1 for p in range(2, 100)}
+    assert scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=100, concurrency=1) == 4
+    assert max(pages_requested(gradcafe_server)) < 10
+
+
+def test_incremental_stops_at_unchanged_page(gradcafe_server, tmp_path):
+    """After a full crawl, an incremental run stops on page 1 by fingerprint alone."""
+    store = FingerprintStore(str(tmp_path / "prints.json"))
+    scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=100, concurrency=1,
+                       options=scrape.CrawlOptions(fingerprints=store))
+    store.save()
+    assert len(FingerprintStore(store.path)) == 5
+
+    scrape.results = []
+    again = FingerprintStore(store.path)
+    assert scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=100, concurrency=1,
+                              options=scrape.CrawlOptions(known=set(), fingerprints=again)) == 0
+
+
+def test_window_run_does_not_record_cut_pages(gradcafe_server, tmp_path):
+    """Pages partly or wholly outside --since/--until stay unrecorded, so a later
+    incremental run still collects the rows the window left out."""
+    day0 = date(2024, 1, 1)
+    gradcafe_server.added_on = lambda rid: f"{day0 + timedelta(days=rid):%Y-%m-%d}"
+    store = FingerprintStore(str(tmp_path / "prints.json"))
+    scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=100, concurrency=1,
+                       options=scrape.CrawlOptions(fingerprints=store,
+                                                   since=day0 + timedelta(days=3),
+                                                   until=day0 + timedelta(days=10)))
+    assert len(store) == 1  # only page 4 (results 7..4) was kept whole
+    known = {r["applicant_url"] for r in scrape.results}
+
+    scrape.results = []
+    scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=100, concurrency=1,
+                       options=scrape.CrawlOptions(known=known, fingerprints=store))
+    assert result_ids(scrape.results)[:9] == list(range(19, 10, -1))
+
+
+def test_run_saves_fingerprints_only_after_export(gradcafe_server, tmp_path, monkeypatch):
+    """A run that fails before scraped.json is written leaves the store untouched."""
+    prints = tmp_path / "prints.json"
+    args = scrape._parse_args(["--fingerprints", str(prints), "--report", "",  # pylint: disable=protected-access
+                               "--rate", "100", "--concurrency", "2"])
+    export = scrape.export_json_array
+
+    def broken_export(*_args, **_kwargs):
+        raise OSError("disk full")
+    monkeypatch.setattr(scrape, "export_json_array", broken_export)
+    with pytest.raises(OSError):
+        scrape.run(args, gradcafe_server.url_prefix)
+    assert not prints.exists()
+
+    monkeypatch.setattr(scrape, "export_json_array", export)
+    assert scrape.run(args, gradcafe_server.url_prefix) == 20
+    assert len(FingerprintStore(str(prints))) == 5
+
+
+def test_resumed_run_keeps_earlier_fingerprints(gradcafe_server, tmp_path):
+    """A resumed full crawl adds to the stored set instead of replacing it with the
+    pages after the resume point, so the next incremental run still stops on page 1."""
+    prints = str(tmp_path / "prints.json")
+    args = scrape._parse_args(["--fingerprints", prints, "--report", "",  # pylint: disable=protected-access
+                               "--rate", "100", "--concurrency", "1"])
+    scrape.run(args, gradcafe_server.url_prefix)
+    gradcafe_server.fail_pages = {3}
+    with pytest.raises(scrape.FetchError):
+        scrape.run(args, gradcafe_server.url_prefix)
+    gradcafe_server.fail_pages = set()
+    args.resume = True
+    scrape.run(args, gradcafe_server.url_prefix)
+    assert len(FingerprintStore(prints)) == 5
+
+    args.resume, args.incremental = False, True
+    assert scrape.run(args, gradcafe_server.url_prefix) == 0
@@ -0,0 +1,104 @@
+# module_2/tests/test_http_cache.py
+"""
+Tests for the on-disk response cache and the conditional GET in scrape.fetch().
+"""
+
+import time
+
+import pytest
+
+import scrape
+from http_cache import ResponseCache
+from ratelimit import HostRateLimiter
+
+
+class _Clock:
+    """Settable wall clock for TTL tests."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def cached(monkeypatch, tmp_path):
+    """Enable a fresh cache for scrape.fetch() in a temp dir."""
+    clock = _Clock()
+    c = ResponseCache(str(tmp_path / "cache"), ttl=60, clock=clock)
+    monkeypatch.setattr(scrape, "cache", c)
+    return c, clock
+
+
+def test_fresh_hit_does_not_wait_for_the_limiter(gradcafe_server, cached):
+    """A fresh cache hit sends no request, so it spends no rate-limit token."""
+    url = gradcafe_server.url_prefix + "1"
+    limiter = HostRateLimiter(0.5)  # one token per 2 s
+    scrape.fetch_with_retry(url, limiter)
+    start = time.monotonic()
+    for _ in range(3):
+        scrape.fetch_with_retry(url, limiter)
+    assert time.monotonic() - start < 1.0
+    assert len(gradcafe_server.requests) == 1
+
+
+def test_fresh_entry_skips_network(gradcafe_server, cached):
+    """Within the TTL the second fetch never reaches the server."""
+    cache, _ = cached
+    url = gradcafe_server.url_prefix + "1"
+    first = scrape.fetch(url)
+    second = scrape.fetch(url)
+    assert first == second
+    assert len(gradcafe_server.requests) == 1
+    assert cache.stats["fresh"] == 1
+
+
+def test_stale_entry_revalidates_with_304(gradcafe_server, cached):
+    """After the TTL a conditional GET is sent and the body reused on 304."""
+    cache, clock = cached
+    url = gradcafe_server.url_prefix + "2"
+    body = scrape.fetch(url)
+    clock.now += 120
+    assert scrape.fetch(url) == body
+    assert gradcafe_server.not_modified == 1
+    assert cache.stats["revalidated"] == 1
+    assert cache.is_fresh(cache.lookup(url))  # 304 restarts the TTL
+
+
+def test_cache_survives_restart(gradcafe_server, tmp_path, monkeypatch):
+    """Entries are reloaded from disk by a new ResponseCache."""
+    url = gradcafe_server.url_prefix + "3"
+    monkeypatch.setattr(scrape, "cache", ResponseCache(str(tmp_path), ttl=60))
+    scrape.fetch(url)
+    monkeypatch.setattr(scrape, "cache", ResponseCache(str(tmp_path), ttl=60))
+    scrape.fetch(url)
+    assert len(gradcafe_server.requests) == 1
+
+
+def test_no_validators_means_full_download(gradcafe_server, cached):
+    """Without an ETag a stale entry is simply downloaded again."""
+    gradcafe_server.etags = False
+    _, clock = cached
+    url = gradcafe_server.url_prefix + "1"
+    scrape.fetch(url)
+    clock.now += 120
+    scrape.fetch(url)
+    assert len(gradcafe_server.requests) == 2
+    assert gradcafe_server.not_modified == 0
+
+
+def test_size_bound_evicts_least_recently_used(tmp_path):
+    """Storing past max_bytes drops the entry used longest ago."""
+    clock = _Clock()
+    c = ResponseCache(str(tmp_path), ttl=60, max_bytes=25, clock=clock)
+    c.store("u1", "a" * 10, {})
+    clock.now += 1
+    c.store("u2", "b" * 10, {})
+    clock.now += 1
+    c.body("u1")  # u1 is now more recent than u2
+    clock.now += 1
+    c.store("u3", "c" * 10, {})
+    assert c.lookup("u2") is None
+    assert c.body("u1") == "a" * 10
+    assert c.stats["evicted"] == 1
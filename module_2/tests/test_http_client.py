@@ -0,0 +1,61 @@
+# module_2/tests/test_http_client.py
+"""
+HTTP client layer: Accept-Encoding negotiation with streaming decompression,
+pool sizing / keep-alive reuse, and per-request byte and latency counters.
+"""
+
+import logging
+
+import pytest
+
+import scrape
+from fixture_server import make_page
+from http_client import HttpClient
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    """A fresh client per test."""
+    monkeypatch.setattr(scrape, "http", HttpClient(maxsize=4))
+
+
+def test_accept_encoding_is_advertised():
+    """gzip is always offered; compress=False offers nothing."""
+    assert "gzip" in HttpClient().headers["accept-encoding"]
+    assert "accept-encoding" not in {k.lower() for k in HttpClient(compress=False).headers}
+
+
+def test_gzip_body_is_decoded_and_counted(gradcafe_server):
+    """The body comes back decoded; wire bytes are several times smaller."""
+    client = HttpClient()
+    r = client.get(gradcafe_server.url_prefix + "1")
+    assert r.encoding == "gzip"
+    assert r.data.decode("utf-8") == make_page(1, 5, 4)
+    assert r.wire_bytes * 3 < len(r.data)
+    assert 0 <= r.ttfb <= r.elapsed
+
+    summary = client.summary()
+    assert summary["requests"] == 1
+    assert summary["wire_bytes"] == r.wire_bytes
+    assert summary["body_bytes"] == len(r.data)
+    assert summary["compression"] > 3
+
+
+def test_identity_when_compression_is_off(gradcafe_server):
+    """Without Accept-Encoding the server sends plain HTML; rows are identical."""
+    plain = HttpClient(compress=False).get(gradcafe_server.url_prefix + "2")
+    packed = HttpClient().get(gradcafe_server.url_prefix + "2")
+    assert plain.encoding == ""
+    assert plain.wire_bytes == len(plain.data)
+    assert scrape.parse_page(plain.data.decode()) == scrape.parse_page(packed.data.decode())
+
+
+def test_connections_are_kept_alive_and_pool_fits_concurrency(gradcafe_server, caplog):
+    """A crawl at concurrency 4 reuses at most 4 connections and never overflows the pool."""
+    scrape.configure_http(pool_size=1)
+    caplog.set_level(logging.WARNING, logger="urllib3.connectionpool")
+    scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=100, concurrency=4)
+    assert len(scrape.results) == 20
+    assert scrape.http.maxsize >= 4
+    assert len(gradcafe_server.connections) <= 4 < len(gradcafe_server.requests)
+    assert "pool is full" not in caplog.text
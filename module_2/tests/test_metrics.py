@@ -0,0 +1,103 @@
+# module_2/tests/test_metrics.py
+"""
+Run instrumentation: span percentiles, connect/TTFB/download timing from the
+HTTP client, parse/extract spans (inline and from parser processes) and the
+JSON run report written by run().
+"""
+
+import json
+
+import pytest
+
+import scrape
+from http_client import HttpClient
+from metrics import RunMetrics, percentile
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    """No metrics left over from other tests."""
+    monkeypatch.setattr(scrape, "metrics", None)
+    monkeypatch.setattr(scrape, "parse_workers", 0)
+
+
+def _args(*extra):
+    return scrape._parse_args(["--rate", "100", "--concurrency", "2", *extra])  # pylint: disable=protected-access
+
+
+def test_percentile_nearest_rank():
+    values = sorted(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 90) == 90
+    assert percentile(values, 100) == 100
+    assert percentile([], 50) == 0.0
+
+
+def test_summary_and_merge():
+    """Samples from another process are merged; summary is in milliseconds."""
+    m = RunMetrics()
+    m.add("parse", 0.002)
+    m.merge({"parse": [0.004, 0.006]})
+    s = m.summary("parse")
+    assert s["count"] == 3 and s["p50_ms"] == 4.0 and s["max_ms"] == 6.0
+    assert s["mean_ms"] == pytest.approx(4.0)
+
+
+def test_client_times_connect_only_for_new_connections(gradcafe_server):
+    """The first request opens a connection; the kept-alive second one does not."""
+    client = HttpClient()
+    first = client.get(gradcafe_server.url_prefix + "1")
+    second = client.get(gradcafe_server.url_prefix + "2")
+    assert first.connect > 0 and second.connect == 0
+    assert 0 <= first.connect <= first.ttfb <= first.elapsed
+
+
+def test_run_writes_report(gradcafe_server):
+    """Counters and every span make it into scrape_report.json."""
+    args = _args()
+    assert scrape.run(args, gradcafe_server.url_prefix) == 20
+    with open(args.report, encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["completed"] is True and report["rows_total"] == 20
+    c = report["counters"]
+    assert c["pages"] == 6 and c["empty_pages"] == 1 and c["rows"] == 20
+    assert c["requests"] >= 6 and c["wire_bytes"] > 0 and c["connections"] >= 1
+    for name in ("connect", "ttfb", "download", "parse", "extract", "export"):
+        assert report["spans"][name]["count"] >= 1, name
+    assert report["spans"]["parse"]["count"] == 6
+    assert {"p50_ms", "p90_ms", "p99_ms"} <= set(report["spans"]["ttfb"])
+
+
+def test_failed_run_still_reports_retries(gradcafe_server, monkeypatch):
+    """A crawl that dies on a 503 leaves a report with completed=false and the retries."""
+    monkeypatch.setattr(scrape, "max_retries", 2)
+    gradcafe_server.fail_pages = {2}
+    args = _args()
+    with pytest.raises(scrape.FetchError):
+        scrape.run(args, gradcafe_server.url_prefix)
+    with open(args.report, encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["completed"] is False
+    assert report["counters"]["retries"] == 2 and report["counters"]["throttled"] == 3
+
+
+def test_parse_spans_come_back_from_parser_processes(gradcafe_server, monkeypatch):
+    """With --parse-workers the worker timings are merged into the parent's report."""
+    monkeypatch.setattr(scrape, "parse_workers", 1)
+    args = _args()
+    scrape.run(args, gradcafe_server.url_prefix)
+    with open(args.report, encoding="utf-8") as f:
+        spans = json.load(f)["spans"]
+    assert spans["parse"]["count"] == 6 and spans["extract"]["count"] == 6
+
+
+def test_report_can_be_disabled(gradcafe_server):
+    args = _args("--report", "")
+    scrape.run(args, gradcafe_server.url_prefix)
+    assert scrape.metrics is None
+
+
+def test_collector_does_not_outlive_the_run(gradcafe_server):
+    """Later library calls in the same process are not timed into the old report."""
+    scrape.run(_args(), gradcafe_server.url_prefix)
+    assert scrape.metrics is None
@@ -0,0 +1,108 @@
+# module_2/tests/test_parsers.py
+"""
+The lxml backend must return exactly what the BeautifulSoup reference returns.
+Saved pages live in tests/fixtures/; a few hand-written rows cover the fallbacks.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+import scrape
+from bench_parsers import check_equivalence, load_pages
+from parsers import group_rows, parse_metric, table_region
+
+pytest.importorskip("lxml")
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+@pytest.mark.parametrize("page", sorted(FIXTURES.glob("*.html")), ids=lambda p: p.name)
+def test_lxml_matches_bs4_on_saved_pages(page):
+    """Field-for-field equality on every saved survey page."""
+    html = page.read_text(encoding="utf-8")
+    ref = scrape.parse_page(html, "bs4")
+    assert ref
+    assert scrape.parse_page(html, "lxml") == ref
+
+
+@pytest.mark.parametrize("td5, expected", [
+    ("<div><dl><dt><a href='/x'>a</a><a href='/result/7?x=1#y'>b</a></dt></dl></div>", "/result/7"),
+    ("<div><dl><dt><a href='/result/8'>only</a></dt></dl></div>", "/result/8"),
+    ("<span><a href='#'>r</a><a href='/result/9'>d</a></span>", "/result/9"),
+    ("<span>nothing</span>", ""),
+])
+def test_applicant_url_fallbacks_agree(td5, expected):
+    """Preferred anchor, single-anchor fallback, /result/ fallback, and none."""
+    html = ("<table><tr><td><div><div>U &amp; <b>Co</b></div></div></td>"
+            "<td><div><span>P</span><span>PhD</span></div></td><td> 1 Jan </td>"
+            f"<td><div>Accepted<!-- x --> on 2 Jan</div></td><td>{td5}</td></tr></table>")
+    ref = scrape.parse_page(html, "bs4")
+    assert scrape.parse_page(html, "lxml") == ref
+    assert ref[0]["university_name"] == "U &Co"
+    assert ref[0]["applicant_url"].endswith(expected) if expected else ref[0]["applicant_url"] == ""
+
+
+def test_empty_page_is_empty_for_every_backend():
+    """No markup, no rows."""
+    for name in scrape.PARSERS:
+        assert not scrape.parse_page("", name)
+
+
+def test_bench_equivalence_helper_passes_on_fixtures():
+    """The benchmark's own check agrees."""
+    assert check_equivalence(load_pages(str(FIXTURES))) == []
+
+
+@pytest.mark.parametrize("parser", sorted(scrape.PARSERS))
+def test_backends_match_golden_rows(parser):
+    """Rows equal those produced by the original CSS-selector extractors."""
+    expected = json.loads((FIXTURES / "expected_rows.json").read_text(encoding="utf-8"))
+    for name, rows in expected.items():
+        assert scrape.parse_page((FIXTURES / name).read_text(encoding="utf-8"), parser) == rows
+
+
+def test_group_rows_single_pass_grouping():
+    """Parents take at most two following tw rows; other rows break the chain."""
+    rows = [("tr", []), ("tr", ["tw-border-none"]), ("tr", ["TW-Border-None"]),
+            ("tr", ["tw-border-none"]),               # third tw row: orphan
+            ("tr", []), ("tr", ["ad"]), ("tr", ["tw-border-none"]),  # ad row ends result
+            ("tr", []), ("script", []), ("tr", ["tw-border-none"])]  # non-tr ends result
+    idx = {id(r): i for i, r in enumerate(rows)}
+    got = [tuple(idx[id(x)] if x is not None else None for x in rec)
+           for rec in group_rows(rows, lambda r: r[0], lambda r: r[1])]
+    assert got == [(0, 1, 2), (4, None, None), (7, None, None)]
+
+
+@pytest.mark.parametrize("html, expected", [
+    ("<nav>x</nav><TABLE><tr></tr></TABLE><footer>y</footer>", "<TABLE><tr></tr></TABLE>"),
+    ("<p>no results</p>", ""),
+    ("<script></script><table><tr><td>cut off", "<table><tr><td>cut off"),
+])
+def test_table_region_keeps_only_the_table(html, expected):
+    """Markup outside the results table never reaches the parser."""
+    assert table_region(html) == expected
+
+
+def test_page_without_table_has_no_rows():
+    """Both backends agree that a table-less page is empty."""
+    for name in scrape.PARSERS:
+        assert not scrape.parse_page("<html><body><tr><td>stray</td></tr></body></html>", name)
+
+
+@pytest.mark.parametrize("txt, expected", [
+    ("GRE 320", ("gre", 320)),
+    ("GRE V 160", ("gre_v", 160)),
+    ("GRE AW 4.0", ("gre_aw", 4.0)),
+    ("gre aw 3.5", ("gre_aw", 3.5)),
+    ("GPA 3.80", ("gpa", 3.8)),
+    ("GPA: 3.9", ("gpa", 3.9)),
+    ("GPA n/a", ("gpa", None)),
+    ("GREAT school", None),
+    ("GRE", None),
+    ("International", None),
+])
+def test_parse_metric_classifies_and_captures(txt, expected):
+    """One regex pass gives the badge kind and its number."""
+    assert parse_metric(txt) == expected
@@ -0,0 +1,68 @@
+# module_2/tests/test_pipeline.py
+"""
+Fetch/parse pipeline tests: same rows as inline parsing, page order kept,
+fetch errors surface, and the bounded queue applies backpressure.
+"""
+
+import threading
+import time
+
+import pytest
+
+import scrape
+from fixture_server import make_page, pages_requested
+from pipeline import parse_pipeline
+
+
+def test_pipeline_matches_inline_parsing(gradcafe_server, monkeypatch):
+    """scrape_data with parser processes returns exactly the inline rows."""
+    scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=100, concurrency=3)
+    inline = list(scrape.results)
+
+    monkeypatch.setattr(scrape, "results", [])
+    monkeypatch.setattr(scrape, "parse_workers", 2)
+    monkeypatch.setattr(scrape, "parse_queue_size", 2)
+    scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=100, concurrency=3)
+    assert scrape.results == inline
+
+
+def test_pipeline_stops_fetching_at_the_end(gradcafe_server, monkeypatch):
+    """The first page without results ends the feed: only the fetch window runs past it."""
+    monkeypatch.setattr(scrape, "parse_workers", 2)
+    scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=1000, concurrency=2)
+    assert len(scrape.results) == 20
+    assert max(pages_requested(gradcafe_server)) <= 6 + 2  # empty page 6 + window of 2
+
+
+def test_pipeline_keeps_page_order():
+    """Pages come out 1..n however the workers finish."""
+    pages = [(n, make_page(n, 6, 3)) for n in range(1, 7)]
+    got = [(p, len(rows)) for p, rows in parse_pipeline(iter(pages), "bs4", parse_workers=3)]
+    assert got == [(n, 3) for n in range(1, 7)]
+
+
+def test_pipeline_reraises_fetch_errors():
+    """An exception in the fetch stage reaches the consumer."""
+    def pages():
+        yield 1, make_page(1, 1, 1)
+        raise scrape.FetchError("http://x/?page=2", 503)
+
+    with pytest.raises(scrape.FetchError):
+        list(parse_pipeline(pages(), "bs4", parse_workers=1))
+
+
+def test_bounded_queue_stops_fetching_ahead():
+    """A slow consumer holds the fetch stage at queue + in-flight parses."""
+    pulled = []
+
+    def pages():
+        for n in range(1, 200):
+            pulled.append(n)
+            yield n, make_page(n, 200, 1)
+
+    gen = parse_pipeline(pages(), "bs4", parse_workers=1, queue_size=3)
+    next(gen)
+    time.sleep(0.3)  # give the feeder every chance to run ahead
+    assert len(pulled) <= 3 + 2 + 2  # queue + pending parses + one in hand
+    gen.close()
+    assert not any(t.name == "feed" for t in threading.enumerate())
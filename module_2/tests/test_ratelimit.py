@@ -0,0 +1,155 @@
+# module_2/tests/test_ratelimit.py
+"""
+Unit tests for the token bucket and the per-host limiter.
+A fake clock keeps the bucket tests instant and deterministic.
+"""
+
+import threading
+import time
+
+import pytest
+
+from ratelimit import (AimdLimit, HostRateLimiter, TokenBucket, backoff_delay,
+                       parse_retry_after)
+
+
+class _FakeClock:
+    """Monotonic clock that only moves when sleep() is called."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        """Advance time instead of blocking."""
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_bucket_spaces_requests_at_rate():
+    """After the initial token, each acquire waits 1/rate seconds."""
+    clock = _FakeClock()
+    bucket = TokenBucket(rate=2.0, clock=clock, sleep=clock.sleep)
+    for _ in range(5):
+        bucket.acquire()
+    assert clock.now == pytest.approx(2.0)  # 4 waits of 0.5 s
+
+
+def test_bucket_burst_capacity():
+    """A full bucket hands out `capacity` tokens without waiting."""
+    clock = _FakeClock()
+    bucket = TokenBucket(rate=1.0, capacity=3, clock=clock, sleep=clock.sleep)
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_acquire() == pytest.approx(1.0)
+
+
+def test_bucket_rejects_bad_rate():
+    """Zero or negative rates are configuration errors."""
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_host_limiter_caps_in_flight_per_host():
+    """No more than max_in_flight callers hold a slot for the same host."""
+    limiter = HostRateLimiter(rate=1000, max_in_flight=2, burst=1000)
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def worker():
+        with limiter.slot("http://a.example/x"):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    assert peak[0] == 2
+
+
+def test_host_limiter_keeps_separate_buckets():
+    """Different hosts do not share a bucket."""
+    limiter = HostRateLimiter(rate=1.0)
+    a, _ = limiter._for_host("http://a.example/1")  # pylint: disable=protected-access
+    b, _ = limiter._for_host("http://b.example/1")  # pylint: disable=protected-access
+    assert a is not b
+
+
+def test_aimd_grows_one_per_healthy_window():
+    """limit healthy responses in a row add one slot."""
+    lim = AimdLimit(initial=1, maximum=4, latency_target=1.0)
+    lim.on_success(0.1)
+    assert lim.limit == 2
+    lim.on_success(0.1)
+    assert lim.limit == 2  # needs 2 healthy responses at limit 2
+    lim.on_success(0.1)
+    assert lim.limit == 3
+    for _ in range(20):
+        lim.on_success(0.1)
+    assert lim.limit == 4  # capped
+
+
+def test_aimd_slow_responses_hold_steady():
+    """Latency above target never adds capacity."""
+    lim = AimdLimit(initial=2, maximum=8, latency_target=1.0)
+    for _ in range(10):
+        lim.on_success(2.0)
+    assert lim.limit == 2
+
+
+def test_aimd_halves_once_per_cooldown():
+    """A burst of throttles within the cooldown counts once."""
+    clock = _FakeClock()
+    lim = AimdLimit(initial=8, maximum=8, cooldown=1.0, clock=clock)
+    lim.on_throttle()
+    lim.on_throttle()
+    assert lim.limit == 4
+    clock.now += 2
+    lim.on_throttle()
+    assert lim.limit == 2
+    clock.now += 2
+    lim.on_throttle()
+    clock.now += 2
+    lim.on_throttle()
+    assert lim.limit == 1  # floor
+
+
+def test_bucket_defer_blocks_tokens():
+    """A Retry-After pause holds every token until it passes."""
+    clock = _FakeClock()
+    bucket = TokenBucket(rate=100, capacity=10, clock=clock, sleep=clock.sleep)
+    bucket.defer(5)
+    bucket.acquire()
+    assert clock.now == pytest.approx(5)
+
+
+def test_adaptive_host_limiter_starts_at_one():
+    """Adaptive limiters ramp up from a single request in flight."""
+    limiter = HostRateLimiter(rate=10, max_in_flight=4, adaptive=True)
+    assert limiter.in_flight_limit("http://a/") == 1
+    limiter.success("http://a/", 0.01)
+    assert limiter.in_flight_limit("http://a/") == 2
+    limiter.throttled("http://a/")
+    assert limiter.in_flight_limit("http://a/") == 1
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    """Full jitter: 0..min(cap, base*2**n)."""
+    assert backoff_delay(3, base=1, cap=60, rng=lambda: 1.0) == 8
+    assert backoff_delay(10, base=1, cap=60, rng=lambda: 1.0) == 60
+    assert backoff_delay(3, base=1, cap=60, rng=lambda: 0.0) == 0
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("120", 120.0), (None, None), ("soon", None), ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+])
+def test_parse_retry_after(value, expected):
+    """Delta-seconds and HTTP-dates (past dates clamp to 0)."""
+    assert parse_retry_after(value) == expected
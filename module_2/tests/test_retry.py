@@ -0,0 +1,74 @@
+# module_2/tests/test_retry.py
+"""
+Retry/backoff tests: throttled or failed pages are retried instead of
+ending the crawl, Retry-After is honoured, and retries are bounded.
+"""
+
+import time
+
+import pytest
+
+import scrape
+from ratelimit import HostRateLimiter
+
+
+def _attempts(server, page):
+    return sum(1 for path, _ in server.requests if path.endswith(f"page={page}"))
+
+
+def test_throttled_and_empty_pages_are_retried(gradcafe_server):
+    """429, 503 and an empty 200 on page 2 no longer end the crawl early."""
+    gradcafe_server.status_plan = {2: [429, 503, "empty"]}
+    scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=100, concurrency=2)
+    assert len(scrape.results) == 20
+    assert _attempts(gradcafe_server, 2) == 4
+
+
+def test_empty_body_is_not_cached_across_retries(gradcafe_server, monkeypatch, tmp_path):
+    """With the response cache on, a retry after an empty 200 goes back to the network."""
+    monkeypatch.setattr(scrape, "cache", None)
+    scrape.enable_cache(str(tmp_path / "http_cache"))
+    gradcafe_server.status_plan = {1: ["empty"]}
+    url = gradcafe_server.url_prefix + "1"
+    assert scrape.fetch_with_retry(url, HostRateLimiter(100)).strip()
+    assert _attempts(gradcafe_server, 1) == 2
+    assert scrape.cache.body(url).strip()  # the good body is what got cached
+
+
+def test_retry_after_pauses_the_host(gradcafe_server):
+    """A Retry-After of 1 s delays the retry by about a second."""
+    gradcafe_server.status_plan = {1: [429]}
+    gradcafe_server.retry_after = "1"
+    start = time.monotonic()
+    url = gradcafe_server.url_prefix + "1"
+    assert scrape.fetch_with_retry(url, HostRateLimiter(100, adaptive=True))
+    assert time.monotonic() - start >= 0.9
+
+
+def test_retries_are_bounded(gradcafe_server, monkeypatch):
+    """After max_retries the last error is raised (so --resume can take over)."""
+    monkeypatch.setattr(scrape, "max_retries", 2)
+    gradcafe_server.fail_pages = {1}
+    with pytest.raises(scrape.FetchError) as err:
+        scrape.fetch_with_retry(gradcafe_server.url_prefix + "1", HostRateLimiter(100))
+    assert err.value.status == 503
+    assert _attempts(gradcafe_server, 1) == 3
+
+
+def test_adaptive_concurrency_backs_off_on_throttling(gradcafe_server):
+    """Throttling halves the in-flight cap that healthy responses grew."""
+    limiter = HostRateLimiter(100, max_in_flight=4, adaptive=True)
+    for page in range(1, 6):
+        scrape.fetch_with_retry(gradcafe_server.url_prefix + str(page), limiter)
+    grown = limiter.in_flight_limit(gradcafe_server.origin)
+    assert grown > 1
+    gradcafe_server.status_plan = {1: [429]}
+    scrape.fetch_with_retry(gradcafe_server.url_prefix + "1", limiter)
+    assert limiter.in_flight_limit(gradcafe_server.origin) < grown
+
+
+def test_connection_errors_are_retried_then_raised(monkeypatch):
+    """Nothing listening: urllib3 errors bubble up after the retries."""
+    monkeypatch.setattr(scrape, "max_retries", 1)
+    with pytest.raises(scrape.urllib3.exceptions.HTTPError):
+        scrape.fetch_with_retry("http://127.0.0.1:9/survey/?page=1", HostRateLimiter(100))
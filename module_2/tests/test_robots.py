@@ -0,0 +1,132 @@
+# module_2/tests/test_robots.py
+"""
+robots.txt cache: TTL on disk, Crawl-delay / Request-rate as a rate ceiling,
+and URL checks without re-fetching.
+"""
+
+import pytest
+
+import scrape
+from robots_cache import RobotsCache, RobotsPolicy
+
+ROBOTS = """User-agent: *
+Crawl-delay: 4
+Request-rate: 1/2
+Disallow: /result/
+"""
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def robots_server(gradcafe_server, monkeypatch):
+    """Fixture server with a robots.txt; scrape points at it with a fresh cache."""
+    gradcafe_server.robots_txt = ROBOTS
+    monkeypatch.setattr(scrape, "target_url", gradcafe_server.origin + "/survey/")
+    monkeypatch.setattr(scrape, "robots", None)
+    return gradcafe_server
+
+
+def _robots_requests(server):
+    return [p for p, _ in server.requests if p == "/robots.txt"]
+
+
+def test_policy_rate_ceiling():
+    """The slower of Crawl-delay (1/4 s) and Request-rate (1/2 s) wins."""
+    policy = RobotsPolicy(ROBOTS, 200)
+    assert policy.crawl_delay == 4 and policy.request_rate == 0.5
+    assert policy.rate_ceiling() == 0.25
+    assert policy.cap_rate(10) == 0.25 and policy.cap_rate(0.1) == 0.1
+    assert RobotsPolicy("User-agent: *\nDisallow:\n", 200).cap_rate(3) == 3
+    assert not policy.can_fetch("https://x/result/1") and policy.can_fetch("https://x/survey/")
+
+
+def test_fractional_delay_and_rate_units():
+    """Values robotparser drops: a fractional Crawl-delay and a Request-rate with a unit."""
+    policy = RobotsPolicy("User-agent: *\nCrawl-delay: 2.5\nRequest-rate: 1/5s\n", 200)
+    assert policy.crawl_delay == 2.5 and policy.request_rate == 0.2
+    assert policy.cap_rate(0.5) == 0.2
+    assert RobotsPolicy("User-agent: *\nCrawl-delay: 2.5\n", 200).cap_rate(0.5) == 0.4
+    assert RobotsPolicy("User-agent: *\nRequest-rate: 30/1m\n", 200).request_rate == 0.5
+    assert RobotsPolicy("User-agent: *\nCrawl-delay: soon\n", 200).crawl_delay is None
+
+
+def test_delay_from_our_agent_group():
+    """A group naming our user agent wins over "*"; other agents' groups are ignored."""
+    text = ("User-agent: Googlebot\nCrawl-delay: 1\n\n"
+            "User-agent: *\nCrawl-delay: 10\n\n"
+            "User-agent: mozilla\nCrawl-delay: 0.5  # ours\n")
+    assert RobotsPolicy(text, 200).crawl_delay == 0.5
+    assert RobotsPolicy(text, 200, user_agent="other/1.0").crawl_delay == 10
+
+
+@pytest.mark.parametrize("status, allowed", [(404, True), (503, False), (None, False)])
+def test_policy_status_rules(status, allowed):
+    """4xx: no restrictions; 5xx or unreachable: full disallow."""
+    assert RobotsPolicy("", status).can_fetch("https://x/survey/") is allowed
+
+
+def test_cache_reuses_disk_copy_until_ttl(tmp_path):
+    """A second process within the TTL does not download robots.txt again."""
+    calls, clock = [], _Clock()
+    fetch = lambda url: (calls.append(url), (200, ROBOTS))[1]  # noqa: E731
+    path = str(tmp_path / "robots.json")
+    assert RobotsCache(fetch, path, ttl=60, clock=clock).allowed("https://x/survey/")
+    again = RobotsCache(fetch, path, ttl=60, clock=clock)
+    assert not again.allowed("https://x/result/5")
+    assert calls == ["https://x/robots.txt"] and again.stats == {"cached": 1, "fetched": 0}
+    clock.now += 61
+    RobotsCache(fetch, path, ttl=60, clock=clock).policy("https://x/")
+    assert len(calls) == 2
+
+
+def test_server_error_keeps_older_copy(tmp_path):
+    """A 5xx on refresh falls back to the stale file instead of disallowing everything."""
+    clock = _Clock()
+    path = str(tmp_path / "robots.json")
+    RobotsCache(lambda url: (200, ROBOTS), path, ttl=60, clock=clock).policy("https://x/")
+    clock.now += 120
+    stale = RobotsCache(lambda url: (503, ""), path, ttl=60, clock=clock)
+    assert stale.allowed("https://x/survey/") and stale.policy("https://x/").crawl_delay == 4
+    gone = RobotsCache(lambda url: (None, ""), str(tmp_path / "none.json"), clock=clock)
+    assert not gone.allowed("https://x/survey/")
+
+
+def test_check_and_save_robots_uses_cache(robots_server):
+    """First run downloads and saves robots.txt; the next run reads the cache."""
+    out = scrape.check_and_save_robots()
+    assert out["allowed"] and out["crawl_delay"] == 4 and not out["cached"]
+    with open("robots.txt", encoding="utf-8") as f:
+        assert "Crawl-delay: 4" in f.read()
+    scrape.robots = None  # a new run
+    assert scrape.check_and_save_robots()["cached"]
+    assert len(_robots_requests(robots_server)) == 1
+
+
+def test_disallowed_result_pages_are_not_fetched(robots_server):
+    """fetch_with_retry refuses URLs robots.txt disallows, without a request."""
+    scrape.enable_robots()
+    limiter = scrape.make_limiter(100, 1)
+    with pytest.raises(scrape.Disallowed):
+        scrape.fetch_with_retry(robots_server.origin + "/result/3", limiter)
+    assert scrape.fetch_with_retry(robots_server.url_prefix + "1", limiter)
+    assert not [p for p, _ in robots_server.requests if p.startswith("/result/")]
+
+
+def test_run_caps_rate_at_request_rate(robots_server, monkeypatch):
+    """run() hands the robots.txt ceiling to the rate limiter."""
+    robots_server.robots_txt = "User-agent: *\nRequest-rate: 100/1\n"
+    scrape.enable_robots()
+    seen = []
+    make_limiter = scrape.make_limiter
+    monkeypatch.setattr(scrape, "make_limiter",
+                        lambda rate, conc: seen.append(rate) or make_limiter(rate, conc))
+    args = scrape._parse_args(["--rate", "1000", "--concurrency", "2"])  # pylint: disable=protected-access
+    assert scrape.run(args, robots_server.url_prefix) == 20
+    assert seen == [100.0]
@@ -0,0 +1,106 @@
+# module_2/tests/test_scrape.py
+"""
+End-to-end tests for scrape.py against the local fixture server.
+No request ever leaves 127.0.0.1.
+"""
+
+import json
+
+import scrape
+from fixture_server import result_ids
+
+
+def test_parse_page_extracts_all_fields(gradcafe_server):
+    """One parent/details/comments block becomes one complete row."""
+    html = scrape.fetch(gradcafe_server.url_prefix + "1")
+    rows = scrape.parse_page(html)
+    assert len(rows) == gradcafe_server.rows_per_page
+    first = rows[0]
+    assert first["university_name"] == "University 19"
+    assert first["program_name"] == "Computer Science"
+    assert first["masters_phd"] == "PhD"
+    assert first["applicant_url"].endswith("/result/19")
+    assert first["term"] == "Fall 2024"
+    assert first["gre_aw"] == "GRE AW 4.0"
+    assert first["gpa"] == "GPA 3.80"
+    assert first["comments"] == ""
+    assert rows[1]["comments"] == "note 18"
+
+
+def test_parse_page_empty_table():
+    """A page without parent rows yields no results."""
+    assert not scrape.parse_page("<table><tbody></tbody></table>")
+
+
+def test_fetch_pages_yields_in_page_order(gradcafe_server):
+    """Concurrent fetches still come back 1, 2, 3, ..."""
+    gradcafe_server.delay = 0.02
+    pages = scrape.fetch_pages(1, gradcafe_server.url_prefix, rate=100, concurrency=4)
+    got = [next(pages)[0] for _ in range(6)]
+    pages.close()
+    assert got == [1, 2, 3, 4, 5, 6]
+    assert gradcafe_server.max_in_flight <= 4
+
+
+def test_scrape_data_collects_every_page_in_order(gradcafe_server):
+    """scrape_data stops at the first empty page and keeps page order."""
+    scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=100, concurrency=3)
+    assert result_ids(scrape.results) == list(range(19, -1, -1))
+
+
+def test_scrape_data_respects_rate_budget(gradcafe_server):
+    """Request starts are spaced by roughly 1/rate even with spare concurrency."""
+    scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=20, concurrency=4)
+    starts = sorted(t for _, t in gradcafe_server.requests)
+    span = starts[-1] - starts[0]
+    assert span >= (len(starts) - 1) / 20 * 0.8
+
+
+def test_scrape_data_stops_at_target_length(gradcafe_server, monkeypatch):
+    """Crawling ends once results exceed target_length."""
+    monkeypatch.setattr(scrape, "target_length", 5)
+    scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=100, concurrency=1)
+    assert len(scrape.results) == 8  # two full pages
+
+
+def test_incremental_stops_at_first_fully_known_page(gradcafe_server, tmp_path):
+    """Only rows newer than the previous pull are kept; paging stops early."""
+    scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=100, concurrency=1)
+    path = tmp_path / "scraped.json"
+    scrape.create_scraped_json(scrape.results[4:], str(path))  # last pull missed page 1
+    previous = scrape.load_scraped_json(str(path))
+
+    scrape.results.clear()
+    gradcafe_server.requests.clear()
+    scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=100, concurrency=1,
+                       options=scrape.CrawlOptions(known=scrape.known_urls(previous)))
+    assert [r["university_name"] for r in scrape.results] == [
+        "University 19", "University 18", "University 17", "University 16"]
+    assert [p for p, _ in gradcafe_server.requests][:2] == ["/survey/?page=1", "/survey/?page=2"]
+    assert len(gradcafe_server.requests) <= 3  # page 2 is all known -> stop
+
+
+def test_known_urls_accepts_cleaned_rows():
+    """Cleaned output uses 'url' instead of 'applicant_url'."""
+    assert scrape.known_urls([{"url": "u1"}, {"applicant_url": "u2"}, {"url": ""}]) == {"u1", "u2"}
+
+
+def test_load_scraped_json_missing_file(tmp_path):
+    """No previous run means nothing is known."""
+    assert scrape.load_scraped_json(str(tmp_path / "nope.json")) == []
+
+
+def test_incremental_run_streams_previous_scraped_json(gradcafe_server, monkeypatch):
+    """run() reads the old scraped.json incrementally (twice) instead of loading it whole."""
+    args = scrape._parse_args(["--rate", "100", "--concurrency", "1", "--report", ""])  # pylint: disable=protected-access
+    scrape.run(args, gradcafe_server.url_prefix)
+
+    def whole_file(*_args):
+        raise AssertionError("scraped.json loaded into memory")
+    monkeypatch.setattr(scrape, "load_scraped_json", whole_file)
+    gradcafe_server.pages = 6  # four newer results
+    args.incremental = True
+    assert scrape.run(args, gradcafe_server.url_prefix) == 4
+    with open("scraped.json", encoding="utf-8") as f:
+        rows = json.load(f)
+    assert result_ids(rows) == list(range(23, -1, -1))
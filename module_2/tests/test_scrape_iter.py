@@ -0,0 +1,46 @@
+# module_2/tests/test_scrape_iter.py
+"""
+scrape_iter(): lazy, in-process row generator (no files, no global results).
+"""
+
+import os
+
+import scrape
+from fixture_server import pages_requested, result_ids
+
+
+def test_yields_every_row_in_order_without_side_effects(gradcafe_server):
+    rows = list(scrape.scrape_iter(base_url=gradcafe_server.url_prefix, rate=100, concurrency=2))
+    assert result_ids(rows) == list(range(19, -1, -1))
+    assert scrape.results == [] and os.listdir(".") == []
+
+
+def test_rows_arrive_before_the_crawl_finishes(gradcafe_server):
+    """The first row is available after page 1, not after the last page."""
+    gen = scrape.scrape_iter(base_url=gradcafe_server.url_prefix, rate=100, concurrency=1)
+    first = next(gen)
+    assert result_ids([first]) == [19]
+    assert len(pages_requested(gradcafe_server)) <= 2
+    gen.close()
+
+
+def test_max_rows_stops_early(gradcafe_server):
+    rows = list(scrape.scrape_iter(max_rows=6, base_url=gradcafe_server.url_prefix,
+                                   rate=100, concurrency=1))
+    assert result_ids(rows) == [19, 18, 17, 16, 15, 14]
+    assert len(pages_requested(gradcafe_server)) <= 3
+
+
+def test_since_url_stops_at_previous_newest_row(gradcafe_server):
+    """Everything newer than the last pull's newest row, and nothing else."""
+    since = scrape._origin + "/result/13"  # pylint: disable=protected-access
+    rows = list(scrape.scrape_iter(since=since, base_url=gradcafe_server.url_prefix,
+                                   rate=100, concurrency=1))
+    assert result_ids(rows) == [19, 18, 17, 16, 15, 14]
+
+
+def test_since_set_skips_known_rows(gradcafe_server):
+    known = {scrape._origin + f"/result/{i}" for i in (18, 16)}  # pylint: disable=protected-access
+    rows = list(scrape.scrape_iter(since=known, base_url=gradcafe_server.url_prefix,
+                                   rate=100, concurrency=2))
+    assert 18 not in result_ids(rows) and 16 not in result_ids(rows) and len(rows) == 18
@@ -0,0 +1,193 @@
+# module_2/tests/test_shard.py
+"""
+Sharded scraping: SQLite work queue (claims, leases, retries), per-shard
+NDJSON output and the deterministic, deduplicated merge.
+"""
+
+import json
+import multiprocessing
+import threading
+
+import pytest
+
+import scrape
+import shard
+from fixture_server import pages_requested, result_ids, start_server
+from sinks import iter_ndjson
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "shards.sqlite")
+
+
+def test_plan_is_idempotent_and_covers_range(db):
+    q = shard.WorkQueue(db)
+    assert q.plan(1, 10, 4) == 3
+    assert q.plan(1, 10, 4) == 0
+    assert [(s["start_page"], s["end_page"]) for s in q.shards()] == [(1, 4), (5, 8), (9, 10)]
+
+
+def test_claims_are_exclusive_and_leases_expire(db):
+    """Each shard goes to one worker; a dead worker's shard is reclaimed after the lease."""
+    clock = _Clock()
+    q = shard.WorkQueue(db, clock=clock)
+    q.plan(1, 4, 2)
+    a, b = q.claim("a", lease=60), q.claim("b", lease=60)
+    assert (a["start_page"], b["start_page"]) == (1, 3)
+    assert q.claim("c", lease=60) is None
+    clock.now += 61
+    again = q.claim("c", lease=60)
+    assert again["id"] == a["id"] and again["attempts"] == 2
+    assert not q.complete(a["id"], "a", 0, "x")  # lease lost
+    assert q.complete(again["id"], "c", 0, "x")
+
+
+def test_renewed_lease_is_not_reclaimed(db):
+    """A worker that keeps finishing pages keeps its shard past the first lease."""
+    clock = _Clock()
+    q = shard.WorkQueue(db, clock=clock)
+    q.plan(1, 1, 1)
+    a = q.claim("a", lease=60)
+    for _ in range(3):
+        clock.now += 50
+        assert q.renew(a["id"], "a")
+        assert q.claim("b", lease=60) is None
+    clock.now += 61
+    assert q.claim("b", lease=60)["id"] == a["id"]
+    assert not q.renew(a["id"], "a")  # lost to b
+
+
+def test_worker_renews_lease_per_page_and_stops_when_lost(gradcafe_server, db, monkeypatch):
+    shard.WorkQueue(db).plan(1, 5, 5)
+    beats = []
+    monkeypatch.setattr(shard.WorkQueue, "renew", lambda self, sid, w: beats.append(sid) or True)
+    assert shard.run_worker(db, "shards", gradcafe_server.url_prefix, "w", rate=100) == 1
+    assert len(beats) == 5  # one heartbeat per page
+
+    lost = db + ".lost"
+    shard.WorkQueue(lost).plan(1, 5, 5)
+    monkeypatch.setattr(shard.WorkQueue, "renew", lambda self, sid, w: False)
+    assert shard.run_worker(lost, "shards", gradcafe_server.url_prefix, "w", rate=100) == 0
+    s = shard.WorkQueue(lost).shards()[0]
+    assert s["status"] == "running" and s["error"] is None  # left to its new owner
+
+
+def test_failed_shard_is_retried_until_max_attempts(db):
+    q = shard.WorkQueue(db)
+    q.plan(1, 1, 1)
+    for _ in range(2):
+        s = q.claim("w", max_attempts=2)
+        q.fail(s["id"], "w", "boom")
+    assert q.claim("w", max_attempts=2) is None
+    assert q.counts() == {"failed": 1}
+
+
+def test_concurrent_claimers_never_share_a_shard(db):
+    """Threads with their own connections claim every shard exactly once."""
+    shard.WorkQueue(db).plan(1, 200, 1)
+    claimed, lock = [], threading.Lock()
+
+    def claimer(name):
+        q = shard.WorkQueue(db)
+        while (s := q.claim(name)) is not None:
+            with lock:
+                claimed.append(s["start_page"])
+        q.close()
+
+    threads = [threading.Thread(target=claimer, args=(f"w{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(claimed) == list(range(1, 201))
+
+
+def test_workers_then_merge_match_a_single_crawl(gradcafe_server, db):
+    """Two workers over 2-page shards merge into the same rows as one crawl."""
+    shard.WorkQueue(db).plan(1, 8, 2)  # pages 6-8 are past the end: empty shards
+    kwargs = dict(db=db, out_dir="shards", base_url=gradcafe_server.url_prefix,
+                  rate=100, concurrency=2)
+    threads = [threading.Thread(target=shard.run_worker, kwargs={**kwargs, "worker": w})
+               for w in ("a", "b")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stats = shard.merge_shards(db)
+    assert stats == {"shards": 4, "rows": 20, "duplicates": 0, "unfinished": 0}
+    with open("scraped.json", encoding="utf-8") as f:
+        assert result_ids(json.load(f)) == list(range(19, -1, -1))
+    # a shard never fetches past its end page
+    pages = pages_requested(gradcafe_server)
+    assert max(pages) <= 8 and len(pages) == len(set(pages))
+
+
+def test_merge_drops_rows_repeated_across_shards(gradcafe_server, db):
+    """A result seen in two shards (the site shifted) is written once, first shard wins."""
+    gradcafe_server.page_alias = {3: 2}
+    shard.WorkQueue(db).plan(1, 5, 2)
+    shard.run_worker(db, "shards", gradcafe_server.url_prefix, "w", rate=100, concurrency=1)
+    stats = shard.merge_shards(db)
+    assert stats["duplicates"] == 4 and stats["rows"] == 16
+    ids = result_ids(iter_ndjson("scraped.ndjson"))
+    assert len(ids) == len(set(ids))
+
+
+def test_merge_refuses_unfinished_shards(db):
+    q = shard.WorkQueue(db)
+    q.plan(1, 2, 1)
+    with pytest.raises(RuntimeError, match="not done"):
+        shard.merge_shards(db)
+    assert shard.merge_shards(db, partial=True)["unfinished"] == 2
+
+
+def test_failing_shard_is_recorded(gradcafe_server, db, monkeypatch):
+    monkeypatch.setattr(scrape, "max_retries", 0)
+    gradcafe_server.fail_pages = {1}
+    shard.WorkQueue(db).plan(1, 1, 1)
+    assert shard.run_worker(db, "shards", gradcafe_server.url_prefix, "w", rate=100) == 0
+    s = shard.WorkQueue(db).shards()[0]
+    assert s["status"] == "failed" and "FetchError" in s["error"]
+
+
+def test_forked_workers_scrape_their_own_pages(db, monkeypatch):
+    """Worker processes never share the parent's kept-alive connection, and a
+    shard is never cut short by the target_length row cap."""
+    server = start_server(pages=40, rows_per_page=4)
+    try:
+        scrape.fetch(server.url_prefix + "1")  # leaves a kept-alive socket in the pool
+        monkeypatch.setattr(scrape, "target_length", 5)
+        shard.WorkQueue(db).plan(1, 41, 5)
+        assert shard.run_workers(4, multiprocessing.get_context("fork"), db=db,
+                                 out_dir="shards", base_url=server.url_prefix,
+                                 rate=1000, concurrency=2) == 9
+    finally:
+        server.stop()
+    for s in shard.WorkQueue(db).shards():
+        first = 160 - 4 * (s["start_page"] - 1) - 1
+        last = max(160 - 4 * s["end_page"], 0)
+        assert result_ids(iter_ndjson(s["output"])) == list(range(first, last - 1, -1)), s["start_page"]
+
+
+def test_spawned_workers_check_robots(gradcafe_server, db, monkeypatch):
+    """A spawned worker inherits no scrape.robots: it loads the rules from the
+    parent's cache file (no second download) and fetches nothing disallowed."""
+    gradcafe_server.robots_txt = "User-agent: *\nDisallow: /survey/\n"
+    monkeypatch.setattr(scrape, "robots", None)
+    assert not scrape.enable_robots("robots.json").allowed(gradcafe_server.url_prefix + "1")
+    shard.WorkQueue(db).plan(1, 2, 1)
+    assert shard.run_workers(2, multiprocessing.get_context("spawn"), db=db, out_dir="shards",
+                             base_url=gradcafe_server.url_prefix, rate=100,
+                             robots_cache="robots.json") == 0
+    assert all(s["status"] == "failed" and "Disallowed" in s["error"]
+               for s in shard.WorkQueue(db).shards())
+    assert [p for p, _ in gradcafe_server.requests] == ["/robots.txt"]
@@ -0,0 +1,118 @@
+# module_2/tests/test_sinks.py
+"""
+Tests for the streaming NDJSON sink and the JSON array export.
+"""
+
+import json
+import random
+
+import pytest
+
+import scrape
+from sinks import NdjsonSink, export_json_array, iter_json_array, iter_ndjson
+
+ROWS = [{"university_name": "Café U", "gpa": "GPA 3.9"}, {"university_name": "B", "gpa": ""}]
+
+
+def test_sink_round_trip(tmp_path):
+    """Rows written page by page come back in order."""
+    path = str(tmp_path / "out.ndjson")
+    with NdjsonSink(path, fsync_every=1) as sink:
+        sink.write_rows(ROWS[:1])
+        sink.write_rows(ROWS[1:])
+        assert sink.rows_written == 2
+    assert list(iter_ndjson(path)) == ROWS
+
+
+def test_sink_append_keeps_existing_lines(tmp_path):
+    """append=True continues an existing file instead of truncating it."""
+    path = str(tmp_path / "out.ndjson")
+    with NdjsonSink(path) as sink:
+        sink.write_rows(ROWS[:1])
+    with NdjsonSink(path, append=True) as sink:
+        sink.write_rows(ROWS[1:])
+    assert list(iter_ndjson(path)) == ROWS
+
+
+@pytest.mark.parametrize("rows", [ROWS, []])
+def test_export_pretty_matches_json_dump(tmp_path, rows):
+    """The streamed pretty output is byte-identical to json.dump(indent=2)."""
+    path = tmp_path / "scraped.json"
+    assert export_json_array(str(path), iter(rows)) == len(rows)
+    assert path.read_text(encoding="utf-8") == json.dumps(rows, ensure_ascii=False, indent=2)
+
+
+def test_export_compact_concatenates_sources(tmp_path):
+    """Several row sources end up in one compact array, in order."""
+    path = tmp_path / "scraped.json"
+    export_json_array(str(path), iter(ROWS[:1]), iter(ROWS[1:]), compact=True)
+    text = path.read_text(encoding="utf-8")
+    assert "\n" not in text
+    assert json.loads(text) == ROWS
+
+
+@pytest.mark.parametrize("indent", [2, None])
+@pytest.mark.parametrize("chunk_size", [1, 5, 64 * 1024])
+def test_iter_json_array_reads_incrementally(tmp_path, indent, chunk_size):
+    """Elements come back in order whatever the layout and however small the chunks."""
+    rows = ROWS * 3 + [{"nested": {"a": [1, 2.5, None]}, "n": 12345}]
+    path = tmp_path / "scraped.json"
+    path.write_text(json.dumps(rows, ensure_ascii=False, indent=indent), encoding="utf-8")
+    assert list(iter_json_array(str(path), chunk_size)) == rows
+    pairs = list(iter_json_array(str(path), chunk_size, with_text=True))
+    assert [json.loads(text) for _, text in pairs] == [item for item, _ in pairs] == rows
+
+
+def _write(tmp_path, text):
+    path = tmp_path / "fuzz.json"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def _random_value(rng, depth=0):
+    kind = rng.randrange(7 if depth < 3 else 4)
+    if kind == 0:
+        return rng.choice([0, -7, 12345, 1.5, -0.25, 3e-5, 6.02e23, 1e100])
+    if kind == 1:
+        return rng.choice(["", "x", "Café", 'a "quoted" \\ b', "\u2603 snow"])
+    if kind == 2:
+        return rng.choice([True, False, None])
+    if kind == 3:
+        return rng.randrange(-10**6, 10**6) / rng.choice([1, 10, 1000])
+    if kind in (4, 5):
+        return [_random_value(rng, depth + 1) for _ in range(rng.randrange(4))]
+    return {f"k{i}": _random_value(rng, depth + 1) for i in range(rng.randrange(4))}
+
+
+def test_iter_json_array_matches_json_load_for_any_chunk_size(tmp_path):
+    """Top-level numbers, literals and strings split at every chunk boundary."""
+    assert list(iter_json_array(_write(tmp_path, "[1.5, 2]"), 3)) == [1.5, 2]
+    rng = random.Random(0)
+    for trial in range(40):
+        items = [_random_value(rng) for _ in range(rng.randrange(1, 12))]
+        text = json.dumps(items, ensure_ascii=False, indent=rng.choice([None, 2]),
+                          separators=rng.choice([None, (",", ":")]))
+        path = _write(tmp_path, text)
+        with open(path, "r", encoding="utf-8") as f:
+            expected = json.load(f)
+        for chunk_size in range(1, 9):
+            assert list(iter_json_array(path, chunk_size)) == expected, (trial, chunk_size)
+
+
+@pytest.mark.parametrize("text", ["{}", "[1 2]", '[{"a": 1', ""])
+def test_iter_json_array_rejects_non_arrays(tmp_path, text):
+    path = tmp_path / "bad.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_json_array(str(path), 3))
+
+
+def test_scrape_data_streams_to_sink(gradcafe_server, tmp_path):
+    """With a sink nothing accumulates in the module-level results list."""
+    path = str(tmp_path / "scraped.ndjson")
+    with NdjsonSink(path) as sink:
+        total = scrape.scrape_data(base_url=gradcafe_server.url_prefix, rate=100,
+                                   concurrency=2, sink=sink)
+    assert total == 20
+    assert not scrape.results
+    assert len(list(iter_ndjson(path))) == 20
@@ -56,6 +56,14 @@ def _num(text: Any) -> Optional[float]:
     m = re.search(r"[-+]?\d+(?:\.\d+)?", s)
     return float(m.group(0)) if m else None
 
+def _metric(item: dict, text_key: str, num_key: str) -> Optional[float]:
+    """
+    GRE/GPA value of a cleaned row: the number parsed at scrape time when the
+    row carries one (e.g. "gpa_num"), else the first number in the text field.
+    """
+    value = item.get(num_key)
+    return float(value) if value is not None else _num(item.get(text_key))
+
 def _read_db_config(path: str = "config.ini") -> dict:
     """
     Read PostgreSQL connection settings from config.ini under [db].
@@ -136,7 +144,8 @@ def main() -> None:
             # Expected JSON keys (common from Module 2 cleaned file):
             # "program", "comments", "date_added", "url", "status", "term",
             # "US/International", "GPA", "gre", "gre_v", "gre_aw", "Degree",
-            # "llm-generated-program", "llm-generated-university"
+            # "llm-generated-program", "llm-generated-university",
+            # and the parsed numbers "gpa_num", "gre_num", "gre_v_num", "gre_aw_num"
 
             for item in rows:
                 program = item.get("program", "")
@@ -147,10 +156,10 @@ def main() -> None:
                 term = item.get("term", "")
                 us_intl = item.get("US/International", "")
 
-                gpa = _num(item.get("GPA"))
-                gre = _num(item.get("gre"))
-                gre_v = _num(item.get("gre_v"))
-                gre_aw = _num(item.get("gre_aw"))
+                gpa = _metric(item, "GPA", "gpa_num")
+                gre = _metric(item, "gre", "gre_num")
+                gre_v = _metric(item, "gre_v", "gre_v_num")
+                gre_aw = _metric(item, "gre_aw", "gre_aw_num")
 
                 # degree is TEXT (e.g., "Masters", "PhD") — store as-is
                 degree = item.get("Degree", "")